@@ -0,0 +1,72 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Benchmark of the throughput of the socket bridge over TCP loopback and Unix domain sockets.
+
+The client and the server run in the same event loop. Every case measures the time from the first published event
+until the server emitted the last event, for different batch sizes.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import os
+import pickle
+import tempfile
+import time
+
+import pandas
+
+from eventlib import Event, EventSystem
+from eventlib.bridge import BridgeClient, BridgeServer
+
+
+@dataclasses.dataclass
+class BenchEvent(Event):
+    """Event of the benchmark."""
+
+    seq: int
+    payload: str
+
+
+async def benchmark_bridge(transport: str, batch_size: int, events: int) -> float:
+    """Measure the events per second through the bridge."""
+    remote = EventSystem()
+    done = asyncio.Event()
+
+    @remote.subscribe(BenchEvent)
+    def handler(event: BenchEvent):
+        if event.seq == events - 1:
+            done.set()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bridge.sock") if transport == "unix" else None
+        async with BridgeServer(remote, path=path, loads=pickle.loads) as server:
+            port = None if path else server.address[1]
+            async with BridgeClient(port=port, path=path, batch_size=batch_size) as client:
+                start = time.perf_counter()
+                for seq in range(events):
+                    await client.publish(BenchEvent(seq, "x" * 32))
+                await done.wait()
+                return events / (time.perf_counter() - start)
+
+
+def benchmark_cli():
+    """Command line for the socket bridge benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--events", type=int, default=100_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    args = parser.parse_args()
+
+    rows = []
+    for transport in ("tcp", "unix"):
+        for batch_size in args.batch_sizes:
+            throughput = asyncio.run(benchmark_bridge(transport, batch_size, args.events))
+            rows.append({"Transport": transport, "Batch size": batch_size, "Events/s": throughput})
+    df = pandas.DataFrame(rows)
+    print(df.to_markdown(index=False, floatfmt=("", "", ".0f")))
+
+
+if __name__ == "__main__":
+    benchmark_cli()
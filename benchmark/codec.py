@@ -0,0 +1,117 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Benchmark of the encode and decode throughput of the binary event codec compared to pickle.
+
+Every case encodes and decodes small events defined as dataclass, attrs class and pydantic model, one by one and in
+batches, and reports the events per second and the encoded size per event.
+"""
+
+import argparse
+import dataclasses
+import functools
+import pickle
+import timeit
+from typing import Any, Callable
+
+import pandas
+from attrs import define
+from pydantic import BaseModel
+
+from eventlib import Event
+from eventlib.codec import EventCodec
+
+
+@dataclasses.dataclass
+class DataclassEvent(Event):
+    """Dataclass event of the benchmark."""
+
+    order_id: int
+    price: float
+    paid: bool
+    name: str
+
+
+@define
+class AttrsEvent(Event):
+    """Attrs event of the benchmark."""
+
+    order_id: int
+    price: float
+    paid: bool
+    name: str
+
+
+class PydanticEvent(Event, BaseModel):
+    """Pydantic event of the benchmark."""
+
+    order_id: int
+    price: float
+    paid: bool
+    name: str
+
+
+CODEC = EventCodec()
+CODEC.register(DataclassEvent, 1)
+CODEC.register(AttrsEvent, 2)
+CODEC.register(PydanticEvent, 3)
+
+
+def _pickle_dumps(events: list[Event]) -> bytes:
+    return pickle.dumps(events, pickle.HIGHEST_PROTOCOL)
+
+
+def benchmark_case(event_type: type, batch: int, repetitions: int) -> list[dict]:
+    """Measure the encode and decode throughput of the codec and pickle for an event type."""
+    rows = []
+    events = [event_type(order_id=i, price=i / 100, paid=bool(i % 2), name=f"order-{i}") for i in range(batch)]
+    event = events[0]
+    buffer = bytearray(64 * batch)
+    encoders: dict[str, tuple[Callable[[], bytes | int], Callable[[Any], Any]]]
+    if batch == 1:
+        encoders = {
+            "pickle": (lambda: pickle.dumps(event, pickle.HIGHEST_PROTOCOL), pickle.loads),
+            "codec": (lambda: CODEC.encode(event), CODEC.decode),
+            "codec (buffer)": (lambda: CODEC.encode_into(event, buffer), lambda _: CODEC.decode_from(buffer)),
+        }
+    else:
+        encoders = {
+            "pickle": (lambda: _pickle_dumps(events), pickle.loads),
+            "codec": (lambda: CODEC.dumps(events), CODEC.loads),
+        }
+    for name, (encode, decode) in encoders.items():
+        data = encode()
+        encode_time = min(timeit.repeat(encode, number=repetitions, repeat=5)) / repetitions
+        decode_time = min(timeit.repeat(functools.partial(decode, data), number=repetitions, repeat=5)) / repetitions
+        size = data if isinstance(data, int) else len(data)
+        rows.append(
+            {
+                "Event": event_type.__name__,
+                "Batch": batch,
+                "Encoder": name,
+                "Encode events/s": batch / encode_time,
+                "Decode events/s": batch / decode_time,
+                "Bytes/event": size / batch,
+            }
+        )
+    return rows
+
+
+def benchmark_cli():
+    """Command line for the codec benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--repetitions", type=int, default=10_000)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+
+    rows = []
+    for event_type in (DataclassEvent, AttrsEvent, PydanticEvent):
+        rows += benchmark_case(event_type, 1, args.repetitions)
+        rows += benchmark_case(event_type, args.batch, max(1, args.repetitions // args.batch))
+    df = pandas.DataFrame(rows)
+    print(df.to_markdown(index=False, floatfmt=("", "", "", ".0f", ".0f", ".1f")))
+
+
+if __name__ == "__main__":
+    benchmark_cli()
@@ -0,0 +1,99 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Benchmark of columnar batches compared to the emission of one event object per record.
+
+Every case computes the traded quantity of ticks above a price threshold: per object with one emission per tick, with
+columnar batches and a vectorized handler, and with columnar batches and a per-row adapter of the per-object handler.
+"""
+
+import argparse
+import dataclasses
+import time
+
+import numpy
+import pandas
+
+from eventlib import Event, EventSystem
+from eventlib.columnar import ColumnarBatch, per_row
+
+
+@dataclasses.dataclass
+class Tick(Event):
+    """Tick event of the benchmark."""
+
+    price: float
+    quantity: int
+
+
+class TickBatch(ColumnarBatch, row_type=Tick):
+    """Columnar batch of ticks."""
+
+
+class QuantityCounter:
+    """Handlers that sum the quantity of ticks above a threshold."""
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self.quantity = 0
+
+    def on_tick(self, tick: Tick):
+        """Per-object handler."""
+        if tick.price > self.threshold:
+            self.quantity += tick.quantity
+
+    def on_batch(self, batch: TickBatch):
+        """Vectorized handler."""
+        self.quantity += int(batch["quantity"][batch["price"] > self.threshold].sum())
+
+
+def benchmark_case(name: str, records: int, batch_size: int) -> dict:
+    """Measure the records per second of a case."""
+    rng = numpy.random.default_rng(42)
+    prices = rng.uniform(50, 150, records)
+    quantities = rng.integers(1, 100, records)
+    counter = QuantityCounter(100.0)
+    system = EventSystem()
+    if name == "per object":
+        system.subscribe(Tick)(counter.on_tick)
+        ticks = [Tick(p, v) for p, v in zip(prices.tolist(), quantities.tolist())]
+        start = time.perf_counter()
+        for tick in ticks:
+            system.emit(tick)
+    else:
+        system.subscribe(TickBatch)(counter.on_batch if name == "columnar" else per_row(counter.on_tick))
+        batches = [
+            TickBatch(price=prices[i : i + batch_size], quantity=quantities[i : i + batch_size])
+            for i in range(0, records, batch_size)
+        ]
+        start = time.perf_counter()
+        for batch in batches:
+            system.emit(batch)
+    duration = time.perf_counter() - start
+    assert counter.quantity == int(quantities[prices > 100.0].sum())
+    return {
+        "Case": name,
+        "Batch": 1 if name == "per object" else batch_size,
+        "Records/s": records / duration,
+        "µs/record": duration / records * 1e6,
+    }
+
+
+def benchmark_cli():
+    """Command line for the columnar benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=1_000_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 10_000])
+    args = parser.parse_args()
+
+    rows = [benchmark_case("per object", args.n, 1)]
+    for batch_size in args.batch_sizes:
+        rows.append(benchmark_case("columnar", args.n, batch_size))
+        rows.append(benchmark_case("per row adapter", args.n, batch_size))
+    df = pandas.DataFrame(rows)
+    print(df.to_markdown(index=False, floatfmt=("", "", ".0f", ".3f")))
+
+
+if __name__ == "__main__":
+    benchmark_cli()
@@ -0,0 +1,72 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Benchmark of the error policies on the error-free path and on the error path.
+
+Every case subscribes ``handlers`` handlers to an event, on the error path one of them raises an error.
+The benchmark measures the median time of a single emit for each error policy.
+"""
+
+import argparse
+import time
+
+import pandas
+
+from eventlib import ErrorPolicy, Event, EventSystem
+
+
+# pylint: disable=too-few-public-methods
+class BenchEvent(Event):
+    """Event of the benchmark."""
+
+
+def _fail(_: BenchEvent):
+    raise ValueError("benchmark error")
+
+
+POLICIES = {
+    "collect": ErrorPolicy.collect,
+    "fail_fast": ErrorPolicy.fail_fast,
+    "log": lambda: ErrorPolicy.log(lambda exc, sub, event: None),
+    "callback": lambda: ErrorPolicy.callback(lambda exc, sub, event: None),
+}
+
+
+def benchmark_policy(policy: ErrorPolicy, handlers: int, failing: bool, repeat: int) -> float:
+    """Measure the median emit time of an event system with the error policy."""
+    system = EventSystem(error_policy=policy)
+    for i in range(handlers):
+        system.add_subscriber(_fail if failing and i == handlers // 2 else lambda _: None, BenchEvent)
+    event = BenchEvent()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            system.emit(event)
+        except ExceptionGroup:
+            pass
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[repeat // 2]
+
+
+def benchmark_cli():
+    """Command line for the error policy benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--repeat", type=int, default=10000)
+    parser.add_argument("--handlers", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    rows = []
+    for name, factory in POLICIES.items():
+        for handlers in args.handlers:
+            ok = benchmark_policy(factory(), handlers, False, args.repeat)
+            error = benchmark_policy(factory(), handlers, True, args.repeat)
+            rows.append({"Policy": name, "Handlers": handlers, "No error (μs)": ok * 1e6, "Error (μs)": error * 1e6})
+    df = pandas.DataFrame(rows)
+    print(df.to_markdown(index=False, floatfmt=("", ".0f", ".2f", ".2f")))
+
+
+if __name__ == "__main__":
+    benchmark_cli()
@@ -0,0 +1,79 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Benchmark of building event chains for deep and wide (diamond-shaped) event hierarchies.
+
+The hierarchy of a benchmark case with ``depth`` and ``width`` is the following::
+
+    Root <- Level1 <- ... <- Level{depth}   (linear chain of `depth` classes)
+                                  ^
+                  Side0, Side1, ..., Side{width-1}
+                                  ^
+                                 Leaf      (inherits from all `width` side classes)
+
+Every class has one event handler subscribed. The benchmark measures the time to build the chain of the `Leaf` class
+in a fresh event system (first emit) and the time of a single emit afterwards.
+"""
+
+import argparse
+import time
+
+import pandas
+
+from eventlib import Event, EventSystem
+
+
+def build_hierarchy(depth: int, width: int) -> list[type[Event]]:
+    """Build the event classes of a hierarchy with the given depth and width, the leaf class is the last one."""
+    classes: list[type[Event]] = [type("Root", (Event,), {})]
+    for i in range(1, depth):
+        classes.append(type(f"Level{i}", (classes[-1],), {}))
+    tip = classes[-1]
+    sides = [type(f"Side{i}", (tip,), {}) for i in range(width)]
+    classes.extend(sides)
+    classes.append(type("Leaf", tuple(sides), {}))
+    return classes
+
+
+def benchmark_hierarchy(depth: int, width: int, repeat: int) -> tuple[float, float]:
+    """Measure the median chain build time and emit time of a hierarchy."""
+    classes = build_hierarchy(depth, width)
+    leaf = classes[-1]
+    event = leaf()
+    build_times = []
+    emit_times = []
+    for _ in range(repeat):
+        system = EventSystem()
+        for cls in classes:
+            system.subscribe(cls)(lambda _: None)
+        start = time.perf_counter()
+        system.emit(event)
+        build_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        system.emit(event)
+        emit_times.append(time.perf_counter() - start)
+    build_times.sort()
+    emit_times.sort()
+    return build_times[repeat // 2], emit_times[repeat // 2]
+
+
+def benchmark_cli():
+    """Command line for the hierarchy benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--repeat", type=int, default=20)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 5, 10, 20, 50])
+    parser.add_argument("--widths", type=int, nargs="+", default=[1, 5, 10, 20, 50, 100])
+    args = parser.parse_args()
+
+    rows = []
+    for depth in args.depths:
+        for width in args.widths:
+            build, emit = benchmark_hierarchy(depth, width, args.repeat)
+            rows.append({"Depth": depth, "Width": width, "Build (μs)": build * 1e6, "Emit (μs)": emit * 1e6})
+    df = pandas.DataFrame(rows)
+    print(df.to_markdown(index=False, floatfmt=(".0f", ".0f", ".1f", ".1f")))
+
+
+if __name__ == "__main__":
+    benchmark_cli()
@@ -0,0 +1,82 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Benchmark of the overhead of the event journal per emission and the replay throughput.
+
+Every case emits small events in an event system without and with a subscribed journal, with registered and pickled
+events and with and without fsync on group commits, and then replays the journal into an empty event system.
+"""
+
+import argparse
+import dataclasses
+import tempfile
+import time
+
+import pandas
+
+from eventlib import Event, EventSystem
+from eventlib.codec import EventCodec
+from eventlib.journal import EventJournal
+
+
+@dataclasses.dataclass
+class OrderEvent(Event):
+    """Event of the benchmark."""
+
+    order_id: int
+    price: float
+    name: str
+
+
+def _emit(system: EventSystem, events: list[Event]) -> float:
+    start = time.perf_counter()
+    for event in events:
+        system.emit(event)
+    return time.perf_counter() - start
+
+
+def benchmark_case(events: list[Event], registered: bool, fsync: bool, commit_size: int) -> dict:
+    """Measure the emission time with a journal and the replay time of a case."""
+    codec = EventCodec()
+    if registered:
+        codec.register(OrderEvent, 1)
+    with tempfile.TemporaryDirectory() as path:
+        system = EventSystem()
+        system.add_subscriber(lambda _: None, OrderEvent)
+        baseline = _emit(system, events)
+        with EventJournal(path, codec, fsync=fsync, commit_size=commit_size) as journal:
+            journal.subscribe(system)
+            duration = _emit(system, events)
+            replay_start = time.perf_counter()
+            journal.replay(EventSystem())
+            replay = time.perf_counter() - replay_start
+    return {
+        "Codec": "registered" if registered else "pickle",
+        "Fsync": fsync,
+        "Commit size": commit_size,
+        "Overhead µs/event": (duration - baseline) / len(events) * 1e6,
+        "Emit events/s": len(events) / duration,
+        "Replay events/s": len(events) / replay,
+    }
+
+
+def benchmark_cli():
+    """Command line for the journal benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=100_000)
+    parser.add_argument("--commit-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    events: list[Event] = [OrderEvent(order_id=i, price=i / 100, name=f"order-{i}") for i in range(args.n)]
+    rows = [
+        benchmark_case(events, registered, fsync, args.commit_size)
+        for registered in (True, False)
+        for fsync in (False, True)
+    ]
+    df = pandas.DataFrame(rows)
+    print(df.to_markdown(index=False, floatfmt=("", "", "", ".2f", ".0f", ".0f")))
+
+
+if __name__ == "__main__":
+    benchmark_cli()
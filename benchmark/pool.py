@@ -0,0 +1,77 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Benchmark of the emission throughput and the garbage collections of pooled events compared to new events.
+
+Every case creates and emits events in a tight loop, new event objects per emission or acquired from the pool of the
+event class, and counts the garbage collections of all generations during the run.
+"""
+
+import argparse
+import dataclasses
+import gc
+import time
+
+import pandas
+
+from eventlib import EventSystem, PooledEvent
+
+
+@dataclasses.dataclass
+class DictTick(PooledEvent):
+    """Pooled event with an instance dictionary."""
+
+    price: float
+    volume: int
+
+
+@dataclasses.dataclass(slots=True)
+class SlottedTick(PooledEvent):
+    """Pooled slotted event."""
+
+    price: float
+    volume: int
+
+
+def _collections() -> int:
+    return sum(stats["collections"] for stats in gc.get_stats())
+
+
+def benchmark_case(event_type: type[DictTick | SlottedTick], pooled: bool, count: int) -> dict:
+    """Measure the emissions and garbage collections per second of a case."""
+    system = EventSystem()
+    system.subscribe(event_type)(lambda _: None)
+    acquire, emit = event_type.acquire, system.emit
+    collections = _collections()
+    start = time.perf_counter()
+    if pooled:
+        for i in range(count):
+            acquire(1.5, i).emit_in(system)
+    else:
+        for i in range(count):
+            emit(event_type(1.5, i))
+    duration = time.perf_counter() - start
+    return {
+        "Event": event_type.__name__,
+        "Pooled": pooled,
+        "Events/s": count / duration,
+        "GC collections/s": (_collections() - collections) / duration,
+    }
+
+
+def benchmark_cli():
+    """Command line for the pool benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rows = [
+        benchmark_case(event_type, pooled, args.n) for event_type in (DictTick, SlottedTick) for pooled in (False, True)
+    ]
+    df = pandas.DataFrame(rows)
+    print(df.to_markdown(index=False, floatfmt=("", "", ".0f", ".1f")))
+
+
+if __name__ == "__main__":
+    benchmark_cli()
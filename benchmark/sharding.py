@@ -0,0 +1,80 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Benchmark of the scaling of the sharded runtime from one to multiple shards.
+
+Every case publishes events to handlers with CPU-bound work and reports the throughput and the speedup compared to a
+single shard. Thread shards only scale on free-threaded CPython builds, process shards also scale with the GIL.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas
+
+from eventlib import Event, EventSystem
+from eventlib.sharding import ShardedRuntime
+
+
+# pylint: disable=too-few-public-methods
+class BenchEvent(Event):
+    """Event of the benchmark."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: int):
+        self.key = key
+
+
+def _work(event: BenchEvent):
+    """CPU-bound work of a handler."""
+    total = event.key
+    for i in range(2000):
+        total = (total * 31 + i) % 1_000_003
+
+
+def create_system() -> EventSystem:
+    """Factory of the event systems of the shards."""
+    system = EventSystem()
+    system.add_subscriber(_work, BenchEvent)
+    return system
+
+
+def benchmark_shards(mode: str, shards: int, events: int) -> float:
+    """Measure the throughput of the sharded runtime in events per second."""
+    with ShardedRuntime(create_system, shards, key=lambda e: e.key, mode=mode) as runtime:  # type: ignore[arg-type]
+        start = time.perf_counter()
+        for key in range(events):
+            runtime.publish(BenchEvent(key))
+        runtime.drain()
+        return events / (time.perf_counter() - start)
+
+
+def benchmark_cli():
+    """Command line for the sharded runtime benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--events", type=int, default=20_000)
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 1, help="Maximum number of shards")
+    parser.add_argument("--modes", nargs="+", default=["thread", "process"], choices=["thread", "process"])
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    rows = []
+    for mode in args.modes:
+        baseline = None
+        shards = 1
+        while shards <= args.shards:
+            throughput = benchmark_shards(mode, shards, args.events)
+            baseline = baseline or throughput
+            rows.append({"Mode": mode, "Shards": shards, "Events/s": throughput, "Speedup": throughput / baseline})
+            shards *= 2
+    df = pandas.DataFrame(rows)
+    print(df.to_markdown(index=False, floatfmt=("", "", ".0f", ".2f")))
+
+
+if __name__ == "__main__":
+    benchmark_cli()
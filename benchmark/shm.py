@@ -0,0 +1,121 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Benchmark of the transport of events between two processes on the same machine.
+
+Compares `multiprocessing.Queue` with the shared-memory transport, once with pickled events and once with a fixed
+layout. The throughput is measured with bursts of events, the latency with paced events that carry their send time.
+"""
+
+import argparse
+import dataclasses
+import multiprocessing
+import statistics
+import time
+from multiprocessing.queues import Queue
+from typing import Any, Callable
+
+import pandas
+
+from eventlib import Event, EventSystem
+from eventlib.shm import ShmTransport
+
+
+@dataclasses.dataclass
+class Tick(Event):
+    """Event of the benchmark."""
+
+    seq: int
+    sent: float
+
+
+def _record(results, count: int) -> tuple[EventSystem, list[float]]:
+    """Event system of the consumer that reports the latencies after the last event."""
+    system = EventSystem()
+    latencies: list[float] = []
+
+    @system.subscribe(Tick)
+    def handler(event: Tick):
+        latencies.append(time.perf_counter() - event.sent)
+        if len(latencies) == count:
+            results.put(latencies)
+
+    return system, latencies
+
+
+def _consume_queue(events, results, count: int):
+    system, _ = _record(results, count)
+    while (event := events.get()) is not None:
+        system.emit(event)
+
+
+def _consume_shm(transport: ShmTransport, results, count: int):
+    system, _ = _record(results, count)
+    transport.consumer(0).serve(system)
+
+
+def _run(mode: str, count: int, interval: float) -> list[float]:
+    """Send the events to a consumer process and return the latencies that it measured."""
+    results: "Queue[list[float]]" = multiprocessing.Queue()
+    send: Callable[[Tick], Any]
+    if mode == "queue":
+        queue: "Queue[Tick | None]" = multiprocessing.Queue()
+        worker = multiprocessing.Process(target=_consume_queue, args=(queue, results, count))
+        send = queue.put
+    else:
+        transport = ShmTransport(slots=4096, slot_size=128)
+        if mode == "shm (layout)":
+            transport.register(Tick, "<qd", fields=("seq", "sent"))
+        worker = multiprocessing.Process(target=_consume_shm, args=(transport, results, count))
+        send = transport.send
+    worker.start()
+    if mode != "queue":
+        transport.watch(0, worker)
+    for seq in range(count):
+        if interval:
+            time.sleep(interval)
+        send(Tick(seq, time.perf_counter()))
+    latencies = results.get()
+    if mode == "queue":
+        queue.put(None)
+    else:
+        transport.close()
+        transport.unlink()
+    worker.join()
+    return latencies
+
+
+def benchmark_throughput(mode: str, count: int) -> float:
+    """Measure the events per second from the first send until the consumer handled the last event."""
+    start = time.perf_counter()
+    _run(mode, count, 0.0)
+    return count / (time.perf_counter() - start)
+
+
+def benchmark_cli():
+    """Command line for the cross-process transport benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--events", type=int, default=100_000)
+    parser.add_argument("--paced", type=int, default=1000, help="Number of paced events of the latency run")
+    parser.add_argument("--interval", type=float, default=1e-4, help="Pause between paced events in seconds")
+    args = parser.parse_args()
+
+    rows = []
+    for mode in ("queue", "shm (pickle)", "shm (layout)"):
+        throughput = benchmark_throughput(mode, args.events)
+        latencies = sorted(_run(mode, args.paced, args.interval))
+        rows.append(
+            {
+                "Transport": mode,
+                "Events/s": throughput,
+                "Median latency (μs)": statistics.median(latencies) * 1e6,
+                "P99 latency (μs)": latencies[int(len(latencies) * 0.99)] * 1e6,
+            }
+        )
+    df = pandas.DataFrame(rows)
+    print(df.to_markdown(index=False, floatfmt=("", ".0f", ".1f", ".1f")))
+
+
+if __name__ == "__main__":
+    benchmark_cli()
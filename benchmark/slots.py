@@ -0,0 +1,133 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Benchmark of the construction and emission cost and the memory of events with and without `__slots__`.
+
+Every case creates and emits small events of a dataclass or attrs class, with and without slots, and measures the
+allocated bytes per live event with `tracemalloc`. Events without slots have the same layout as all events had before
+the event base classes declared empty `__slots__`.
+"""
+
+import argparse
+import dataclasses
+import timeit
+import tracemalloc
+
+import attrs
+import pandas
+
+from eventlib import BaseEvent, Event, EventSystem
+
+SYSTEM = EventSystem()
+
+
+@dataclasses.dataclass
+class DictEvent(Event):
+    """Dataclass event with an instance dictionary."""
+
+    order_id: int
+    price: float
+
+
+@dataclasses.dataclass(slots=True)
+class SlottedEvent(Event):
+    """Slotted dataclass event."""
+
+    order_id: int
+    price: float
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class FrozenEvent(Event):
+    """Slotted and frozen dataclass event."""
+
+    order_id: int
+    price: float
+
+
+@attrs.define(slots=False)
+class AttrsDictEvent(Event):
+    """Attrs event with an instance dictionary."""
+
+    order_id: int
+    price: float
+
+
+@attrs.define
+class AttrsSlottedEvent(Event):
+    """Slotted attrs event."""
+
+    order_id: int
+    price: float
+
+
+@dataclasses.dataclass
+class DictBaseEvent(BaseEvent, event_system=SYSTEM):
+    """Dataclass event of the global event system with an instance dictionary."""
+
+    order_id: int
+    price: float
+
+
+@dataclasses.dataclass(slots=True)
+class SlottedBaseEvent(BaseEvent, event_system=SYSTEM):
+    """Slotted dataclass event of the global event system."""
+
+    order_id: int
+    price: float
+
+
+EVENT_TYPES = (
+    DictEvent,
+    SlottedEvent,
+    FrozenEvent,
+    AttrsDictEvent,
+    AttrsSlottedEvent,
+    DictBaseEvent,
+    SlottedBaseEvent,
+)
+
+
+def bytes_per_event(event_type: type, count: int) -> float:
+    """Measure the allocated bytes per live event."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        events = [event_type(i, 1.5) for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del events
+    return (after - before) / count - 8  # Without the pointer in the list
+
+
+def benchmark_case(event_type: type, repetitions: int) -> dict:
+    """Measure the construction and emission time and the memory of an event type."""
+    SYSTEM.clear_all_subscriptions()
+    SYSTEM.subscribe(event_type)(lambda _: None)
+    emit = SYSTEM.emit
+    create = min(timeit.repeat(lambda: event_type(1, 1.5), number=repetitions, repeat=5)) / repetitions
+    create_emit = min(timeit.repeat(lambda: emit(event_type(1, 1.5)), number=repetitions, repeat=5)) / repetitions
+    return {
+        "Event": event_type.__name__,
+        "__dict__": hasattr(event_type(1, 1.5), "__dict__"),
+        "Create ns": create * 1e9,
+        "Create + emit ns": create_emit * 1e9,
+        "Bytes/event": bytes_per_event(event_type, 10_000),
+    }
+
+
+def benchmark_cli():
+    """Command line for the slots benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--repetitions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = [benchmark_case(event_type, args.repetitions) for event_type in EVENT_TYPES]
+    df = pandas.DataFrame(rows)
+    print(df.to_markdown(index=False, floatfmt=("", "", ".0f", ".0f", ".0f")))
+
+
+if __name__ == "__main__":
+    benchmark_cli()
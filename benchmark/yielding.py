@@ -0,0 +1,94 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Benchmark of the trade-off between throughput and event loop latency of the yield policies.
+
+Every case emits events to a long chain of synchronous handlers that each do some busy work, while a probe task
+measures how late it is scheduled by the event loop. The benchmark reports the emission throughput and the
+maximum and median lateness of the probe.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import pandas
+
+from eventlib import Event, EventSystem, YieldPolicy
+
+
+# pylint: disable=too-few-public-methods
+class BenchEvent(Event):
+    """Event of the benchmark."""
+
+
+def _busy(seconds: float):
+    """Busy wait without releasing the event loop."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+POLICIES: dict[str, YieldPolicy | None] = {
+    "none": None,
+    "every 100 handlers": YieldPolicy(max_handlers=100),
+    "every 10 handlers": YieldPolicy(max_handlers=10),
+    "every 1 ms": YieldPolicy(max_time=0.001),
+    "every 100 μs": YieldPolicy(max_time=0.0001),
+}
+
+
+async def _probe(lateness: list[float], interval: float):
+    """Measure how late the task is woken up by the event loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lateness.append(max(0.0, loop.time() - expected))
+
+
+async def benchmark_policy(policy: YieldPolicy | None, handlers: int, work: float, events: int) -> tuple:
+    """Measure the throughput and the probe lateness of a yield policy."""
+    system = EventSystem()
+    system.yield_policy = policy
+    for _ in range(handlers):
+        system.add_subscriber(lambda _: _busy(work), BenchEvent)
+    lateness: list[float] = []
+    probe = asyncio.create_task(_probe(lateness, 0.0005))
+    await asyncio.sleep(0.001)
+    start = time.perf_counter()
+    for _ in range(events):
+        await system.emit_async(BenchEvent())
+    duration = time.perf_counter() - start
+    await asyncio.sleep(0.002)  # Let the probe record the last stall
+    probe.cancel()
+    return events / duration, max(lateness, default=0.0), statistics.median(lateness or [0.0])
+
+
+def benchmark_cli():
+    """Command line for the yield policy benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--events", type=int, default=20)
+    parser.add_argument("--handlers", type=int, default=500)
+    parser.add_argument("--work", type=float, default=10e-6, help="Busy work per handler in seconds")
+    args = parser.parse_args()
+
+    rows = []
+    for name, policy in POLICIES.items():
+        throughput, worst, median = asyncio.run(benchmark_policy(policy, args.handlers, args.work, args.events))
+        rows.append(
+            {
+                "Policy": name,
+                "Events/s": throughput,
+                "Max loop lateness (ms)": worst * 1e3,
+                "Median loop lateness (ms)": median * 1e3,
+            }
+        )
+    df = pandas.DataFrame(rows)
+    print(df.to_markdown(index=False, floatfmt=("", ".1f", ".3f", ".3f")))
+
+
+if __name__ == "__main__":
+    benchmark_cli()
@@ -3,6 +3,9 @@
 
 """
 Event library for Python with asyncio support.
+
+The serialization and transport modules are not imported here, they are imported from their modules when needed:
+`eventlib.codec`, `eventlib.journal`, `eventlib.columnar`, `eventlib.shm`, `eventlib.bridge` and `eventlib.sharding`.
 """
 
 from .base import (
@@ -15,11 +18,26 @@ from .base import (
     unsubscribe,
     unsubscribe_all,
 )
+from .breaker import CircuitBreaker, CircuitState
 from .core import Event, EventHandler, EventHandlerDecorator, EventSystem
+from .deadletter import DeadLetter, DeadLetterQueue, FileDeadLetterStore, RetryScheduler
+from .dispatch import PartitionedDispatcher, PartitionStats, PriorityDispatcher
+from .errors import ErrorMode, ErrorPolicy
+from .overlay import OverlayEventSystem
+from .pool import PooledEvent
+from .runner import LoopRunner
+from .scheduler import EventScheduler, ScheduledEvent
+from .tasks import TaskTracker
+from .threadsafe import ThreadsafeEmitter
+from .topic import TopicEvent, TopicRouter
+from .watchdog import BlockingReport, BlockingWatchdog
+from .yielding import YieldPolicy
 
 __all__ = [
     "Event",
     "EventSystem",
+    "OverlayEventSystem",
+    "PooledEvent",
     "EventHandlerDecorator",
     "EventHandler",
     "BaseEvent",
@@ -30,4 +48,25 @@ __all__ = [
     "unsubscribe_all",
     "emit",
     "emit_async",
+    "CircuitBreaker",
+    "CircuitState",
+    "DeadLetter",
+    "DeadLetterQueue",
+    "FileDeadLetterStore",
+    "RetryScheduler",
+    "PartitionedDispatcher",
+    "PartitionStats",
+    "PriorityDispatcher",
+    "ErrorMode",
+    "ErrorPolicy",
+    "EventScheduler",
+    "ScheduledEvent",
+    "LoopRunner",
+    "TaskTracker",
+    "ThreadsafeEmitter",
+    "TopicEvent",
+    "TopicRouter",
+    "BlockingReport",
+    "BlockingWatchdog",
+    "YieldPolicy",
 ]
@@ -9,6 +9,7 @@ You can use the method `set_default_event_system()` to set your own event system
 
 from typing import ClassVar, Self, TypeVar
 
+from eventlib.breaker import CircuitBreaker
 from eventlib.core import Event, EventHandler, EventHandlerDecorator, EventSystem
 
 E = TypeVar("E", bound=Event)
@@ -17,7 +18,13 @@ BASE_EVENT_SYSTEM = EventSystem()
 
 
 class BaseEvent(Event):
-    """Event class that can be extended to create custom events. Use this for the global event system."""
+    """
+    Event class that can be extended to create custom events. Use this for the global event system.
+
+    The event system is bound to the class, so slotted sub-classes have no `__dict__` either.
+    """
+
+    __slots__ = ()
 
     event_system: ClassVar[EventSystem]
 
@@ -30,9 +37,15 @@ class BaseEvent(Event):
         )
 
     @classmethod
-    def subscribe(cls, priority: int = 0, critical: bool = False) -> EventHandlerDecorator[Self]:
+    def subscribe(
+        cls,
+        priority: int = 0,
+        critical: bool = False,
+        timeout: float | None = None,
+        breaker: CircuitBreaker | None = None,
+    ) -> EventHandlerDecorator[Self]:
         """Subscribe to this event."""
-        return cls.event_system.subscribe(cls, priority=priority, critical=critical)
+        return cls.event_system.subscribe(cls, priority=priority, critical=critical, timeout=timeout, breaker=breaker)
 
     @classmethod
     def unsubscribe(cls, func: EventHandler[Self]):
@@ -49,9 +62,9 @@ class BaseEvent(Event):
         self.event_system.emit(self)
         return self
 
-    async def emit_async(self) -> Self:
-        """Emit this event asynchronously."""
-        await self.event_system.emit_async(self)
+    async def emit_async(self, timeout: float | None = None) -> Self:
+        """Emit this event asynchronously, optionally within a total time budget in seconds."""
+        await self.event_system.emit_async(self, timeout)
         return self
 
 
@@ -77,9 +90,11 @@ def get_event_system() -> EventSystem:
     return BASE_EVENT_SYSTEM
 
 
-def subscribe(priority: int = 0, critical: bool = False) -> EventHandlerDecorator[E]:
+def subscribe(
+    priority: int = 0, critical: bool = False, timeout: float | None = None, breaker: CircuitBreaker | None = None
+) -> EventHandlerDecorator[E]:
     """Subscribe to an event in the global event system."""
-    return BASE_EVENT_SYSTEM.subscribe(priority=priority, critical=critical)
+    return BASE_EVENT_SYSTEM.subscribe(priority=priority, critical=critical, timeout=timeout, breaker=breaker)
 
 
 def unsubscribe(func: EventHandler[Event]):
@@ -97,6 +112,6 @@ def emit(event: E) -> None:
     BASE_EVENT_SYSTEM.emit(event)
 
 
-async def emit_async(event: E) -> None:
-    """Emit an event in the global event system asynchronously."""
-    await BASE_EVENT_SYSTEM.emit_async(event)
+async def emit_async(event: E, timeout: float | None = None) -> None:
+    """Emit an event in the global event system asynchronously, optionally within a total time budget in seconds."""
+    await BASE_EVENT_SYSTEM.emit_async(event, timeout)
@@ -0,0 +1,169 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Circuit breaker for slow or failing event handlers.
+
+A circuit breaker is attached to a subscription with ``system.subscribe(breaker=CircuitBreaker())``.
+It counts the failed and slow calls of the handler in a rolling window. If the failure rate exceeds the threshold,
+the circuit opens and the handler is skipped until the reset timeout elapsed. Then some trial calls are allowed
+(half-open), and if they succeed the circuit closes again.
+"""
+
+import collections
+import enum
+import time
+from typing import Callable
+
+
+class CircuitState(enum.Enum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    """The handler is called."""
+    OPEN = "open"
+    """The handler is skipped."""
+    HALF_OPEN = "half_open"
+    """A limited number of trial calls are allowed."""
+
+
+# pylint: disable=too-many-instance-attributes
+class CircuitBreaker:
+    """Circuit breaker of an event subscription driven by the error rate and the latency of the handler."""
+
+    __slots__ = (
+        "failure_rate",
+        "slow_call_duration",
+        "min_calls",
+        "reset_timeout",
+        "half_open_calls",
+        "on_state_change",
+        "_clock",
+        "_state",
+        "_window",
+        "_failures",
+        "_open_until",
+        "_trials",
+        "_successes",
+    )
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        failure_rate: float = 0.5,
+        slow_call_duration: float | None = None,
+        window: int = 20,
+        min_calls: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_calls: int = 1,
+        on_state_change: Callable[["CircuitBreaker", CircuitState, CircuitState], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Create a new circuit breaker.
+
+        :param failure_rate: The rate of failed calls in the window that opens the circuit (default = 0.5)
+        :param slow_call_duration: Calls that take longer than this in seconds count as failed (optional)
+        :param window: The number of recent calls that are considered (default = 20)
+        :param min_calls: The minimum number of calls in the window before the circuit can open (default = 5)
+        :param reset_timeout: The seconds the circuit stays open before trial calls are allowed (default = 30.0)
+        :param half_open_calls: The number of successful trial calls that close the circuit (default = 1)
+        :param on_state_change: Hook that is called with the breaker, the old and the new state (optional)
+        :param clock: The monotonic clock (default = time.monotonic)
+        """
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.on_state_change = on_state_change
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._window: collections.deque[bool] = collections.deque(maxlen=window)
+        self._failures = 0
+        self._open_until = 0.0
+        self._trials = 0
+        self._successes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """The current state of the circuit."""
+        return self._state
+
+    def _set_state(self, state: CircuitState):
+        """Change the state and report it to the hook."""
+        old = self._state
+        self._state = state
+        self._window.clear()
+        self._failures = 0
+        self._trials = 0
+        self._successes = 0
+        if state is CircuitState.OPEN:
+            self._open_until = self._clock() + self.reset_timeout
+        if self.on_state_change is not None and old is not state:
+            self.on_state_change(self, old, state)
+
+    def allow(self) -> bool:
+        """Check if the handler may be called."""
+        if self._state is CircuitState.CLOSED:
+            return True
+        if self._state is CircuitState.OPEN:
+            if self._clock() < self._open_until:
+                return False
+            self._set_state(CircuitState.HALF_OPEN)
+        if self._trials >= self.half_open_calls:
+            return False
+        self._trials += 1
+        return True
+
+    def record(self, duration: float, failed: bool):
+        """
+        Record the outcome of a call.
+
+        :param duration: The duration of the call in seconds.
+        :param failed: True if the call raised an error.
+        """
+        if self.slow_call_duration is not None and duration > self.slow_call_duration:
+            failed = True
+        match self._state:
+            case CircuitState.CLOSED:
+                window = self._window
+                if len(window) == window.maxlen:
+                    self._failures -= window[0]
+                window.append(failed)
+                self._failures += failed
+                if len(window) >= self.min_calls and self._failures >= self.failure_rate * len(window):
+                    self._set_state(CircuitState.OPEN)
+            case CircuitState.HALF_OPEN:
+                if failed:
+                    self._set_state(CircuitState.OPEN)
+                else:
+                    self._successes += 1
+                    if self._successes >= self.half_open_calls:
+                        self._set_state(CircuitState.CLOSED)
+            case _:
+                pass  # Calls that started before the circuit opened
+
+    def release(self):
+        """Release the permit of a call that was cancelled before its outcome was known, e.g. a trial call."""
+        if self._state is CircuitState.HALF_OPEN and self._trials > 0:
+            self._trials -= 1
+
+    def reset(self):
+        """Close the circuit manually."""
+        self._set_state(CircuitState.CLOSED)
+
+    def replicate(self) -> "CircuitBreaker":
+        """Create a new closed circuit breaker with the same configuration, e.g. for a replica of the handler."""
+        assert self._window.maxlen is not None
+        return CircuitBreaker(
+            failure_rate=self.failure_rate,
+            slow_call_duration=self.slow_call_duration,
+            window=self._window.maxlen,
+            min_calls=self.min_calls,
+            reset_timeout=self.reset_timeout,
+            half_open_calls=self.half_open_calls,
+            on_state_change=self.on_state_change,
+            clock=self._clock,
+        )
@@ -0,0 +1,392 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Bridge that forwards events over TCP or Unix domain sockets to event systems in other processes or hosts.
+
+The client subscribes to event types of the local event system and streams the events in batches to the server,
+which emits them in the remote event system::
+
+    codec = EventCodec(allow_pickle=False)
+    codec.register(OrderCreated, 1)
+    codec.register(OrderCancelled, 2)
+
+    # Remote service
+    async with BridgeServer(remote_system, port=9000, loads=codec.loads):
+        ...
+
+    # Local service
+    async with BridgeClient(host="remote", port=9000, dumps=codec.dumps) as client:
+        client.subscribe(system, OrderCreated, OrderCancelled)
+        await system.emit_async(OrderCreated(order_id=42))
+
+The server decodes the data of every client that can connect to it. Only decode with `pickle.loads` if all clients
+are trusted, unpickling executes arbitrary code.
+
+Each batch is sent as one frame with a 4 byte length prefix. While a connection is busy writing, the following events
+are coalesced into the next batch. The client keeps a pool of connections, reconnects with exponential backoff and
+buffers the events in the meantime, up to a maximum. Events in the socket buffers of a broken connection may be lost.
+"""
+
+import asyncio
+import collections
+import logging
+import pickle
+import struct
+from typing import Any, Callable, Self
+
+from eventlib.core import Event, EventSystem
+
+logger = logging.getLogger(__name__)
+
+_FRAME_HEADER = struct.Struct("!I")
+
+
+def _dumps(events: list[Event]) -> bytes:
+    return pickle.dumps(events, pickle.HIGHEST_PROTOCOL)
+
+
+# pylint: disable=too-many-instance-attributes
+class BridgeServer:
+    """
+    Server that receives the events of bridge clients and emits them in the event system.
+
+    A connection is read only after the previous batch was emitted, so slow handlers push back to the clients.
+    Errors of handlers are passed to the error handler, by default they are logged.
+    """
+
+    __slots__ = (
+        "system",
+        "host",
+        "port",
+        "path",
+        "loads",
+        "max_frame_size",
+        "error_handler",
+        "_server",
+        "_connections",
+    )
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        system: EventSystem,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        loads: Callable[[bytes], list[Event]],
+        path: str | None = None,
+        max_frame_size: int = 16 * 1024 * 1024,
+        error_handler: Callable[[Exception], None] | None = None,
+    ) -> None:
+        """
+        Create a new bridge server.
+
+        :param system: The event system to emit the received events in.
+        :param host: The host to listen on (default = "127.0.0.1")
+        :param port: The TCP port to listen on (default = 0, a free port)
+        :param loads: The function that decodes a batch of events, e.g. `EventCodec.loads`.
+        :param path: The path of the Unix domain socket to listen on instead of TCP (optional)
+        :param max_frame_size: The maximum bytes of a batch, larger frames close the connection (default = 16 MiB)
+        :param error_handler: The handler of errors that occurred while emitting (default = log the errors)
+        """
+        self.system = system
+        self.host = host
+        self.port = port
+        self.path = path
+        self.loads = loads
+        self.max_frame_size = max_frame_size
+        self.error_handler = error_handler or self._log_error
+        self._server: asyncio.Server | None = None
+        self._connections: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    @staticmethod
+    def _log_error(exc: Exception):
+        logger.error("Error while emitting bridged events", exc_info=exc)
+
+    @property
+    def address(self) -> Any:
+        """The address that the server listens on, the (host, port) or the path of the socket."""
+        if self._server is None:
+            raise RuntimeError("Server is not started")
+        return self._server.sockets[0].getsockname()
+
+    async def start(self):
+        """Start listening for connections."""
+        if self.path is not None:
+            self._server = await asyncio.start_unix_server(self._serve, self.path)
+        else:
+            self._server = await asyncio.start_server(self._serve, self.host, self.port)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Receive and emit the batches of a connection until it is closed."""
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    (size,) = _FRAME_HEADER.unpack(await reader.readexactly(_FRAME_HEADER.size))
+                    if size > self.max_frame_size:
+                        self.error_handler(ValueError(f"Frame of {size} bytes exceeds the maximum frame size"))
+                        return
+                    payload = await reader.readexactly(size)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                try:
+                    await self.system.emit_many_async(self.loads(payload))
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    self.error_handler(exc)
+        finally:
+            del self._connections[task]
+            writer.close()
+
+    async def close(self):
+        """Stop listening and close all connections."""
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in self._connections.values():
+            writer.close()  # The connections stop at the end of the stream
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+
+# pylint: disable=too-many-instance-attributes
+class BridgeClient:
+    """
+    Client that sends events in batches over a pool of connections to a bridge server.
+
+    With a single connection the events arrive in order. With more connections the batches are sent concurrently and
+    may overtake each other. Connection errors are passed to the error handler, by default they are logged.
+    """
+
+    __slots__ = (
+        "host",
+        "port",
+        "path",
+        "connections",
+        "maxsize",
+        "batch_size",
+        "dumps",
+        "base_delay",
+        "max_delay",
+        "error_handler",
+        "sent",
+        "dropped",
+        "reconnects",
+        "_buffer",
+        "_ready",
+        "_space",
+        "_idle",
+        "_in_flight",
+        "_workers",
+    )
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int | None = None,
+        *,
+        path: str | None = None,
+        connections: int = 1,
+        maxsize: int = 10000,
+        batch_size: int = 1000,
+        dumps: Callable[[list[Event]], bytes] = _dumps,
+        base_delay: float = 0.1,
+        max_delay: float = 5.0,
+        error_handler: Callable[[Exception], None] | None = None,
+    ) -> None:
+        """
+        Create a new bridge client, the connections are opened on start.
+
+        :param host: The host of the server (default = "127.0.0.1")
+        :param port: The TCP port of the server (optional if a path is given)
+        :param path: The path of the Unix domain socket of the server instead of TCP (optional)
+        :param connections: The number of connections of the pool (default = 1)
+        :param maxsize: The maximum number of buffered events (default = 10000)
+        :param batch_size: The maximum number of events per frame (default = 1000)
+        :param dumps: The function that encodes a batch of events (default = pickle.dumps)
+        :param base_delay: The seconds to wait before the first reconnection attempt (default = 0.1)
+        :param max_delay: The maximum seconds to wait between reconnection attempts (default = 5.0)
+        :param error_handler: The handler of connection and encoding errors (default = log the errors)
+        """
+        if port is None and path is None:
+            raise ValueError("A bridge client requires a port or a path")
+        self.host = host
+        self.port = port
+        self.path = path
+        self.connections = connections
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.dumps = dumps
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.error_handler = error_handler or self._log_error
+        self.sent = 0
+        """Number of events that were written to a connection."""
+        self.dropped = 0
+        """Number of events that were dropped, because their batch could not be encoded or sent before closing."""
+        self.reconnects = 0
+        """Number of failed connection attempts and broken connections."""
+        self._buffer: collections.deque[Event] = collections.deque()
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._in_flight = 0
+        self._workers: list[asyncio.Task] = []
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @staticmethod
+    def _log_error(exc: Exception):
+        logger.warning("Bridge client failed: %s", exc)
+
+    def subscribe(self, system: EventSystem, *event_types: type[Event], priority: int = 0):
+        """
+        Forward the emitted events of the given types in the event system to the server.
+
+        :param system: The local event system.
+        :param event_types: The event types to forward, including their sub-types (default = all events)
+        :param priority: The priority of the forwarding handler (default = 0)
+        """
+        for event_type in event_types or (Event,):
+            system.add_subscriber(self.send, event_type, priority=priority)
+
+    def send(self, event: Event):
+        """Buffer an event for sending, raises `asyncio.QueueFull` if the buffer is full."""
+        if len(self._buffer) >= self.maxsize:
+            self._space.clear()
+            raise asyncio.QueueFull(f"Maximum of {self.maxsize} buffered events reached")
+        self._buffer.append(event)
+        self._idle.clear()
+        self._ready.set()
+
+    async def publish(self, event: Event):
+        """Buffer an event for sending, waits if the buffer is full (backpressure)."""
+        while len(self._buffer) >= self.maxsize:
+            self._space.clear()
+            await self._space.wait()
+        self.send(event)
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        if self.path is not None:
+            _, writer = await asyncio.open_unix_connection(self.path)
+        else:
+            _, writer = await asyncio.open_connection(self.host, self.port)
+        return writer
+
+    async def _take(self) -> list[Event]:
+        """Wait for the next batch of events."""
+        buffer = self._buffer
+        while not buffer:
+            self._ready.clear()
+            await self._ready.wait()
+        batch = [buffer.popleft() for _ in range(min(self.batch_size, len(buffer)))]
+        self._in_flight += len(batch)
+        self._space.set()
+        return batch
+
+    def _done(self, count: int):
+        """Mark the events of a batch that was taken as sent or dropped."""
+        self._in_flight -= count
+        if not self._buffer and not self._in_flight:
+            self._idle.set()
+
+    async def _work(self):
+        """Send the batches over one connection, reconnect with exponential backoff if it breaks."""
+        writer: asyncio.StreamWriter | None = None
+        try:
+            while True:
+                batch = await self._take()
+                try:
+                    payload = self.dumps(batch)
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    self.dropped += len(batch)
+                    self.error_handler(exc)
+                    self._done(len(batch))
+                    continue
+                header = _FRAME_HEADER.pack(len(payload))
+                delay = self.base_delay
+                while True:
+                    try:
+                        if writer is None:
+                            writer = await self._connect()
+                        writer.writelines((header, payload))
+                        await writer.drain()
+                        break
+                    except OSError as exc:
+                        self.reconnects += 1
+                        self.error_handler(exc)
+                        if writer is not None:
+                            writer.close()
+                            writer = None
+                        await asyncio.sleep(delay)
+                        delay = min(delay * 2, self.max_delay)
+                self.sent += len(batch)
+                self._done(len(batch))
+        finally:
+            if writer is not None:
+                writer.close()
+
+    async def start(self):
+        """Start the connections of the pool."""
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._work(), name=f"eventlib-bridge-{i}") for i in range(self.connections)
+            ]
+
+    async def flush(self, timeout: float | None = None) -> bool:
+        """
+        Wait until all buffered events are written to a connection.
+
+        :param timeout: The maximum seconds to wait (optional)
+        :return: True if all events were written, False if the timeout expired.
+        """
+        try:
+            async with asyncio.timeout(timeout):
+                await self._idle.wait()
+        except TimeoutError:
+            return False
+        return True
+
+    async def close(self, timeout: float | None = 5.0):
+        """
+        Send the buffered events and close the connections.
+
+        The events that were not written until the timeout expired, e.g. while the server is unreachable,
+        are counted in `dropped`.
+
+        :param timeout: The maximum seconds to wait for the buffered events to be written (default = 5.0)
+        """
+        if self._workers:
+            await self.flush(timeout)
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if unsent := len(self._buffer) + self._in_flight:
+            self.dropped += unsent
+            self._buffer.clear()
+            self._in_flight = 0
+            self._idle.set()
+            self._space.set()
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
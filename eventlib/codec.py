@@ -0,0 +1,252 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Compact binary codec of events for queues, bridges and journals.
+
+Every event class is registered with a type id. The codec reads the fields of dataclasses, attrs classes and pydantic
+models and generates a `struct` layout for the fields of primitive types (bool, int, float). Strings and bytes are
+length-prefixed, all other fields are pickled together::
+
+    codec = EventCodec()
+    codec.register(OrderCreated, 1)
+
+    buffer = bytearray(1024)
+    end = codec.encode_into(OrderCreated(order_id=42, price=9.99), buffer)
+    event, end = codec.decode_from(buffer)
+
+Events of unregistered classes are pickled as a whole. The batch functions `dumps()` and `loads()` can be used as
+encoder and decoder of the socket bridge. Unpickling untrusted data executes arbitrary code, so a codec that decodes
+data from the network should not allow pickles::
+
+    codec = EventCodec(allow_pickle=False)  # Only registered events with str, bytes and primitive fields
+"""
+
+import dataclasses
+import pickle
+import struct
+import typing
+from typing import Any, Callable, Iterable
+
+from eventlib.core import Event
+
+Buffer = bytearray | memoryview
+
+_TYPE_ID = struct.Struct("<H")
+_LENGTH = struct.Struct("<I")
+_PICKLED_TYPE_ID = 0
+
+_PRIMITIVE_FORMATS: dict[Any, str] = {bool: "?", int: "q", float: "d"}
+_SIZED_TYPES = (str, bytes)
+
+
+def _event_fields(event_type: type) -> tuple[list[tuple[str, Any]], Callable[..., Any]]:
+    """Get the names and types of the fields and the factory of a dataclass, attrs class or pydantic model."""
+    if model_fields := getattr(event_type, "model_fields", None):  # Pydantic
+        return [(name, info.annotation) for name, info in model_fields.items()], getattr(event_type, "model_construct")
+    if dataclasses.is_dataclass(event_type):
+        hints = typing.get_type_hints(event_type)
+        return [(f.name, hints.get(f.name, f.type)) for f in dataclasses.fields(event_type) if f.init], event_type
+    if (attributes := getattr(event_type, "__attrs_attrs__", None)) is not None:  # Attrs
+        hints = typing.get_type_hints(event_type)
+        return [(a.name, hints.get(a.name, a.type)) for a in attributes if a.init], event_type
+    raise TypeError(f"{event_type.__name__} is not a dataclass, attrs class or pydantic model")
+
+
+class BufferTooSmallError(ValueError):
+    """A fixed buffer is too small for an encoded event, nothing was written."""
+
+
+def _reserve(buffer: Buffer, end: int):
+    """Grow a bytearray to the end offset, or fail if a fixed buffer is too small."""
+    if len(buffer) >= end:
+        return
+    if not isinstance(buffer, bytearray):
+        raise BufferTooSmallError(f"Buffer of {len(buffer)} bytes is too small, {end} bytes required")
+    buffer.extend(bytes(max(end - len(buffer), len(buffer))))  # Grow at least twofold
+
+
+# pylint: disable=too-many-locals
+def _generate(event_type: type, type_id: int) -> tuple[Callable, Callable]:
+    """
+    Generate the encoder and decoder of an event class.
+
+    The header packs the type id, the primitive fields and the lengths of the sized and pickled fields with one
+    `struct` call. The encoded strings, bytes and pickle follow the header.
+    """
+    fields, factory = _event_fields(event_type)
+    fixed = [name for name, tp in fields if tp in _PRIMITIVE_FORMATS]
+    sized = [(name, tp) for name, tp in fields if tp in _SIZED_TYPES]
+    pickled = [name for name, tp in fields if tp not in _PRIMITIVE_FORMATS and tp not in _SIZED_TYPES]
+    chunks = [f"c{i}" for i in range(len(sized) + bool(pickled))]
+    header = struct.Struct(
+        "<H" + "".join(_PRIMITIVE_FORMATS[tp] for _, tp in fields if tp in _PRIMITIVE_FORMATS) + "I" * len(chunks)
+    )
+    lines = ["def encode_into(event, buffer, offset):"]
+    lines += [f"    c{i} = event.{name}{'.encode()' if tp is str else ''}" for i, (name, tp) in enumerate(sized)]
+    if pickled:
+        lines.append(f"    {chunks[-1]} = dumps(({''.join(f'event.{name}, ' for name in pickled)}), HIGHEST_PROTOCOL)")
+    lines += [f"    n{i} = len({chunk})" for i, chunk in enumerate(chunks)]
+    lines += [
+        f"    end = offset + {header.size}{''.join(f' + n{i}' for i in range(len(chunks)))}",
+        "    if len(buffer) < end:",
+        "        reserve(buffer, end)",
+        f"    pack_into(buffer, offset, {type_id}{''.join(f', event.{name}' for name in fixed)}"
+        f"{''.join(f', n{i}' for i in range(len(chunks)))})",
+        f"    offset += {header.size}",
+    ]
+    for i, chunk in enumerate(chunks):
+        lines += [f"    buffer[offset : offset + n{i}] = {chunk}", f"    offset += n{i}"]
+    lines.append("    return end")
+
+    values = [f"v{i}" for i in range(len(fixed) + len(sized) + len(pickled))]
+    lengths = [f"n{i}" for i in range(len(chunks))]
+    lines += [
+        "def decode_from(buffer, offset):",
+        f"    _, {''.join(f'{v}, ' for v in values[: len(fixed)] + lengths)}= unpack_from(buffer, offset)",
+        f"    offset += {header.size}",
+    ]
+    for i, (_, tp) in enumerate(sized):
+        decode = "str({}, 'utf-8')" if tp is str else "bytes({})"
+        lines += [
+            f"    {values[len(fixed) + i]} = {decode.format(f'buffer[offset : offset + n{i}]')}",
+            f"    offset += n{i}",
+        ]
+    if pickled:
+        targets = "".join(f"{v}, " for v in values[len(fixed) + len(sized) :])
+        lines += [
+            f"    {targets}= loads(buffer[offset : offset + {lengths[-1]}])",
+            f"    offset += {lengths[-1]}",
+        ]
+    names = fixed + [name for name, _ in sized] + pickled
+    lines.append(f"    return factory({', '.join(f'{name}={v}' for name, v in zip(names, values))}), offset")
+
+    namespace: dict[str, Any] = {
+        "factory": factory,
+        "pack_into": header.pack_into,
+        "unpack_from": header.unpack_from,
+        "reserve": _reserve,
+        "dumps": pickle.dumps,
+        "loads": pickle.loads,
+        "HIGHEST_PROTOCOL": pickle.HIGHEST_PROTOCOL,
+    }
+    exec("\n".join(lines), namespace)  # pylint: disable=exec-used
+    return namespace["encode_into"], namespace["decode_from"]
+
+
+class EventCodec:
+    """
+    Registry of the binary encoders and decoders of event classes.
+
+    The type ids must be the same on both sides, the type id 0 is reserved for pickled events.
+    """
+
+    __slots__ = ("allow_pickle", "_encoders", "_decoders")
+
+    def __init__(self, allow_pickle: bool = True) -> None:
+        """
+        Create a new codec.
+
+        :param allow_pickle: If False, only registered events without pickled fields are supported (default = True)
+        """
+        self.allow_pickle = allow_pickle
+        self._encoders: dict[type, Callable[[Any, Buffer, int], int]] = {}
+        self._decoders: dict[int, Callable[[Buffer, int], tuple[Any, int]]] = {}
+
+    def register(self, event_type: type[Event], type_id: int) -> type[Event]:
+        """
+        Register an event class with a type id and generate its encoder and decoder.
+
+        Sub-classes are not included, they need their own registration.
+
+        :param event_type: The dataclass, attrs class or pydantic model of the event.
+        :param type_id: The type id, from 1 to 65535.
+        :return: The event class.
+        """
+        if not 0 < type_id <= 0xFFFF:
+            raise ValueError(f"Type id {type_id} out of range 1 to 65535")
+        if type_id in self._decoders or event_type in self._encoders:
+            raise ValueError(f"Event {event_type.__name__} or type id {type_id} is already registered")
+        if not self.allow_pickle:
+            fields, _ = _event_fields(event_type)
+            if pickled := [name for name, tp in fields if tp not in _PRIMITIVE_FORMATS and tp not in _SIZED_TYPES]:
+                raise TypeError(f"Fields {pickled} of {event_type.__name__} require pickle, which is not allowed")
+        self._encoders[event_type], self._decoders[type_id] = _generate(event_type, type_id)
+        return event_type
+
+    def encode_into(self, event: Event, buffer: Buffer, offset: int = 0) -> int:
+        """
+        Encode an event into a buffer. A `bytearray` grows if necessary, otherwise `BufferTooSmallError` is raised.
+
+        :param event: The event.
+        :param buffer: The buffer to write into.
+        :param offset: The offset in the buffer (default = 0)
+        :return: The offset after the encoded event.
+        """
+        if (encode_into := self._encoders.get(type(event))) is not None:
+            return encode_into(event, buffer, offset)
+        if not self.allow_pickle:
+            raise TypeError(f"Event {type(event).__name__} is not registered and pickle is not allowed")
+        data = pickle.dumps(event, pickle.HIGHEST_PROTOCOL)
+        end = offset + _TYPE_ID.size + _LENGTH.size + len(data)
+        _reserve(buffer, end)
+        _TYPE_ID.pack_into(buffer, offset, _PICKLED_TYPE_ID)
+        _LENGTH.pack_into(buffer, offset + _TYPE_ID.size, len(data))
+        buffer[end - len(data) : end] = data
+        return end
+
+    def decode_from(self, buffer: Buffer, offset: int = 0) -> tuple[Event, int]:
+        """
+        Decode an event from a buffer, without copying the fields that are read directly.
+
+        :param buffer: The buffer to read from.
+        :param offset: The offset in the buffer (default = 0)
+        :return: The event and the offset after the encoded event.
+        """
+        (type_id,) = _TYPE_ID.unpack_from(buffer, offset)
+        if type_id == _PICKLED_TYPE_ID:
+            if not self.allow_pickle:
+                raise ValueError("Pickled event is not allowed")
+            (size,) = _LENGTH.unpack_from(buffer, offset + _TYPE_ID.size)
+            start = offset + _TYPE_ID.size + _LENGTH.size
+            return pickle.loads(memoryview(buffer)[start : start + size]), start + size
+        if (decode_from := self._decoders.get(type_id)) is None:
+            raise ValueError(f"Unknown type id {type_id}")
+        return decode_from(buffer, offset)
+
+    def encode(self, event: Event) -> bytes:
+        """Encode an event into bytes."""
+        buffer = bytearray()
+        end = self.encode_into(event, buffer)
+        return bytes(memoryview(buffer)[:end])
+
+    def decode(self, data: Buffer | bytes) -> Event:
+        """Decode an event from bytes."""
+        return self.decode_from(memoryview(data))[0]
+
+    def dumps(self, events: Iterable[Event]) -> bytes:
+        """Encode a batch of events into bytes, prefixed with their number."""
+        buffer = bytearray(_LENGTH.size)
+        end = _LENGTH.size
+        count = 0
+        for event in events:
+            end = self.encode_into(event, buffer, end)
+            count += 1
+        _LENGTH.pack_into(buffer, 0, count)
+        return bytes(memoryview(buffer)[:end])
+
+    def loads(self, data: Buffer | bytes) -> list[Event]:
+        """Decode a batch of events from bytes."""
+        view = memoryview(data)
+        (count,) = _LENGTH.unpack_from(view, 0)
+        offset = _LENGTH.size
+        events = []
+        decoders = self._decoders
+        unpack_type_id = _TYPE_ID.unpack_from
+        for _ in range(count):
+            if (decode_from := decoders.get(unpack_type_id(view, offset)[0])) is None:
+                event, offset = self.decode_from(view, offset)
+            else:
+                event, offset = decode_from(view, offset)
+            events.append(event)
+        return events
@@ -0,0 +1,181 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Columnar batches of high-frequency numeric events, stored as one NumPy array per field.
+
+Emitting one event object per record is too slow for millions of small records per second. A columnar batch carries
+many records at once, so the event chain is called once per batch and the handlers work on whole columns::
+
+    class TickBatch(ColumnarBatch, row_type=Tick):
+        pass
+
+    @system.subscribe()
+    def on_ticks(batch: TickBatch):
+        vwap = (batch["price"] * batch["volume"]).sum() / batch["volume"].sum()
+
+    system.subscribe(TickBatch)(per_row(on_tick, lambda b: b["price"] > 100))
+    system.emit(TickBatch(price=prices, volume=volumes))
+
+Batches are ordinary events, so the handlers are ordered by priority and may use contexts like every other handler.
+Handlers of single events are adapted with `per_row()`, filters are boolean masks over the columns.
+
+NumPy is an optional dependency (extra `numpy`), it is imported when the first batch is created.
+"""
+
+import importlib
+import inspect
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Iterable, Iterator, Mapping, Self, Sequence
+
+from eventlib.codec import _event_fields
+from eventlib.core import Event, EventHandler
+
+if TYPE_CHECKING:
+    import numpy
+
+
+def _numpy():
+    """Import numpy on first use, so that importing the module does not pay for it."""
+    try:
+        return importlib.import_module("numpy")
+    except ImportError as exc:  # pragma: no cover
+        raise ImportError("Columnar batches require numpy, install the extra `eventlib-py[numpy]`") from exc
+
+
+Predicate = Callable[[Any], Any]
+"""Function that returns a boolean mask over the rows of a batch."""
+
+
+class ColumnarBatch(Event):
+    """
+    Batch of records with one NumPy array per field, all of the same length.
+
+    Extend it with the `row_type` class argument to convert the batch to single events and back.
+    """
+
+    __slots__ = ("columns",)
+
+    row_type: ClassVar[type[Event] | None] = None
+    """The event class of a single record (optional)"""
+
+    def __init_subclass__(cls, row_type: type[Event] | None = None, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if row_type is not None:
+            cls.row_type = row_type
+
+    def __init__(self, columns: Mapping[str, Any] | None = None, /, **kwargs: Any) -> None:
+        """
+        Create a new batch, the columns are converted to arrays without copying if possible.
+
+        :param columns: The columns by field name (optional)
+        :param kwargs: More columns by field name.
+        """
+        asarray = _numpy().asarray
+        self.columns: dict[str, "numpy.ndarray"] = {
+            name: asarray(values) for name, values in {**(columns or {}), **kwargs}.items()
+        }
+        if len({len(column) for column in self.columns.values()}) > 1:
+            raise ValueError("The columns of a batch must have the same length")
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Event], fields: Sequence[str] | None = None) -> Self:
+        """
+        Create a batch from single events.
+
+        :param rows: The events.
+        :param fields: The fields to store (default = the fields of the row type)
+        :return: The new batch.
+        """
+        if fields is None:
+            if cls.row_type is None:
+                raise TypeError(f"{cls.__name__} has no row type, the fields are required")
+            fields = [name for name, _ in _event_fields(cls.row_type)[0]]
+        rows = list(rows)
+        return cls({name: [getattr(row, name) for row in rows] for name in fields})
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, name: str) -> "numpy.ndarray":
+        return self.columns[name]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(len={len(self)}, fields={list(self.columns)})"
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """The names of the columns."""
+        return tuple(self.columns)
+
+    def select(self, rows: Any) -> Self:
+        """
+        Select rows of the batch. Slices are views of the columns, masks and indices copy the rows.
+
+        :param rows: A boolean mask, an array of indices or a slice.
+        :return: A batch of the same type with the selected rows.
+        """
+        return type(self)({name: column[rows] for name, column in self.columns.items()})
+
+    def filter(self, predicate: Predicate) -> Self:
+        """
+        Select the rows that match a predicate.
+
+        :param predicate: The function that returns the boolean mask of the rows, e.g. ``lambda b: b["price"] > 100``
+        :return: A batch of the same type with the matching rows.
+        """
+        return self.select(predicate(self))
+
+    def rows(self) -> Iterator[Event]:
+        """Iterate over the records of the batch as single events of the row type."""
+        row_type = self.row_type
+        if row_type is None:
+            raise TypeError(f"{type(self).__name__} has no row type")
+        names = tuple(self.columns)
+        for values in zip(*(column.tolist() for column in self.columns.values())):
+            yield row_type(**dict(zip(names, values)))  # pylint: disable=not-callable
+
+
+def per_row(handler: EventHandler, predicate: Predicate | None = None) -> EventHandler[ColumnarBatch]:
+    """
+    Adapt a handler of single events to a handler of columnar batches, that calls it for every row.
+
+    :param handler: The synchronous or asynchronous handler of single events of the row type.
+    :param predicate: The function that returns the boolean mask of the rows to handle (default = all rows)
+    :return: The handler of batches.
+    """
+    if inspect.iscoroutinefunction(handler):
+
+        async def handle_rows_async(batch: ColumnarBatch):
+            for row in (batch if predicate is None else batch.filter(predicate)).rows():
+                await handler(row)
+
+        return handle_rows_async
+
+    def handle_rows(batch: ColumnarBatch):
+        for row in (batch if predicate is None else batch.filter(predicate)).rows():
+            handler(row)
+
+    return handle_rows
+
+
+def filtered(handler: EventHandler, predicate: Predicate) -> EventHandler[ColumnarBatch]:
+    """
+    Adapt a handler of columnar batches to receive only the rows that match a predicate, empty batches are skipped.
+
+    :param handler: The synchronous or asynchronous handler of batches.
+    :param predicate: The function that returns the boolean mask of the rows to handle.
+    :return: The handler of batches.
+    """
+    if inspect.iscoroutinefunction(handler):
+
+        async def handle_filtered_async(batch: ColumnarBatch):
+            if len(selected := batch.filter(predicate)):
+                await handler(selected)
+
+        return handle_filtered_async
+
+    def handle_filtered(batch: ColumnarBatch):
+        if len(selected := batch.filter(predicate)):
+            handler(selected)
+
+    return handle_filtered
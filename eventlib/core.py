@@ -1,31 +1,42 @@
 # Copyright 2024 Michael Käser
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+# pylint: disable=too-many-lines
 """
 Core of the event system framework.
 """
 
 import asyncio
-import collections
+import bisect
+import contextvars
 import dataclasses
 import enum
+import heapq
 import inspect
+import itertools
+import threading
+import time
+import weakref
 from abc import ABC
 from contextlib import AsyncExitStack, ExitStack
 from typing import (
+    TYPE_CHECKING,
     Any,
     AsyncContextManager,
+    Awaitable,
     Callable,
     ContextManager,
     Coroutine,
     Generic,
     Iterable,
     Iterator,
+    Literal,
     Self,
     TypeGuard,
     TypeVar,
 )
 
+from eventlib.errors import DEFAULT_ERROR_POLICY, ErrorMode, ErrorPolicy
 from eventlib.type_utils import (
     assert_not_async,
     assert_not_async_generator,
@@ -34,15 +45,36 @@ from eventlib.type_utils import (
     is_context_manager,
 )
 
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from eventlib.breaker import CircuitBreaker
+    from eventlib.dispatch import PartitionedDispatcher, PriorityDispatcher
+    from eventlib.runner import LoopRunner
+    from eventlib.scheduler import EventScheduler, ScheduledEvent
+    from eventlib.tasks import TaskTracker
+    from eventlib.threadsafe import ThreadsafeEmitter
+    from eventlib.watchdog import BlockingWatchdog
+    from eventlib.yielding import YieldPolicy
+
 
 # pylint: disable=too-few-public-methods
 class Event(ABC):
-    """Event class that can be extended to create custom events."""
+    """
+    Event class that can be extended to create custom events.
+
+    It has no instance attributes, so sub-classes with `__slots__` (e.g. `@dataclass(slots=True)`) have no `__dict__`.
+    """
+
+    __slots__ = ()
 
 
 E = TypeVar("E", bound=Event)
 """Generic type variable for events."""
 
+GatherMode = Literal["all", "first", "quorum"]
+"""Completion mode of a scatter-gather emission."""
+
 EventHandler = Callable[[E], Any]
 """Generic alias for an event function."""
 
@@ -67,8 +99,20 @@ class EventSubMetadata:
     priority: int = 0
     critical: bool = False
     caching: bool = True
+    timeout: float | None = None
+    breaker: "CircuitBreaker | None" = None
+
+
+_SUB_COUNTER = itertools.count()
+"""Global counter of subscriptions, used to order subscriptions with equal priority deterministically."""
+
+
+def _sub_order(sub: "EventSub") -> tuple[int, int]:
+    """Sort key of a subscription in an event chain."""
+    return sub.order
 
 
+# pylint: disable=too-many-instance-attributes
 class EventSub(Generic[E]):
     """
     Subscription to an event.
@@ -83,6 +127,7 @@ class EventSub(Generic[E]):
         "_meta",
         "_handler_hash",
         "_handler_type",
+        "_order",
         "call",
         "call_async",
     )
@@ -100,6 +145,7 @@ class EventSub(Generic[E]):
         self._meta = meta
         self._handler_hash = hash((event_type, handler, meta.priority))
         self._handler_type = HandlerType.UNKNOWN
+        self._order = (meta.priority, next(_SUB_COUNTER))
         if inspect.iscoroutinefunction(self._handler):
             self._handler_type = HandlerType.ASYNC_FUNCTION
         # will be replaced by _call() and _call_async()
@@ -126,6 +172,16 @@ class EventSub(Generic[E]):
         """The criticality of the handler."""
         return self._meta.critical
 
+    @property
+    def timeout(self) -> float | None:
+        """The time budget of the handler in asynchronous emissions, or None if unlimited."""
+        return self._meta.timeout
+
+    @property
+    def order(self) -> tuple[int, int]:
+        """The sort key of the handler in a chain: priority first, then subscription order."""
+        return self._order
+
     @property
     def handler_type(self) -> HandlerType:
         """The type of the handler, or HandlerType.Unknown if not determined yet."""
@@ -144,6 +200,15 @@ class EventSub(Generic[E]):
             return self._handler_hash == other._handler_hash
         return False
 
+    def replicate(self) -> "EventSub[E]":
+        """Create an independent copy of the subscription with the same order, guarded by a new circuit breaker."""
+        meta = self._meta
+        if meta.breaker is not None:
+            meta = dataclasses.replace(meta, breaker=meta.breaker.replicate())
+        sub = _create_sub(self._event_type, self._handler, meta)
+        sub._order = self._order  # pylint: disable=protected-access
+        return sub
+
     @property
     def requires_context(self) -> bool:
         """True if the handler requires a context manager."""
@@ -214,6 +279,63 @@ class EventSub(Generic[E]):
         self._handler(event)
 
 
+# pylint: disable=assigning-non-slot
+class _GuardedEventSub(EventSub[E]):
+    """Subscription whose calls are guarded and measured by a circuit breaker."""
+
+    __slots__ = ("_breaker", "_inner_call", "_inner_call_async", "_guard", "_guard_async")
+
+    def __init__(self, event_type: type[E], handler: EventHandler[E], meta: EventSubMetadata) -> None:
+        super().__init__(event_type, handler, meta)
+        assert meta.breaker is not None
+        self._breaker = meta.breaker
+        self._inner_call = self.call
+        self._inner_call_async = self.call_async
+        self.call = self._guard = self._guarded_call
+        self.call_async = self._guard_async = self._guarded_call_async
+
+    def _guarded_call(self, event: E, stack: ExitStack) -> None:
+        """Call the handler if the circuit breaker allows it and record the outcome."""
+        breaker = self._breaker
+        if not breaker.allow():
+            return
+        start = time.perf_counter()
+        try:
+            self._inner_call(event, stack)
+        except Exception:
+            breaker.record(time.perf_counter() - start, True)
+            raise
+        finally:
+            if self.call is not self._guard:  # The call method was remembered
+                self._inner_call = self.call
+                self.call = self._guard
+        breaker.record(time.perf_counter() - start, False)
+
+    async def _guarded_call_async(self, event: E, stack: AsyncExitStack) -> None:
+        """Call the handler asynchronously if the circuit breaker allows it and record the outcome."""
+        breaker = self._breaker
+        if not breaker.allow():
+            return
+        start = time.perf_counter()
+        failed = True
+        try:
+            await self._inner_call_async(event, stack)
+            failed = False
+        finally:
+            # Also a failure if the handler was cancelled, e.g. by its time budget
+            breaker.record(time.perf_counter() - start, failed)
+            if self.call_async is not self._guard_async:  # The call method was remembered
+                self._inner_call_async = self.call_async
+                self.call_async = self._guard_async
+
+
+def _create_sub(event_type: type[E], handler: EventHandler[E], meta: EventSubMetadata) -> EventSub[E]:
+    """Create a new event subscription, guarded by a circuit breaker if configured."""
+    if meta.breaker is not None:
+        return _GuardedEventSub(event_type, handler, meta)
+    return EventSub(event_type, handler, meta)
+
+
 class _NoExitStack(AsyncContextManager, ContextManager):
     """Dummy object that can be used as a context manager without doing anything."""
 
@@ -234,22 +356,35 @@ _NO_EXIT_STACK = _NoExitStack()
 """Dummy object that can be used as a context manager without doing anything."""
 
 
+def _following(subs: list[EventSub[E]], sub: EventSub[E]) -> Iterator[EventSub[E]]:
+    """Iterate over the subscriptions that follow a subscription, only needed after the first error of an emission."""
+    remaining = iter(subs)
+    for current in remaining:
+        if current is sub:
+            break
+    return remaining
+
+
 class EventChain(Generic[E]):
     """Chain of event subscriptions for a specific event type."""
 
-    __slots__ = ("event_type", "subs", "no_context")
+    __slots__ = ("event_type", "subs", "no_context", "no_timeout", "error_policy")
 
-    def __init__(self, event_type: type[E], subs: Iterable[EventSub[E]] = ()) -> None:
+    def __init__(
+        self, event_type: type[E], subs: Iterable[EventSub[E]] = (), error_policy: ErrorPolicy = DEFAULT_ERROR_POLICY
+    ) -> None:
         """
         Create a new event chain.
 
         :param event_type: The type of the event.
         :param subs: The initial subscriptions (optional).
+        :param error_policy: The policy how errors of the handlers are handled (default = collect)
         """
         self.event_type = event_type
-        self.subs: list[EventSub[E]] = list(subs)
-        self.subs.sort(key=lambda x: x.priority)
+        self.error_policy = error_policy
+        self.subs: list[EventSub[E]] = sorted(subs, key=_sub_order)
         self.no_context: bool | None = None  # None = We don't know (yet)!
+        self.no_timeout: bool | None = None  # None = We don't know (yet)!
 
     def __len__(self) -> int:
         return len(self.subs)
@@ -257,15 +392,41 @@ class EventChain(Generic[E]):
     def __iter__(self) -> Iterator[EventSub[E]]:
         return iter(self.subs)
 
+    @classmethod
+    def merged(cls, event_type: type[E], chains: Iterable["EventChain"]) -> Self:
+        """
+        Create a new event chain by merging already sorted chains (e.g. of the parent event types).
+
+        Subscriptions that are contained in multiple chains (diamond inheritance) are only added once.
+
+        :param event_type: The type of the event.
+        :param chains: The sorted chains to merge.
+        """
+        chain = cls(event_type)
+        sources = [c.subs for c in chains if c.subs]
+        if len(sources) == 1:
+            chain.subs = list(sources[0])
+        elif sources:
+            last = None
+            for sub in heapq.merge(*sources, key=_sub_order):
+                # The order key is unique per subscription, so duplicates are always adjacent
+                if sub is not last:
+                    chain.subs.append(sub)
+                    last = sub
+        return chain
+
     def copy(self) -> Self:
         """Create a copy of the event chain."""
-        return EventChain(self.event_type, self.subs)  # type: ignore
+        chain = self.merged(self.event_type, (self,))
+        chain.error_policy = self.error_policy
+        return chain
 
     def add(self, sub: EventSub[E]):
         """Add a new subscription to the chain."""
-        subs = self.subs + [sub]
-        subs.sort(key=lambda x: x.priority)
+        subs = list(self.subs)
+        bisect.insort(subs, sub, key=_sub_order)
         self.no_context = None  # None = We don't know (yet)!
+        self.no_timeout = None
         self.subs = subs
 
     def remove(self, func: EventHandler):
@@ -276,80 +437,441 @@ class EventChain(Generic[E]):
         """Remove all subscriptions for a specific event type from the chain."""
         self.subs = [sub for sub in self.subs if sub.event_type != event_type]
 
+    def _handle_error(self, event: E, sub: EventSub[E], exc: Exception, exceptions: list[Exception]) -> bool:
+        """Handle the error of a handler according to the error policy, returns True to stop event processing."""
+        policy = self.error_policy
+        if policy.handler is not None:
+            policy.handler(exc, sub, event)
+        match policy.mode:
+            case ErrorMode.FAIL_FAST:
+                exceptions.append(exc)
+                return True
+            case ErrorMode.COLLECT:
+                exceptions.append(exc)
+        return sub.critical
+
     def call(self, event: E):
         """Call all event subscriptions synchronously."""
         with _NO_EXIT_STACK if self.no_context else ExitStack() as stack:  # type: ignore
             subs = self.subs
-            exceptions: list[Exception] = []
-            try:
-                for sub in subs:
+            for sub in subs:
+                try:
+                    sub.call(event, stack)
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    self._call_failed(event, stack, sub, exc, _following(subs, sub))  # type: ignore[arg-type]
+                    break
+            if self.no_context is None:
+                self.no_context = not any(sub.requires_context for sub in self.subs)
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def _call_failed(self, event: E, stack: ExitStack, sub: EventSub[E], exc: Exception, remaining: Iterator[EventSub]):
+        """Handle the first error of an emission and call the remaining event subscriptions synchronously."""
+        exceptions: list[Exception] = []
+        try:
+            if not self._handle_error(event, sub, exc, exceptions):
+                for following in remaining:
                     try:
-                        sub.call(event, stack)
-                    # pylint: disable=broad-exception-caught
-                    except Exception as exc:
-                        exceptions.append(exc)
-                        if sub.critical:
+                        following.call(event, stack)
+                    except Exception as error:  # pylint: disable=broad-exception-caught
+                        if self._handle_error(event, following, error, exceptions):
                             break  # Stop event processing
-            finally:
-                if exceptions:
-                    raise ExceptionGroup("Event error", exceptions)
-            if self.no_context is None:
-                self.no_context = not any(sub.requires_context for sub in subs)
+        finally:
+            if exceptions:
+                raise ExceptionGroup("Event error", exceptions)
 
-    async def call_async(self, event: E):
-        """Call all event subscriptions asynchronously."""
+    async def call_async(
+        self,
+        event: E,
+        timeout: float | None = None,
+        watchdog: "BlockingWatchdog | None" = None,
+        yield_policy: "YieldPolicy | None" = None,
+    ):
+        """
+        Call all event subscriptions asynchronously.
+
+        :param event: The event.
+        :param timeout: The total time budget of the emission in seconds (optional).
+        :param watchdog: The watchdog that detects synchronous handlers that block the event loop (optional).
+        :param yield_policy: The policy when to yield to the event loop between handlers (optional).
+        """
+        if timeout is not None or not self.no_timeout or watchdog is not None or yield_policy is not None:
+            if self.no_timeout is None:
+                self.no_timeout = all(sub.timeout is None for sub in self.subs)
+            if timeout is not None or not self.no_timeout or watchdog is not None or yield_policy is not None:
+                return await self._call_async_managed(event, timeout, watchdog, yield_policy)
         async with _NO_EXIT_STACK if self.no_context else AsyncExitStack() as stack:  # type: ignore
             subs = self.subs
+            for sub in subs:
+                try:
+                    await sub.call_async(event, stack)
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    await self._call_async_failed(
+                        event, stack, sub, exc, _following(subs, sub)  # type: ignore[arg-type]
+                    )
+                    break
+            if self.no_context is None:
+                self.no_context = not any(sub.requires_context for sub in self.subs)
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    async def _call_async_failed(
+        self, event: E, stack: AsyncExitStack, sub: EventSub[E], exc: Exception, remaining: Iterator[EventSub]
+    ):
+        """Handle the first error of an emission and call the remaining event subscriptions asynchronously."""
+        exceptions: list[Exception] = []
+        try:
+            # A timeout always stops the event processing
+            if not self._handle_error(event, sub, exc, exceptions) and not isinstance(exc, asyncio.TimeoutError):
+                for following in remaining:
+                    try:
+                        await following.call_async(event, stack)
+                    except Exception as error:  # pylint: disable=broad-exception-caught
+                        if self._handle_error(event, following, error, exceptions) or isinstance(
+                            error, asyncio.TimeoutError
+                        ):
+                            break  # Stop event processing
+        finally:
+            if exceptions:
+                raise ExceptionGroup("Event error", exceptions)
+
+    # pylint: disable=too-many-branches,too-many-locals
+    async def _call_async_managed(
+        self,
+        event: E,
+        timeout: float | None,
+        watchdog: "BlockingWatchdog | None" = None,
+        yield_policy: "YieldPolicy | None" = None,
+    ):
+        """Call all event subscriptions asynchronously with time budgets, a watchdog or a yield policy."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        handled = 0
+        since = time.perf_counter()
+        async with AsyncExitStack() as stack:
             exceptions: list[Exception] = []
             try:
-                for sub in subs:
+                for sub in self.subs:
+                    if yield_policy is not None and yield_policy.due(handled, since):
+                        await asyncio.sleep(0)  # Let other tasks run, the exit stack keeps the contexts entered
+                        handled = 0
+                        since = time.perf_counter()
+                    handled += 1
+                    budget = sub.timeout
+                    scope = None
+                    if deadline is not None:
+                        remaining = deadline - loop.time()
+                        budget = remaining if budget is None else min(budget, remaining)
                     try:
-                        await sub.call_async(event, stack)
+                        if budget is None:
+                            await (
+                                sub.call_async(event, stack) if watchdog is None else watchdog.call(sub, event, stack)
+                            )
+                        elif budget <= 0:
+                            raise TimeoutError(f"No time budget left for the event handler {sub.handler!r}")
+                        else:
+                            async with asyncio.timeout(budget) as scope:
+                                await (
+                                    sub.call_async(event, stack)
+                                    if watchdog is None
+                                    else watchdog.call(sub, event, stack)
+                                )
                     except asyncio.TimeoutError as exc:
-                        exceptions.append(exc)
+                        if scope is not None and scope.expired():
+                            err = TimeoutError(
+                                f"Event handler {sub.handler!r} exceeded its time budget of {budget:.3f}s"
+                            )
+                            err.__cause__ = exc
+                            exc = err
+                        self._handle_error(event, sub, exc, exceptions)
                         break  # Stop event processing
-                    # pylint: disable=broad-exception-caught
-                    except Exception as exc:
-                        exceptions.append(exc)
-                        if sub.critical:
+                    except Exception as exc:  # pylint: disable=broad-exception-caught
+                        if self._handle_error(event, sub, exc, exceptions):
                             break  # Stop event processing
             finally:
                 if exceptions:
                     raise ExceptionGroup("Event error", exceptions)
-            if self.no_context is None:
-                self.no_context = not any(sub.requires_context for sub in subs)
 
+    @staticmethod
+    async def _gather_awaitable(sub: EventSub[E], awaitable: Awaitable, start: float) -> Any:
+        """Await the result of a gathered handler within its time budget and record the outcome in its breaker."""
+        breaker = sub.meta.breaker
+        failed = True
+        try:
+            if sub.timeout is None:
+                result = await awaitable
+            else:
+                try:
+                    async with asyncio.timeout(sub.timeout):
+                        result = await awaitable
+                except asyncio.TimeoutError as exc:
+                    raise TimeoutError(
+                        f"Event handler {sub.handler!r} exceeded its time budget of {sub.timeout:.3f}s"
+                    ) from exc
+            failed = False
+            return result
+        except asyncio.CancelledError:
+            breaker = None  # The outcome is unknown, the gathering releases the breaker
+            raise
+        finally:
+            if breaker is not None:
+                breaker.record(time.perf_counter() - start, failed)
+
+    @staticmethod
+    def _gather_count(mode: GatherMode, n: int | None) -> int | None:
+        """Get the number of results that complete a gathering, or None to wait for all handlers."""
+        match mode:
+            case "all":
+                return None
+            case "first":
+                return 1
+            case "quorum":
+                if n is None or n < 1:
+                    raise ValueError("The quorum mode requires a positive number of results `n`")
+                return n
+            case _:
+                raise ValueError(f"Unknown gather mode {mode!r}")
+
+    @staticmethod
+    async def _gather_cancel(
+        pending: set[asyncio.Future],
+        owners: dict[asyncio.Future, EventSub[E]],
+        wrapped: dict[asyncio.Future, Awaitable],
+    ):
+        """Cancel the pending handlers of a gathering and release their circuit breakers."""
+        for task in pending:
+            task.cancel()
+        await asyncio.wait(pending)
+        for task in pending:
+            if not task.cancelled():
+                continue
+            if (breaker := owners[task].meta.breaker) is not None:
+                breaker.release()  # The outcome of the call is unknown
+            if inspect.iscoroutine(inner := wrapped.get(task)):
+                inner.close()  # Not started if the task was cancelled before its first step
+
+    # pylint: disable=too-many-branches,too-many-locals,too-many-statements
+    async def gather(
+        self, event: E, mode: GatherMode = "all", n: int | None = None, timeout: float | None = None
+    ) -> list[Any]:
+        """
+        Call all event subscriptions concurrently and gather their results (scatter-gather).
+
+        The async handlers run concurrently as tasks. As soon as the completion condition is met,
+        the remaining handlers are cancelled. Failing handlers don't count to the completion condition.
+        Context managers are not supported. The time budgets of the subscriptions apply to their async handlers,
+        and the circuit breakers skip and measure the handlers like in other emissions.
+
+        :param event: The event.
+        :param mode: "all" waits for all handlers, "first" for the first result and "quorum" for `n` results.
+        :param n: The number of results of the "quorum" mode.
+        :param timeout: The deadline in seconds, the results that completed until then are returned (optional).
+        :return: The results in the order of completion.
+        """
+        n = self._gather_count(mode, n)
+        results: list[Any] = []
+        exceptions: list[Exception] = []
+        pending: set[asyncio.Future] = set()
+        owners: dict[asyncio.Future, EventSub[E]] = {}
+        wrapped: dict[asyncio.Future, Awaitable] = {}
+        try:
+            for sub in self.subs:
+                if n is not None and len(results) >= n:
+                    break
+                breaker = sub.meta.breaker
+                if breaker is not None and not breaker.allow():
+                    continue  # The circuit is open
+                start = time.perf_counter()
+                try:
+                    result = sub.handler(event)
+                    assert_not_generator(result, sub.handler)
+                    assert_not_async_generator(result, sub.handler)
+                    if inspect.isawaitable(result):
+                        if sub.timeout is None and breaker is None:
+                            future = asyncio.ensure_future(result)
+                        else:
+                            future = asyncio.ensure_future(self._gather_awaitable(sub, result, start))
+                            wrapped[future] = result
+                        owners[future] = sub
+                        pending.add(future)
+                    elif is_context_manager(result) or is_async_context_manager(result):
+                        raise TypeError(f"Cannot gather results of the context manager {sub.handler!r}")
+                    else:
+                        if breaker is not None:
+                            breaker.record(time.perf_counter() - start, False)
+                        results.append(result)
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    if breaker is not None:
+                        breaker.record(time.perf_counter() - start, True)
+                    if self._handle_error(event, sub, exc, exceptions):
+                        break  # Stop event processing
+            loop = asyncio.get_running_loop()
+            deadline = None if timeout is None else loop.time() + timeout
+            while pending and (n is None or len(results) < n):
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if (error := task.exception()) is None:
+                        results.append(task.result())
+                    elif isinstance(error, Exception):
+                        self._handle_error(event, owners[task], error, exceptions)
+                    else:
+                        raise error
+        finally:
+            if pending:
+                await self._gather_cancel(pending, owners, wrapped)
+        if n is not None and len(results) >= n:
+            return results[:n]
+        if exceptions and not pending:
+            raise ExceptionGroup("Event error", exceptions)
+        return results
+
+
+_EVENT_HIERARCHY: weakref.WeakKeyDictionary[type, tuple[tuple[type[Event], ...], frozenset[type[Event]]]] = (
+    weakref.WeakKeyDictionary()
+)
+"""Memoized event hierarchy per class: the event classes of the MRO and the same as set."""
+
+
+def _get_event_hierarchy(cls: type[Event]) -> tuple[tuple[type[Event], ...], frozenset[type[Event]]]:
+    """Get the memoized event hierarchy of an event class."""
+    try:
+        return _EVENT_HIERARCHY[cls]
+    except KeyError:
+        mro = tuple(c for c in cls.__mro__ if issubclass(c, Event))
+        _EVENT_HIERARCHY[cls] = result = (mro, frozenset(mro))
+        return result
+
+
+def _get_event_mro(cls: type[Event]) -> tuple[type[Event], ...]:
+    """Get all classes of an event class in method resolution order that are event classes (including itself)."""
+    return _get_event_hierarchy(cls)[0]
+
+
+def _get_event_parents(cls: type[Event]) -> tuple[type[Event], ...]:
+    """Get the direct parent classes of an event class that are also event classes."""
+    return tuple(c for c in cls.__bases__ if c in _get_event_hierarchy(cls)[1])
+
+
+def _is_event_subclass(cls: type[Event], parent: type[Event]) -> bool:
+    """Fast check if an event class is a subclass of another event class, based on the memoized hierarchy."""
+    return parent in _get_event_hierarchy(cls)[1]
+
+
+def _get_handler_event_type(func: EventHandler[E]) -> type[E]:
+    """Get the event type of a handler function from the annotation of its argument."""
+    args = list(inspect.signature(func).parameters.values())
+    if (not args) or any(arg.default is inspect.Parameter.empty for arg in args[1:]):
+        raise TypeError("Handler function must have exactly one argument")
+    event_type = args[0].annotation
+    if event_type is inspect.Parameter.empty:
+        raise TypeError("Event type must be specified if not given as annotation")
+    return event_type  # type: ignore[no-any-return]
+
+
+_SCOPED_SUBS: contextvars.ContextVar[tuple[tuple["EventSystem", EventSub], ...]] = contextvars.ContextVar(
+    "eventlib_scoped_subs", default=()
+)
+"""The scoped subscriptions that are active in the current context."""
+
+
+class ScopedSubscription(AsyncContextManager, ContextManager):
+    """
+    Subscription that is only active in the current context (thread or asyncio task) while the scope is entered.
+
+    Tasks that are created inside the scope inherit it, as they copy the current context.
+    """
+
+    __slots__ = ("_system", "_sub")
+
+    def __init__(self, system: "EventSystem", sub: EventSub) -> None:
+        self._system = system
+        self._sub = sub
+
+    @property
+    def sub(self) -> EventSub:
+        """The scoped subscription."""
+        return self._sub
+
+    def __enter__(self) -> Self:
+        _SCOPED_SUBS.set(_SCOPED_SUBS.get() + ((self._system, self._sub),))
+        self._system._scope_entered(1)  # pylint: disable=protected-access
+        return self
 
-def _get_event_parents(cls: type[Event]) -> Iterable[type[Event]]:
-    """Get all parent classes of an event class that are also event classes."""
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        # Remove the last entry of this scope from the current context only, so that the scope can be entered
+        # concurrently by multiple tasks or threads.
+        scoped = _SCOPED_SUBS.get()
+        for index in range(len(scoped) - 1, -1, -1):
+            system, sub = scoped[index]
+            if system is self._system and sub is self._sub:
+                _SCOPED_SUBS.set(scoped[:index] + scoped[index + 1 :])
+                break
+        else:
+            raise RuntimeError("Scoped subscription was not entered in the current context")
+        self._system._scope_entered(-1)  # pylint: disable=protected-access
 
-    def _get(clazz: type[Event], _result: collections.OrderedDict[type[Event], None]):
-        parents = tuple(c for c in clazz.__bases__ if issubclass(c, Event))
-        _result.update(((c, None) for c in parents))
-        for parent in parents:
-            _result.update(_get(parent, _result))
-        return _result
+    async def __aenter__(self) -> Self:
+        return self.__enter__()
 
-    return tuple(_get(cls, collections.OrderedDict()).keys())
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.__exit__(exc_type, exc_val, exc_tb)
 
 
+# pylint: disable=too-many-public-methods
 class EventSystem:
     """The event system that manages event subscriptions and calls."""
 
-    __slots__ = ("chains",)
+    __slots__ = (
+        "chains",
+        "scheduler",
+        "threadsafe_emitter",
+        "runner",
+        "tasks",
+        "watchdog",
+        "yield_policy",
+        "_version",
+        "_scopes",
+        "_scopes_lock",
+        "_error_policies",
+    )
 
-    def __init__(self, other: "EventSystem | None" = None) -> None:
+    def __init__(self, other: "EventSystem | None" = None, *, error_policy: ErrorPolicy | None = None) -> None:
         """
         Create a new event system or copy an existing one.
 
         :param other: event system to copy (optional)
+        :param error_policy: The default policy how errors of the handlers are handled (default = collect)
         """
-        chains = {} if other is None else {k: v.copy() for k, v in other.chains.items()}
+        chains = {} if other is None else other._copy_chains()
         self.chains: dict[type[Event], EventChain] = chains
+        self._version = 0
+        self._scopes = 0
+        self._scopes_lock = threading.Lock()
+        self.scheduler: "EventScheduler | None" = None
+        self.threadsafe_emitter: "ThreadsafeEmitter | None" = None
+        self.runner: "LoopRunner | None" = None
+        self.tasks: "TaskTracker | None" = None
+        self.watchdog: "BlockingWatchdog | None" = None
+        self.yield_policy: "YieldPolicy | None" = None
+        self._error_policies: dict[type[Event] | None, ErrorPolicy] = {}
+        if other is not None:
+            self._error_policies.update(other._error_policies)
+        if error_policy is not None:
+            self.set_error_policy(error_policy)
 
-    def _get_parent_subs(self, event_type: type[E]) -> set[EventSub]:
-        """Get all subscribers of the parent classes of an event class."""
-        return {s for parent in _get_event_parents(event_type) for s in (self.chains.get(parent) or ())}
+    @property
+    def version(self) -> int:
+        """Counter that is increased on every change of the subscriptions."""
+        return self._version
+
+    def _event_types(self) -> set[type[Event]]:
+        """Get all event types with a known event chain."""
+        return set(self.chains.keys())
+
+    def _copy_chains(self) -> dict[type[Event], EventChain]:
+        """Create a copy of all event chains."""
+        return {k: self._get_chain(k).copy() for k in self._event_types()}
 
     @classmethod
     def _check_event_type(cls, event_type: type[E]) -> TypeGuard[E]:
@@ -358,15 +880,50 @@ class EventSystem:
             raise TypeError(f"{event_type} is not a subclass of Event")
         return True
 
-    def _get_chain(self, event_type: type[E]) -> EventChain[E]:
-        """Get the event chain for a given event type."""
-        if chain := self.chains.get(event_type):
+    def _get_own_chain(self, event_type: type[E]) -> EventChain[E]:
+        """Get the event chain of the subscriptions that are registered in this event system."""
+        if (chain := self.chains.get(event_type)) is not None:
             return chain
-        # Unknown type, try to build from parents
+        # Unknown type, build from the (sorted) chains of the parents
         self._check_event_type(event_type)
-        self.chains[event_type] = chain = EventChain(event_type, self._get_parent_subs(event_type))
+        parents = [self._get_own_chain(parent) for parent in _get_event_parents(event_type)]
+        self.chains[event_type] = chain = EventChain.merged(event_type, parents)
+        chain.error_policy = self.get_error_policy(event_type)
         return chain
 
+    def set_error_policy(self, policy: ErrorPolicy, event_type: type[E] | None = None):
+        """
+        Set the policy how errors of the handlers are handled.
+
+        :param policy: The error policy.
+        :param event_type: The event type the policy applies to, including its sub-types (default = all event types)
+        """
+        if event_type is not None:
+            self._check_event_type(event_type)
+        self._error_policies[event_type] = policy
+        for chain_type, chain in self.chains.items():
+            chain.error_policy = self.get_error_policy(chain_type)
+        self._version += 1
+
+    def _find_error_policy(self, event_type: type[E]) -> ErrorPolicy | None:
+        """Find the error policy of the most specific event type, or the default policy of this event system."""
+        if policies := self._error_policies:
+            for cls in _get_event_mro(event_type):
+                if (policy := policies.get(cls)) is not None:
+                    return policy
+            return policies.get(None)
+        return None
+
+    def get_error_policy(self, event_type: type[E]) -> ErrorPolicy:
+        """Get the policy how errors of the handlers of an event type are handled."""
+        return self._find_error_policy(event_type) or DEFAULT_ERROR_POLICY
+
+    def _get_chain(self, event_type: type[E]) -> EventChain[E]:
+        """Get the event chain that is called when an event of the given type is emitted."""
+        if (chain := self.chains.get(event_type)) is not None:
+            return chain
+        return self._get_own_chain(event_type)
+
     # pylint: disable=too-many-arguments
     def add_subscriber(
         self,
@@ -376,6 +933,8 @@ class EventSystem:
         priority: int = 0,
         critical: bool = False,
         caching: bool = True,
+        timeout: float | None = None,
+        breaker: "CircuitBreaker | None" = None,
     ):
         """
         Add a new event subscriber.
@@ -385,25 +944,32 @@ class EventSystem:
         :param priority: The priority of the handler (default = 0)
         :param critical: If True, stop event processing if an error occurs (default = False)
         :param caching: If True, cache the handler's call method for performance (default = True)
+        :param timeout: The time budget of the handler in asynchronous emissions in seconds (optional)
+        :param breaker: The circuit breaker that guards the handler (optional)
         """
         if event_type is None:
-            args = list(inspect.signature(func).parameters.values())
-            if (not args) or any(arg.default is inspect.Parameter.empty for arg in args[1:]):
-                raise TypeError("Handler function must have exactly one argument")
-            event_type = args[0].annotation
-            if event_type is inspect.Parameter.empty:
-                raise TypeError("Event type must be specified if not given as annotation")
+            event_type = _get_handler_event_type(func)
         # Add subscriber to its event chain
-        chain = self._get_chain(event_type)
-        sub = EventSub(event_type, func, meta=EventSubMetadata(priority=priority, critical=critical, caching=caching))
+        chain = self._get_own_chain(event_type)
+        meta = EventSubMetadata(priority=priority, critical=critical, caching=caching, timeout=timeout, breaker=breaker)
+        sub = _create_sub(event_type, func, meta)
         chain.add(sub)
         # Add subscriber to all sub-event chains
         for sub_event_type, sub_chain in self.chains.items():
-            if issubclass(sub_event_type, event_type) and sub_chain is not chain:
+            if sub_chain is not chain and _is_event_subclass(sub_event_type, event_type):
                 sub_chain.add(sub)
+        self._version += 1
 
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
     def subscribe(
-        self, event_type: type[E] | None = None, /, priority: int = 0, critical: bool = False, caching: bool = True
+        self,
+        event_type: type[E] | None = None,
+        /,
+        priority: int = 0,
+        critical: bool = False,
+        caching: bool = True,
+        timeout: float | None = None,
+        breaker: "CircuitBreaker | None" = None,
     ) -> EventHandlerDecorator[E]:
         """
         Subscribe to an event with a decorator.
@@ -412,11 +978,21 @@ class EventSystem:
         :param priority: The priority of the handler (default = 0)
         :param critical: If True, stop event processing if an error occurs (default = False)
         :param caching: If True, cache the handler's call method for performance (default = True)
+        :param timeout: The time budget of the handler in asynchronous emissions in seconds (optional)
+        :param breaker: The circuit breaker that guards the handler (optional)
         :return: The decorator
         """
 
         def decorator(func):
-            self.add_subscriber(func, event_type, priority=priority, critical=critical, caching=caching)
+            self.add_subscriber(
+                func,
+                event_type,
+                priority=priority,
+                critical=critical,
+                caching=caching,
+                timeout=timeout,
+                breaker=breaker,
+            )
             return func
 
         return decorator
@@ -425,23 +1001,274 @@ class EventSystem:
         """Unsubscribe a function from all event chains."""
         for chain in self.chains.values():
             chain.remove(func)
+        self._version += 1
 
     def unsubscribe_all(self, event_type: type[E]):
         """Unsubscribe all functions from an event chain."""
         self.chains.pop(event_type, None)
         for chain in self.chains.values():
             chain.remove_type(event_type)
+        self._version += 1
 
     def clear_all_subscriptions(self):
         """Clear all event subscriptions."""
         self.chains = {}
+        self._version += 1
+
+    def scoped_subscribe(
+        self,
+        func: EventHandler[E],
+        event_type: type[E] | None = None,
+        *,
+        priority: int = 0,
+        critical: bool = False,
+        caching: bool = True,
+        timeout: float | None = None,
+        breaker: "CircuitBreaker | None" = None,
+    ) -> ScopedSubscription:
+        """
+        Subscribe a handler only in the current context (thread or asyncio task) while the scope is entered.
 
-    def emit(self, event: E) -> None:
-        """Call all event subscribers synchronously."""
-        if chain := self._get_chain(type(event)):
+        Use it with `with` or `async with`. If no scope is active, emitting events has no additional overhead.
+
+        :param func: The handler function.
+        :param event_type: The type of the event (optional).
+        :param priority: The priority of the handler (default = 0)
+        :param critical: If True, stop event processing if an error occurs (default = False)
+        :param caching: If True, cache the handler's call method for performance (default = True)
+        :param timeout: The time budget of the handler in asynchronous emissions in seconds (optional)
+        :param breaker: The circuit breaker that guards the handler (optional)
+        :return: The scope as (async) context manager
+        """
+        if event_type is None:
+            event_type = _get_handler_event_type(func)
+        self._check_event_type(event_type)
+        meta = EventSubMetadata(priority=priority, critical=critical, caching=caching, timeout=timeout, breaker=breaker)
+        sub = _create_sub(event_type, func, meta)
+        return ScopedSubscription(self, sub)
+
+    def _scope_entered(self, delta: int):
+        """Count the active scopes of this event system in all contexts."""
+        with self._scopes_lock:
+            self._scopes += delta
+
+    def _get_scoped_chain(self, chain: EventChain[E]) -> EventChain[E]:
+        """Merge the scoped subscriptions of the current context into the event chain."""
+        event_type = chain.event_type
+        scoped = [
+            sub
+            for system, sub in _SCOPED_SUBS.get()
+            if system is self and _is_event_subclass(event_type, sub.event_type)
+        ]
+        if not scoped:
+            return chain
+        merged = EventChain.merged(event_type, (chain, EventChain(event_type, scoped)))
+        merged.error_policy = chain.error_policy
+        return merged
+
+    def emit(self, event: E) -> "Future[None] | None":
+        """
+        Call all event subscribers synchronously.
+
+        If a loop runner is attached, the asynchronous handlers are run in its background event loop.
+
+        :param event: The event.
+        :return: The future of the asynchronous handlers if the loop runner doesn't wait for them, otherwise None.
+        """
+        chain = self._get_chain(type(event))
+        if self._scopes:
+            chain = self._get_scoped_chain(chain)
+        if chain:
+            if self.runner is not None:
+                return self.runner.emit(chain, event)
             chain.call(event)
+        return None
+
+    async def emit_async(self, event: E, timeout: float | None = None) -> None:
+        """
+        Call all event subscribers asynchronously.
+
+        :param event: The event.
+        :param timeout: The total time budget of the emission in seconds, shared by all handlers (optional).
+        """
+        chain = self._get_chain(type(event))
+        if self._scopes:
+            chain = self._get_scoped_chain(chain)
+        if chain:
+            await chain.call_async(event, timeout, self.watchdog, self.yield_policy)
+
+    def _get_scheduler(self) -> "EventScheduler":
+        """Get the attached scheduler."""
+        if self.scheduler is None:
+            raise RuntimeError("No scheduler attached, create one with `EventScheduler(system)`")
+        return self.scheduler
+
+    def emit_later(self, delay: float, event: E) -> "ScheduledEvent":
+        """Emit an event after a delay in seconds with the attached scheduler."""
+        return self._get_scheduler().emit_later(delay, event)
+
+    def emit_at(self, when: float, event: E) -> "ScheduledEvent":
+        """Emit an event at a time of the clock of the attached scheduler (default = time.monotonic)."""
+        return self._get_scheduler().emit_at(when, event)
+
+    def emit_every(self, interval: float, factory: Callable[[], E], delay: float | None = None) -> "ScheduledEvent":
+        """Emit an event created by the factory periodically with the attached scheduler."""
+        return self._get_scheduler().emit_every(interval, factory, delay)
+
+    def emit_nowait(self, event: E, timeout: float | None = None) -> asyncio.Task:
+        """
+        Start the asynchronous emission of an event without waiting for it, tracked by the attached task tracker.
+
+        :param event: The event.
+        :param timeout: The total time budget of the emission in seconds (optional)
+        :return: The task of the emission.
+        :raises asyncio.QueueFull: If the maximum number of emissions in flight is reached.
+        """
+        if self.tasks is None:
+            raise RuntimeError("No task tracker attached, create one with `TaskTracker(system)`")
+        return self.tasks.emit_nowait(event, timeout)
+
+    async def drain(self, timeout: float | None = None) -> bool:
+        """
+        Wait until all fire-and-forget emissions completed.
+
+        :param timeout: The maximum seconds to wait (optional)
+        :return: True if all emissions completed, False if the timeout expired.
+        """
+        if self.tasks is None:
+            return True
+        return await self.tasks.drain(timeout)
+
+    def partitioned(
+        self, key: Callable[[Any], Any], partitions: int = 64, maxsize: int = 1000
+    ) -> "PartitionedDispatcher":
+        """
+        Create a dispatcher that emits the events with the same key in order and the others concurrently.
+
+        :param key: The function that returns the partition key of an event, e.g. ``lambda e: e.order_id``
+        :param partitions: The number of partitions, the maximum concurrency (default = 64)
+        :param maxsize: The maximum number of buffered events per partition (default = 1000)
+        :return: The dispatcher, use it with `async with` to wait for the events at the end.
+        """
+        from eventlib.dispatch import PartitionedDispatcher  # pylint: disable=import-outside-toplevel
 
-    async def emit_async(self, event: E) -> None:
-        """Call all event subscribers asynchronously."""
-        if chain := self._get_chain(type(event)):
-            await chain.call_async(event)
+        return PartitionedDispatcher(self, key, partitions, maxsize)
+
+    # pylint: disable=too-many-arguments
+    def prioritized(
+        self,
+        *,
+        priority: Callable[[Any], int] | None = None,
+        priorities: dict[type[Event], int] | None = None,
+        maxsize: int = 10000,
+        aging: float = 0.1,
+        concurrency: int = 1,
+    ) -> "PriorityDispatcher":
+        """
+        Create a dispatcher that emits urgent events first, lower priority values first.
+
+        :param priority: The function that returns the priority of an event (optional)
+        :param priorities: The priorities of event types, including their sub-types (optional, default priority = 0)
+        :param maxsize: The maximum number of buffered events, the least urgent events are shed (default = 10000)
+        :param aging: The seconds of waiting that compensate one priority level (default = 0.1)
+        :param concurrency: The number of events that are emitted concurrently (default = 1)
+        :return: The dispatcher, use it with `async with` to wait for the events at the end.
+        """
+        from eventlib.dispatch import PriorityDispatcher  # pylint: disable=import-outside-toplevel
+
+        return PriorityDispatcher(
+            self,
+            priority=priority,
+            priorities=priorities,
+            maxsize=maxsize,
+            aging=aging,
+            concurrency=concurrency,
+        )
+
+    def emit_threadsafe(self, event: E, block: bool = True, timeout: float | None = None):
+        """
+        Emit an event from any thread in the event loop of the attached thread-safe emitter.
+
+        :param event: The event.
+        :param block: If True, wait for free space in a full buffer, otherwise raise `queue.Full` (default = True)
+        :param timeout: The maximum seconds to wait for free space, then `queue.Full` is raised (optional)
+        """
+        if self.threadsafe_emitter is None:
+            raise RuntimeError("No thread-safe emitter attached, create one with `ThreadsafeEmitter(system)`")
+        self.threadsafe_emitter.emit(event, block, timeout)
+
+    async def gather(
+        self, event: E, mode: GatherMode = "all", n: int | None = None, timeout: float | None = None
+    ) -> list[Any]:
+        """
+        Call all event subscribers concurrently and gather their results (scatter-gather).
+
+        :param event: The event.
+        :param mode: "all" waits for all handlers, "first" for the first result and "quorum" for `n` results.
+        :param n: The number of results of the "quorum" mode.
+        :param timeout: The deadline in seconds, the results that completed until then are returned (optional).
+        :return: The results in the order of completion.
+        """
+        chain = self._get_chain(type(event))
+        if self._scopes:
+            chain = self._get_scoped_chain(chain)
+        return await chain.gather(event, mode, n, timeout)
+
+    def emit_many(self, events: Iterable[E]) -> None:
+        """
+        Call all event subscribers synchronously for a batch of events.
+
+        All events are emitted, even if handlers of an earlier event fail. The errors are raised combined afterwards.
+        """
+        exceptions: list[Exception] = []
+        event_type: type | None = None
+        chain: EventChain | None = None
+        for event in events:
+            if type(event) is not event_type:  # pylint: disable=unidiomatic-typecheck
+                event_type = type(event)
+                chain = self._get_chain(event_type)
+                if self._scopes:
+                    chain = self._get_scoped_chain(chain)
+            if chain:
+                try:
+                    if self.runner is not None:
+                        self.runner.emit(chain, event)
+                    else:
+                        chain.call(event)
+                except ExceptionGroup as exc:
+                    exceptions.append(exc)
+        if exceptions:
+            raise ExceptionGroup("Event error", exceptions)
+
+    async def emit_many_async(self, events: Iterable[E]) -> None:
+        """
+        Call all event subscribers asynchronously for a batch of events, one event after the other.
+
+        All events are emitted, even if handlers of an earlier event fail. The errors are raised combined afterwards.
+        """
+        exceptions: list[Exception] = []
+        event_type: type | None = None
+        chain: EventChain | None = None
+        yield_policy = self.yield_policy
+        handled = 0
+        since = time.perf_counter()
+        for event in events:
+            if type(event) is not event_type:  # pylint: disable=unidiomatic-typecheck
+                event_type = type(event)
+                chain = self._get_chain(event_type)
+                if self._scopes:
+                    chain = self._get_scoped_chain(chain)
+            if chain:
+                if yield_policy is not None:
+                    # Also yield between the events of a batch with short chains
+                    if yield_policy.due(handled, since):
+                        await asyncio.sleep(0)
+                        handled = 0
+                        since = time.perf_counter()
+                    handled += len(chain)
+                try:
+                    await chain.call_async(event, None, self.watchdog, yield_policy)
+                except ExceptionGroup as exc:
+                    exceptions.append(exc)
+        if exceptions:
+            raise ExceptionGroup("Event error", exceptions)
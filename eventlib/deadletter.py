@@ -0,0 +1,303 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Dead-letter queue and retries of failed handler invocations.
+
+Both the queue and the retry scheduler are error handlers, so they are attached with an error policy::
+
+    dead_letters = DeadLetterQueue(maxlen=1000, store=FileDeadLetterStore("dead_letters.jsonl"))
+    retries = RetryScheduler(dead_letters, max_retries=3)
+    system.set_error_policy(ErrorPolicy.callback(retries))
+
+    async with retries:
+        await system.emit_async(MyEvent())
+
+A retry only invokes the failed subscription again, the other handlers of the event are not called twice.
+Invocations that still fail after all retries are moved to the dead-letter queue.
+"""
+
+import asyncio
+import collections
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+import traceback
+from os import PathLike
+from typing import Any, Callable, Iterator
+
+from eventlib.core import Event, EventChain, EventSub
+from eventlib.driver import AsyncDriver
+
+
+class DeadLetter:
+    """Record of a failed handler invocation."""
+
+    __slots__ = ("sub", "event", "exception", "attempts", "time")
+
+    def __init__(self, sub: EventSub, event: Event, exception: Exception, attempts: int = 1) -> None:
+        """
+        Create a new dead letter.
+
+        :param sub: The subscription of the failed handler.
+        :param event: The event of the invocation.
+        :param exception: The error of the last invocation.
+        :param attempts: The number of failed invocations (default = 1)
+        """
+        self.sub = sub
+        self.event = event
+        self.exception = exception
+        self.attempts = attempts
+        self.time = time.time()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Describe the dead letter with JSON serializable values."""
+        event_type = type(self.event)
+        return {
+            "time": self.time,
+            "event_type": f"{event_type.__module__}.{event_type.__qualname__}",
+            "event": repr(self.event),
+            "handler": getattr(self.sub.handler, "__qualname__", repr(self.sub.handler)),
+            "attempts": self.attempts,
+            "error": repr(self.exception),
+            "traceback": "".join(traceback.format_exception(self.exception)),
+        }
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.sub.handler!r}, {self.event!r}, {self.exception!r}, {self.attempts})"
+
+
+class FileDeadLetterStore:
+    """Persistent store that appends dead letters as JSON lines to a file, for later inspection."""
+
+    __slots__ = ("path", "_lock")
+
+    def __init__(self, path: str | PathLike) -> None:
+        """
+        Create a new file store.
+
+        :param path: The path of the file, it is created on the first write.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, letter: DeadLetter):
+        """Append a dead letter to the file."""
+        line = json.dumps(letter.to_dict())
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+    def read(self) -> list[dict[str, Any]]:
+        """Read all stored dead letters."""
+        try:
+            with self._lock, open(self.path, encoding="utf-8") as file:
+                return [json.loads(line) for line in file if line.strip()]
+        except FileNotFoundError:
+            return []
+
+
+class DeadLetterQueue:
+    """
+    Bounded queue of failed handler invocations.
+
+    If the queue is full, the oldest dead letter is dropped and counted in `dropped`.
+    The queue can be used as handler of an error policy, e.g. ``ErrorPolicy.collect(queue)``.
+    """
+
+    __slots__ = ("store", "dropped", "_letters", "_lock")
+
+    def __init__(self, maxlen: int = 1000, store: FileDeadLetterStore | None = None) -> None:
+        """
+        Create a new dead-letter queue.
+
+        :param maxlen: The maximum number of dead letters in the queue (default = 1000)
+        :param store: The persistent store that receives a copy of every dead letter (optional)
+        """
+        self.store = store
+        self.dropped = 0
+        self._letters: collections.deque[DeadLetter] = collections.deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def __call__(self, exc: Exception, sub: EventSub, event: Event):
+        """Record a failed handler invocation, the signature of an error handler."""
+        self.append(DeadLetter(sub, event, exc))
+
+    def append(self, letter: DeadLetter):
+        """Add a dead letter to the queue."""
+        with self._lock:
+            if len(self._letters) == self._letters.maxlen:
+                self.dropped += 1
+            self._letters.append(letter)
+        if self.store is not None:
+            self.store.write(letter)
+
+    def __len__(self) -> int:
+        return len(self._letters)
+
+    def __iter__(self) -> Iterator[DeadLetter]:
+        """Iterate over a snapshot of the dead letters, oldest first."""
+        with self._lock:
+            return iter(list(self._letters))
+
+    def pop(self) -> DeadLetter:
+        """Remove and return the oldest dead letter, raises IndexError if empty."""
+        with self._lock:
+            return self._letters.popleft()
+
+    def drain(self) -> list[DeadLetter]:
+        """Remove and return all dead letters."""
+        with self._lock:
+            letters = list(self._letters)
+            self._letters.clear()
+            return letters
+
+    def clear(self):
+        """Remove all dead letters."""
+        with self._lock:
+            self._letters.clear()
+
+
+# pylint: disable=too-many-instance-attributes
+class RetryScheduler(AsyncDriver):
+    """
+    Retries failed handler invocations with exponential backoff and jitter.
+
+    The scheduler is used as handler of an error policy, e.g. ``ErrorPolicy.callback(retries)``.
+    Due retries are run with `run_pending()` or `run_pending_async()`, or by an asyncio task with `async with`.
+    """
+
+    __slots__ = (
+        "dead_letters",
+        "max_retries",
+        "base_delay",
+        "max_delay",
+        "jitter",
+        "_clock",
+        "_random",
+        "_pending",
+        "_counter",
+        "_lock",
+        "_wakeup",
+    )
+
+    _task_name = "eventlib-retries"
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        dead_letters: DeadLetterQueue | None = None,
+        *,
+        max_retries: int = 3,
+        base_delay: float = 0.1,
+        max_delay: float = 30.0,
+        jitter: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        rand: Callable[[], float] = random.random,
+    ) -> None:
+        """
+        Create a new retry scheduler.
+
+        :param dead_letters: The queue of the invocations that failed all retries (optional, otherwise dropped)
+        :param max_retries: The number of retries of a failed invocation (default = 3)
+        :param base_delay: The delay of the first retry in seconds, doubled for every further retry (default = 0.1)
+        :param max_delay: The maximum delay of a retry in seconds (default = 30.0)
+        :param jitter: The fraction of the delay that is randomized, between 0 and 1 (default = 0.5)
+        :param clock: The monotonic clock (default = time.monotonic)
+        :param rand: The random number generator in [0, 1) of the jitter (default = random.random)
+        """
+        self.dead_letters = dead_letters
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self._clock = clock
+        self._random = rand
+        self._pending: list[tuple[float, int, DeadLetter]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup: Callable[[], None] | None = None
+        self._task = None
+
+    def __call__(self, exc: Exception, sub: EventSub, event: Event):
+        """Schedule the retry of a failed handler invocation, the signature of an error handler."""
+        self.schedule(DeadLetter(sub, event, exc))
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def delay(self, attempts: int) -> float:
+        """Get the randomized delay before the next retry after the given number of failed invocations."""
+        delay = min(self.max_delay, self.base_delay * 2.0 ** (attempts - 1))
+        return delay * (1.0 - self.jitter * self._random())
+
+    def schedule(self, letter: DeadLetter):
+        """Schedule the retry of a failed invocation, or move it to the dead letters if all retries failed."""
+        if letter.attempts > self.max_retries:
+            if self.dead_letters is not None:
+                self.dead_letters.append(letter)
+            return
+        with self._lock:
+            heapq.heappush(self._pending, (self._clock() + self.delay(letter.attempts), next(self._counter), letter))
+        if self._wakeup is not None:
+            self._wakeup()
+
+    def next_delay(self) -> float | None:
+        """Get the seconds until the next retry is due, or None if no retry is pending."""
+        with self._lock:
+            if not self._pending:
+                return None
+            return max(0.0, self._pending[0][0] - self._clock())
+
+    def _collect(self) -> list[DeadLetter]:
+        """Collect the retries that are due."""
+        due = []
+        now = self._clock()
+        with self._lock:
+            while self._pending and self._pending[0][0] <= now:
+                due.append(heapq.heappop(self._pending)[2])
+        return due
+
+    def _failed(self, letter: DeadLetter, group: ExceptionGroup):
+        """Schedule the next retry of an invocation that failed again."""
+        exc = group.exceptions[0]
+        self.schedule(DeadLetter(letter.sub, letter.event, exc, letter.attempts + 1))
+
+    def run_pending(self):
+        """Retry all due invocations synchronously."""
+        for letter in self._collect():
+            try:
+                EventChain(letter.sub.event_type, (letter.sub,)).call(letter.event)
+            except ExceptionGroup as group:
+                self._failed(letter, group)
+
+    async def run_pending_async(self):
+        """Retry all due invocations asynchronously."""
+        for letter in self._collect():
+            try:
+                await EventChain(letter.sub.event_type, (letter.sub,)).call_async(letter.event)
+            except ExceptionGroup as group:
+                self._failed(letter, group)
+
+    # ==============================================================================================
+    # Asyncio driver
+    async def _run_async(self):
+        """Drive the retries in an asyncio task."""
+        wakeup, self._wakeup = self._loop_wakeup()
+        try:
+            while True:
+                delay = self.next_delay()
+                if delay is None:
+                    await wakeup.wait()
+                elif delay > 0:
+                    try:
+                        async with asyncio.timeout(delay):
+                            await wakeup.wait()
+                    except TimeoutError:
+                        pass
+                wakeup.clear()
+                await self.run_pending_async()
+        finally:
+            self._wakeup = None
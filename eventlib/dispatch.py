@@ -0,0 +1,344 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Queued dispatch of events to the event system.
+
+The partitioned dispatcher keeps the order of events with the same key (e.g. an order id), while events with
+different keys are handled concurrently::
+
+    dispatcher = system.partitioned(key=lambda e: e.order_id, partitions=64)
+    async with dispatcher:
+        await dispatcher.dispatch(OrderCreated(order_id=42))
+
+The priority dispatcher emits urgent events first, e.g. control events before bulk events under load::
+
+    dispatcher = system.prioritized(priorities={HealthCheck: -10, BulkImport: 10})
+    async with dispatcher:
+        dispatcher.dispatch(BulkImport())
+"""
+
+import asyncio
+import collections
+import dataclasses
+import itertools
+import logging
+import time
+from typing import Any, Callable, Self
+
+from eventlib.core import Event, EventSystem, _get_event_mro
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class PartitionStats:
+    """Snapshot of the metrics of the partitions of a dispatcher."""
+
+    dispatched: tuple[int, ...]
+    """Number of dispatched events per partition."""
+    depths: tuple[int, ...]
+    """Number of buffered events per partition."""
+
+    @property
+    def max_depth(self) -> int:
+        """The number of buffered events of the fullest partition."""
+        return max(self.depths, default=0)
+
+    @property
+    def skew(self) -> float:
+        """The ratio of the events of the busiest partition to the mean events per partition (1.0 = uniform)."""
+        total = sum(self.dispatched)
+        if not total:
+            return 1.0
+        return max(self.dispatched) * len(self.dispatched) / total
+
+
+class PartitionedDispatcher:
+    """
+    Dispatcher that emits the events with the same key in order and the events of different keys concurrently.
+
+    The events are hashed by their key onto a fixed number of partitions. Each partition has a bounded buffer that is
+    drained by its own task with `EventSystem.emit_async()`. Errors of handlers are passed to the error handler,
+    by default they are logged.
+    """
+
+    __slots__ = ("system", "key", "partitions", "error_handler", "_queues", "_workers", "_dispatched")
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        system: EventSystem,
+        key: Callable[[Any], Any],
+        partitions: int = 64,
+        maxsize: int = 1000,
+        error_handler: Callable[[Exception], None] | None = None,
+    ) -> None:
+        """
+        Create a new partitioned dispatcher.
+
+        :param system: The event system to emit the events in.
+        :param key: The function that returns the partition key of an event.
+        :param partitions: The number of partitions, the maximum concurrency (default = 64)
+        :param maxsize: The maximum number of buffered events per partition (default = 1000)
+        :param error_handler: The handler of errors that occurred while emitting (default = log the errors)
+        """
+        if partitions < 1:
+            raise ValueError("A dispatcher requires at least one partition")
+        self.system = system
+        self.key = key
+        self.partitions = partitions
+        self.error_handler = error_handler or self._log_error
+        self._queues: list[asyncio.Queue[Event]] = [asyncio.Queue(maxsize) for _ in range(partitions)]
+        self._workers: list[asyncio.Task | None] = [None] * partitions
+        self._dispatched = [0] * partitions
+
+    def __len__(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    @staticmethod
+    def _log_error(exc: Exception):
+        logger.error("Error while emitting dispatched event", exc_info=exc)
+
+    def partition(self, event: Event) -> int:
+        """Get the partition of an event."""
+        return hash(self.key(event)) % self.partitions
+
+    def _start(self, event: Event) -> int:
+        """Get the partition of an event and start its worker if necessary."""
+        index = self.partition(event)
+        if self._workers[index] is None:
+            self._workers[index] = asyncio.create_task(self._work(index), name=f"eventlib-partition-{index}")
+        return index
+
+    async def dispatch(self, event: Event):
+        """Dispatch an event, waits if the buffer of its partition is full (backpressure)."""
+        index = self._start(event)
+        await self._queues[index].put(event)
+        self._dispatched[index] += 1
+
+    def dispatch_nowait(self, event: Event):
+        """Dispatch an event, raises `asyncio.QueueFull` if the buffer of its partition is full."""
+        index = self._start(event)
+        self._queues[index].put_nowait(event)
+        self._dispatched[index] += 1
+
+    async def _work(self, index: int):
+        """Emit the events of a partition one after the other."""
+        queue = self._queues[index]
+        while True:
+            event = await queue.get()
+            try:
+                await self.system.emit_async(event)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self.error_handler(exc)  # Keep the worker alive, e.g. on errors of the error policy
+            finally:
+                queue.task_done()
+
+    def stats(self) -> PartitionStats:
+        """Get a snapshot of the metrics of the partitions."""
+        return PartitionStats(tuple(self._dispatched), tuple(queue.qsize() for queue in self._queues))
+
+    async def join(self):
+        """Wait until all dispatched events are emitted."""
+        for queue in self._queues:
+            await queue.join()
+
+    async def close(self):
+        """Wait until all dispatched events are emitted and stop the workers."""
+        await self.join()
+        workers = [task for task in self._workers if task is not None]
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers = [None] * self.partitions
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+
+# pylint: disable=too-many-instance-attributes
+class PriorityDispatcher:
+    """
+    Dispatcher that emits the buffered events by priority, lower values first like the priority of handlers.
+
+    The events are ordered by ``enqueue time + priority * aging``. So an event waits at most
+    ``priority difference * aging`` seconds longer than a more urgent event, which prevents starvation.
+    If the buffer is full, the least urgent event is shed, which may be the new event itself.
+
+    The events are buffered in a FIFO queue per priority, which is ordered by urgency since the clock is monotonic.
+    So taking the most urgent and shedding the least urgent event costs O(number of distinct priorities).
+    Errors of handlers are passed to the error handler, by default they are logged.
+    """
+
+    __slots__ = (
+        "system",
+        "priority",
+        "priorities",
+        "maxsize",
+        "aging",
+        "concurrency",
+        "error_handler",
+        "shed_handler",
+        "shed",
+        "_clock",
+        "_buckets",
+        "_size",
+        "_counter",
+        "_workers",
+        "_ready",
+        "_idle",
+        "_active",
+    )
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        system: EventSystem,
+        *,
+        priority: Callable[[Any], int] | None = None,
+        priorities: dict[type[Event], int] | None = None,
+        maxsize: int = 10000,
+        aging: float = 0.1,
+        concurrency: int = 1,
+        error_handler: Callable[[Exception], None] | None = None,
+        shed_handler: Callable[[Event], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Create a new priority dispatcher.
+
+        :param system: The event system to emit the events in.
+        :param priority: The function that returns the priority of an event (optional)
+        :param priorities: The priorities of event types, including their sub-types (optional, default priority = 0)
+        :param maxsize: The maximum number of buffered events (default = 10000)
+        :param aging: The seconds of waiting that compensate one priority level (default = 0.1)
+        :param concurrency: The number of events that are emitted concurrently (default = 1)
+        :param error_handler: The handler of errors that occurred while emitting (default = log the errors)
+        :param shed_handler: The handler of events that are shed because the buffer is full (optional)
+        :param clock: The monotonic clock of the aging (default = time.monotonic)
+        """
+        self.system = system
+        self.priority = priority
+        self.priorities = priorities or {}
+        self.maxsize = maxsize
+        self.aging = aging
+        self.concurrency = concurrency
+        self.error_handler = error_handler or self._log_error
+        self.shed_handler = shed_handler
+        self.shed = 0
+        """Number of events that were shed because the buffer was full."""
+        self._clock = clock
+        self._buckets: dict[int, collections.deque[tuple[float, int, Event]]] = {}
+        self._size = 0
+        self._counter = itertools.count()
+        self._workers: list[asyncio.Task] = []
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._active = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _log_error(exc: Exception):
+        logger.error("Error while emitting dispatched event", exc_info=exc)
+
+    def get_priority(self, event: Event) -> int:
+        """Get the priority of an event by the priority function or by the priority of its (parent) type."""
+        if self.priority is not None:
+            return self.priority(event)
+        if priorities := self.priorities:
+            for cls in _get_event_mro(type(event)):
+                if (priority := priorities.get(cls)) is not None:
+                    return priority
+        return 0
+
+    def dispatch(self, event: Event, priority: int | None = None) -> bool:
+        """
+        Dispatch an event.
+
+        :param event: The event.
+        :param priority: The priority of the event (default = by the priority function or the event type)
+        :return: False if the event was shed because the buffer is full of more urgent events.
+        """
+        if priority is None:
+            priority = self.get_priority(event)
+        entry = (self._clock() + priority * self.aging, next(self._counter), event)
+        buckets = self._buckets
+        if self._size >= self.maxsize:
+            # Shed the least urgent event, the last of a bucket
+            least = max(buckets.items(), key=lambda item: item[1][-1], default=None)
+            if least is None or least[1][-1] < entry:
+                self._shed(event)
+                return False
+            self._shed(least[1].pop()[2])
+            if not least[1]:
+                del buckets[least[0]]
+            self._size -= 1
+        if (bucket := buckets.get(priority)) is None:
+            bucket = buckets[priority] = collections.deque()
+        bucket.append(entry)
+        self._size += 1
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._work(), name=f"eventlib-priority-{i}") for i in range(self.concurrency)
+            ]
+        self._idle.clear()
+        self._ready.set()
+        return True
+
+    def _pop(self) -> Event:
+        """Remove and return the most urgent event, the first of a bucket."""
+        buckets = self._buckets
+        priority, bucket = min(buckets.items(), key=lambda item: item[1][0])
+        event = bucket.popleft()[2]
+        if not bucket:
+            del buckets[priority]
+        self._size -= 1
+        return event
+
+    def _shed(self, event: Event):
+        """Count and report a shed event."""
+        self.shed += 1
+        if self.shed_handler is not None:
+            self.shed_handler(event)
+
+    async def _work(self):
+        """Emit the most urgent events one after the other."""
+        while True:
+            while not self._size:
+                self._ready.clear()
+                await self._ready.wait()
+            event = self._pop()
+            self._active += 1
+            try:
+                await self.system.emit_async(event)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self.error_handler(exc)  # Keep the worker alive, e.g. on errors of the error policy
+            finally:
+                self._active -= 1
+                if not self._size and not self._active:
+                    self._idle.set()
+
+    async def join(self):
+        """Wait until all dispatched events are emitted."""
+        await self._idle.wait()
+
+    async def close(self):
+        """Wait until all dispatched events are emitted and stop the workers."""
+        await self.join()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
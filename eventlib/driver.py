@@ -0,0 +1,64 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Asyncio driver of the components that run in a background task of the event loop, e.g. the scheduler.
+"""
+
+import asyncio
+from typing import Callable, ClassVar, Self
+
+
+class AsyncDriver:
+    """
+    Mixin that runs `_run_async()` in an asyncio task while the component is entered with `async with`.
+
+    On exit the task is cancelled, unless `_stop_async()` is overridden to stop it gracefully.
+    """
+
+    __slots__ = ("_task",)
+
+    _task: asyncio.Task | None
+
+    _task_name: ClassVar[str] = "eventlib-driver"
+    """The name of the asyncio task."""
+
+    async def _run_async(self):
+        """Drive the component until the task is stopped."""
+        raise NotImplementedError
+
+    def _running(self) -> bool:
+        """Check if the component is already driven."""
+        return self._task is not None
+
+    @staticmethod
+    def _loop_wakeup() -> tuple[asyncio.Event, Callable[[], None]]:
+        """Create an asyncio event and a function that sets it in the running event loop, from any thread."""
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+
+        def set_wakeup() -> None:
+            loop.call_soon_threadsafe(wakeup.set)
+
+        return wakeup, set_wakeup
+
+    async def _stop_async(self, task: asyncio.Task):
+        """Stop the task of the driver, by default it is cancelled."""
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def __aenter__(self) -> Self:
+        if self._running():
+            raise RuntimeError(f"{type(self).__name__} is already running")
+        self._task = asyncio.create_task(self._run_async(), name=self._task_name)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        assert self._task is not None
+        try:
+            await self._stop_async(self._task)
+        finally:
+            self._task = None
@@ -0,0 +1,90 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Error policies that define how errors of event handlers are handled.
+
+The policies only come into play once a handler raised an error, emissions without errors are not affected.
+"""
+
+import enum
+import logging
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from eventlib.core import Event, EventSub
+
+logger = logging.getLogger("eventlib")
+
+ErrorHandler = Callable[[Exception, "EventSub", "Event"], Any]
+"""Handler of an error, called with the exception, the subscription and the event."""
+
+
+class ErrorMode(enum.Enum):
+    """Mode of an error policy."""
+
+    COLLECT = "collect"
+    """Call all handlers and raise the errors combined as `ExceptionGroup` afterwards."""
+    FAIL_FAST = "fail_fast"
+    """Stop at the first error and raise it as `ExceptionGroup`."""
+    LOG = "log"
+    """Pass the errors to a sink (default = logging) and continue."""
+    CALLBACK = "callback"
+    """Pass the errors to a callback and continue, nothing is raised to the emitter."""
+
+
+def log_error(exc: Exception, sub: "EventSub", event: "Event"):
+    """Default sink of the log policy that logs the error with the `eventlib` logger."""
+    logger.error("Error in event handler %r for event %r", sub.handler, event, exc_info=exc)
+
+
+class ErrorPolicy:
+    """Policy how errors of event handlers are handled."""
+
+    __slots__ = ("mode", "handler")
+
+    def __init__(self, mode: ErrorMode = ErrorMode.COLLECT, handler: ErrorHandler | None = None) -> None:
+        """
+        Create a new error policy, see also the factory methods.
+
+        :param mode: The error mode (default = collect)
+        :param handler: The handler that is called for every error (required for the callback mode)
+        """
+        if mode is ErrorMode.LOG and handler is None:
+            handler = log_error
+        if mode is ErrorMode.CALLBACK and handler is None:
+            raise ValueError("The callback error mode requires a handler")
+        self.mode = mode
+        self.handler = handler
+
+    @classmethod
+    def collect(cls, handler: ErrorHandler | None = None) -> "ErrorPolicy":
+        """Call all handlers and raise all errors combined afterwards (default)."""
+        return cls(ErrorMode.COLLECT, handler)
+
+    @classmethod
+    def fail_fast(cls, handler: ErrorHandler | None = None) -> "ErrorPolicy":
+        """Stop at the first error and raise it."""
+        return cls(ErrorMode.FAIL_FAST, handler)
+
+    @classmethod
+    def log(cls, sink: ErrorHandler | None = None) -> "ErrorPolicy":
+        """Pass the errors to a sink (default = logging) and continue."""
+        return cls(ErrorMode.LOG, sink)
+
+    @classmethod
+    def callback(cls, handler: ErrorHandler) -> "ErrorPolicy":
+        """Pass the errors to a callback and continue."""
+        return cls(ErrorMode.CALLBACK, handler)
+
+    @property
+    def raises(self) -> bool:
+        """True if errors are raised to the emitter."""
+        return self.mode in (ErrorMode.COLLECT, ErrorMode.FAIL_FAST)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.mode}, {self.handler!r})"
+
+
+DEFAULT_ERROR_POLICY = ErrorPolicy()
+"""The default error policy that collects all errors."""
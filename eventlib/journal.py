@@ -0,0 +1,387 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Append-only journal of events in memory-mapped segment files, with replay of time or sequence ranges.
+
+The journal subscribes to the emitted events, encodes them with the event codec directly into the memory-mapped
+segment and replays them later into another event system, e.g. after a crash or for backtesting::
+
+    journal = EventJournal("journal/", codec=codec)
+    journal.subscribe(system)
+    ...
+    journal.close()
+
+    with EventJournal("journal/", codec=codec) as journal:
+        journal.replay(EventSystem(), start=yesterday, end=today)
+
+Every record has a header with the length of the encoded event, its sequence number and timestamp. The header is
+written after the event, so a torn record ends the journal. A sparse index of every n-th record per segment maps
+sequence numbers and timestamps to offsets, so replays seek directly to the start without scanning.
+
+The writes are committed in groups: the index is flushed and, if enabled, the segment is synced to disk every
+`commit_size` records and on close. Records that were written but not synced may be lost on a power failure.
+"""
+
+import bisect
+import dataclasses
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Self
+
+from eventlib.codec import BufferTooSmallError, EventCodec
+from eventlib.core import Event, EventSystem
+
+_RECORD = struct.Struct("<IQd")  # Length of the encoded event, sequence number, timestamp
+_INDEX = struct.Struct("<Qdq")  # Sequence number, timestamp, offset in the segment
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class JournalRecord:
+    """Record of an event in the journal."""
+
+    seq: int
+    """Sequence number of the record, starting at 0."""
+    timestamp: float
+    """Time when the event was appended."""
+    event: Event
+
+
+def _iter_records(view: memoryview, offset: int) -> Iterator[tuple[int, float, int]]:
+    """Iterate the sequence number, timestamp and end offset of the records of a segment, until the first gap."""
+    unpack_from = _RECORD.unpack_from
+    limit = len(view) - _RECORD.size
+    while offset <= limit:
+        size, seq, timestamp = unpack_from(view, offset)
+        end = offset + _RECORD.size + size
+        if not size or end > len(view):
+            return
+        yield seq, timestamp, end
+        offset = end
+
+
+# pylint: disable=too-many-instance-attributes
+class EventJournal:
+    """
+    Journal of events in segment files of fixed size in a directory.
+
+    The segments are named by the sequence number of their first record. Each segment has a sparse index file.
+    The journal is opened for writing on the first appended event and continues after the last record.
+    """
+
+    __slots__ = (
+        "path",
+        "codec",
+        "segment_size",
+        "commit_size",
+        "fsync",
+        "index_interval",
+        "clock",
+        "_segments",
+        "_index",
+        "_file",
+        "_mmap",
+        "_view",
+        "_index_file",
+        "_offset",
+        "_seq",
+        "_segment_records",
+        "_uncommitted",
+    )
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        codec: EventCodec | None = None,
+        *,
+        segment_size: int = 64 << 20,
+        commit_size: int = 1000,
+        fsync: bool = False,
+        index_interval: int = 1000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Open the journal in a directory, the directory is created if necessary.
+
+        :param path: The directory of the segment files.
+        :param codec: The codec of the events (default = a codec without registrations, which pickles all events)
+        :param segment_size: The size of a segment file in bytes (default = 64 MiB)
+        :param commit_size: The number of records per group commit (default = 1000)
+        :param fsync: If True, sync the segment and index to disk on every commit (default = False)
+        :param index_interval: The number of records between two index entries of a segment (default = 1000)
+        :param clock: The clock of the timestamps, which should not go backwards (default = time.time)
+        """
+        self.path = Path(path)
+        self.codec = codec or EventCodec()
+        self.segment_size = segment_size
+        self.commit_size = commit_size
+        self.fsync = fsync
+        self.index_interval = index_interval
+        self.clock = clock
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._segments = sorted(int(file.stem) for file in self.path.glob("*.log"))
+        self._index: list[tuple[int, float, int, int]] = []
+        """Entries of the sparse index: sequence number, timestamp, first sequence number of segment, offset."""
+        for first_seq in self._segments:
+            data = self._segment_path(first_seq, ".idx").read_bytes() if self._has_index(first_seq) else b""
+            usable = len(data) - len(data) % _INDEX.size
+            self._index += [(seq, ts, first_seq, offset) for seq, ts, offset in _INDEX.iter_unpack(data[:usable])]
+        self._file: BinaryIO | None = None
+        self._mmap: mmap.mmap | None = None
+        self._view: memoryview | None = None
+        self._index_file: BinaryIO | None = None
+        self._offset = 0
+        self._seq = 0
+        self._segment_records = 0
+        self._uncommitted = 0
+
+    def _segment_path(self, first_seq: int, suffix: str = ".log") -> Path:
+        return self.path / f"{first_seq:020d}{suffix}"
+
+    def _has_index(self, first_seq: int) -> bool:
+        return self._segment_path(first_seq, ".idx").exists()
+
+    @property
+    def next_seq(self) -> int:
+        """The sequence number of the next appended event."""
+        if self._view is None:
+            self._open_writer()
+        return self._seq
+
+    # ==============================================================================================
+    # Writing
+    def _open_segment(self, first_seq: int):
+        """Map a segment file for writing, it is created and extended to the segment size if necessary."""
+        file = open(self._segment_path(first_seq), "a+b")  # pylint: disable=consider-using-with
+        if os.fstat(file.fileno()).st_size < self.segment_size:
+            file.truncate(self.segment_size)
+        self._file = file
+        self._mmap = mmap.mmap(file.fileno(), 0)
+        self._view = memoryview(self._mmap)
+        self._index_file = open(self._segment_path(first_seq, ".idx"), "ab")  # pylint: disable=consider-using-with
+
+    def _open_writer(self):
+        """Open the last segment for writing and continue after its last record."""
+        if not self._segments:
+            self._segments.append(0)
+        first_seq = self._segments[-1]
+        self._open_segment(first_seq)
+        assert self._view is not None
+        self._offset, self._seq = 0, first_seq
+        # Scan from the last index entry of the segment to the end
+        if self._index and self._index[-1][2] == first_seq:
+            self._seq, _, _, self._offset = self._index[-1]
+        self._segment_records = self._seq - first_seq
+        for _, _, end in _iter_records(self._view, self._offset):
+            self._offset = end
+            self._seq += 1
+            self._segment_records += 1
+
+    def _close_writer(self):
+        self.commit()
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        for closeable in (self._mmap, self._file, self._index_file):
+            if closeable is not None:
+                closeable.close()
+        self._mmap = self._file = self._index_file = None
+
+    def _roll(self):
+        """Continue in a new segment."""
+        self._close_writer()
+        self._segments.append(self._seq)
+        self._open_segment(self._seq)
+        self._offset = 0
+        self._segment_records = 0
+
+    def append(self, event: Event) -> int:
+        """
+        Append an event to the journal.
+
+        :param event: The event.
+        :return: The sequence number of the record.
+        """
+        if self._view is None:
+            self._open_writer()
+        timestamp = self.clock()
+        start = self._offset + _RECORD.size
+        try:
+            end = self.codec.encode_into(event, self._view, start)  # type: ignore[arg-type]
+        except BufferTooSmallError:
+            if not self._segment_records:
+                raise  # Does not fit into an empty segment
+            self._roll()
+            start = _RECORD.size
+            end = self.codec.encode_into(event, self._view, start)  # type: ignore[arg-type]
+        seq = self._seq
+        _RECORD.pack_into(self._view, self._offset, end - start, seq, timestamp)  # type: ignore[arg-type]
+        if not self._segment_records % self.index_interval:
+            assert self._index_file is not None
+            self._index_file.write(_INDEX.pack(seq, timestamp, self._offset))
+            self._index.append((seq, timestamp, self._segments[-1], self._offset))
+        self._offset = end
+        self._seq = seq + 1
+        self._segment_records += 1
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_size:
+            self.commit()
+        return seq
+
+    def subscribe(self, system: EventSystem, *event_types: type[Event], priority: int = 0):
+        """
+        Append the emitted events of the given types in the event system to the journal.
+
+        :param system: The event system.
+        :param event_types: The event types to append, including their sub-types (default = all events)
+        :param priority: The priority of the journal handler (default = 0)
+        """
+        for event_type in event_types or (Event,):
+            system.add_subscriber(self.append, event_type, priority=priority)
+
+    def commit(self):
+        """Flush the index and, if enabled, sync the segment and index to disk."""
+        self._uncommitted = 0
+        if self._index_file is None:
+            return
+        self._index_file.flush()
+        if self.fsync:
+            assert self._mmap is not None
+            self._mmap.flush()
+            os.fsync(self._index_file.fileno())
+
+    def close(self):
+        """Commit the pending records and close the files."""
+        self._close_writer()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    # ==============================================================================================
+    # Reading
+    def _seek(self, start: float | None, start_seq: int | None) -> tuple[int, int]:
+        """Find the segment and offset of the last index entry before the start."""
+        index = self._index
+        if start_seq is not None:
+            position = bisect.bisect_right(index, start_seq, key=lambda entry: entry[0]) - 1
+        elif start is not None:
+            position = bisect.bisect_left(index, start, key=lambda entry: entry[1]) - 1
+        else:
+            position = -1
+        if position < 0:
+            return 0, 0
+        _, _, first_seq, offset = index[position]
+        return self._segments.index(first_seq), offset
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    def read(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        *,
+        start_seq: int | None = None,
+        end_seq: int | None = None,
+    ) -> Iterator[JournalRecord]:
+        """
+        Read the records of a time or sequence range, the segments are mapped and read one after the other.
+
+        :param start: The minimum timestamp (optional)
+        :param end: The timestamp to stop before (optional)
+        :param start_seq: The minimum sequence number (optional)
+        :param end_seq: The sequence number to stop before (optional)
+        :return: The records in order.
+        """
+        segment, offset = self._seek(start, start_seq)
+        decode_from = self.codec.decode_from
+        for first_seq in self._segments[segment:]:
+            with open(self._segment_path(first_seq), "rb") as file:
+                if not os.fstat(file.fileno()).st_size:
+                    continue
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)
+                    try:
+                        for seq, timestamp, record_end in _iter_records(view, offset):
+                            if (end is not None and timestamp >= end) or (end_seq is not None and seq >= end_seq):
+                                return
+                            if (start is None or timestamp >= start) and (start_seq is None or seq >= start_seq):
+                                event, _ = decode_from(view, offset + _RECORD.size)
+                                yield JournalRecord(seq, timestamp, event)
+                            offset = record_end
+                    finally:
+                        view.release()
+            offset = 0
+
+    def replay(
+        self,
+        system: EventSystem,
+        start: float | None = None,
+        end: float | None = None,
+        *,
+        start_seq: int | None = None,
+        end_seq: int | None = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        Emit the events of a time or sequence range in the event system, in batches with `EventSystem.emit_many()`.
+
+        :param system: The event system to emit the events in.
+        :param start: The minimum timestamp (optional)
+        :param end: The timestamp to stop before (optional)
+        :param start_seq: The minimum sequence number (optional)
+        :param end_seq: The sequence number to stop before (optional)
+        :param batch_size: The maximum number of events per batch (default = 1000)
+        :return: The number of emitted events.
+        """
+        count = 0
+        batch: list[Event] = []
+        for record in self.read(start, end, start_seq=start_seq, end_seq=end_seq):
+            batch.append(record.event)
+            if len(batch) >= batch_size:
+                system.emit_many(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            system.emit_many(batch)
+            count += len(batch)
+        return count
+
+    async def replay_async(
+        self,
+        system: EventSystem,
+        start: float | None = None,
+        end: float | None = None,
+        *,
+        start_seq: int | None = None,
+        end_seq: int | None = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        Emit the events of a time or sequence range asynchronously in batches with `EventSystem.emit_many_async()`.
+
+        :param system: The event system to emit the events in.
+        :param start: The minimum timestamp (optional)
+        :param end: The timestamp to stop before (optional)
+        :param start_seq: The minimum sequence number (optional)
+        :param end_seq: The sequence number to stop before (optional)
+        :param batch_size: The maximum number of events per batch (default = 1000)
+        :return: The number of emitted events.
+        """
+        count = 0
+        batch: list[Event] = []
+        for record in self.read(start, end, start_seq=start_seq, end_seq=end_seq):
+            batch.append(record.event)
+            if len(batch) >= batch_size:
+                await system.emit_many_async(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            await system.emit_many_async(batch)
+            count += len(batch)
+        return count
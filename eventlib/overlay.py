@@ -0,0 +1,63 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Layered event systems that extend a parent event system without copying it.
+"""
+
+from eventlib.core import E, Event, EventChain, EventSystem
+from eventlib.errors import ErrorPolicy
+
+
+class OverlayEventSystem(EventSystem):
+    """
+    Event system that adds its own subscriptions on top of a parent event system.
+
+    In contrast to copying an event system with `EventSystem(other)`, creating an overlay is O(1).
+    The chains of the parent are referenced and only merged for event types that have local subscriptions.
+    Changes of the parent are tracked by its version counter, so later subscriptions to the parent are visible too.
+
+    Unsubscribing from an overlay only affects its own subscriptions, the parent is never modified.
+    Error policies of the overlay take precedence, otherwise the error policies of the parent apply.
+    """
+
+    __slots__ = ("parent", "_resolved")
+
+    def __init__(self, parent: EventSystem) -> None:
+        """
+        Create a new overlay of an event system.
+
+        :param parent: The parent event system.
+        """
+        super().__init__()
+        self.parent = parent
+        self._resolved: dict[type[Event], tuple[int, EventChain]] = {}
+
+    @property
+    def version(self) -> int:
+        """Counter that is increased on every change of the own or the parent's subscriptions."""
+        return self._version + self.parent.version
+
+    def _get_chain(self, event_type: type[E]) -> EventChain[E]:
+        """Get the event chain of the parent's and the local subscriptions for a given event type."""
+        version = self.version
+        if (resolved := self._resolved.get(event_type)) is not None and resolved[0] == version:
+            return resolved[1]
+        chain = self.parent._get_chain(event_type)  # pylint: disable=protected-access
+        local = self._get_own_chain(event_type)
+        policy = self.get_error_policy(event_type)
+        if local or policy is not chain.error_policy:
+            chain = EventChain.merged(event_type, (chain, local))
+            chain.error_policy = policy
+        self._resolved[event_type] = (version, chain)
+        return chain
+
+    def _find_error_policy(self, event_type: type[E]) -> ErrorPolicy | None:
+        """Find the error policy of this overlay, or fall back to the error policy of the parent."""
+        if (policy := super()._find_error_policy(event_type)) is not None:
+            return policy
+        return self.parent._find_error_policy(event_type)  # pylint: disable=protected-access
+
+    def _event_types(self) -> set[type[Event]]:
+        """Get all event types with a known event chain in this or the parent event system."""
+        return self.parent._event_types() | self.chains.keys()  # pylint: disable=protected-access
@@ -0,0 +1,142 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Object pools of events that are created, emitted and dropped at high rates.
+
+A pooled event class keeps a free list of released instances. `acquire()` re-initializes a released instance instead
+of allocating a new one, and `emit_in()` releases the event after the emission if no handler retained it::
+
+    @dataclasses.dataclass(slots=True)
+    class Tick(PooledEvent, pool_size=256):
+        price: float
+        volume: int
+
+    Tick.acquire(price=9.99, volume=100).emit_in(system)
+
+Combined with `BaseEvent`, `emit()` and `emit_async()` emit in the event system of the class and release the event.
+
+An event must not be used after it was emitted or released, it may already be re-used for another event. The debug
+mode detects such use: released events raise a `RuntimeError` on every attribute access until they are acquired again.
+
+Events are released only by their own emit methods. A handler retains an event by keeping a reference,
+e.g. by storing it or by emitting it in a background event loop. Retained events are simply not returned to the pool.
+
+On CPython, dropped events are freed immediately by reference counting and do not count towards the thresholds of
+the garbage collector. Measure the gain of a pool with `benchmark.pool` before using it.
+"""
+
+from sys import getrefcount
+from typing import Any, ClassVar, Self
+
+from eventlib.core import Event, EventSystem
+
+_RELEASED_TYPES: dict[type, type] = {}
+"""Poisoned sub-class of each pooled event class in debug mode."""
+
+
+def _released_type(cls: type) -> type:
+    """Get the poisoned sub-class of a pooled event class, with the same memory layout."""
+    try:
+        return _RELEASED_TYPES[cls]
+    except KeyError:
+
+        def __getattribute__(self, name: str):
+            raise RuntimeError(f"{cls.__name__} event was used after release")
+
+        released = type(f"Released{cls.__name__}", (cls,), {"__slots__": (), "__getattribute__": __getattribute__})
+        _RELEASED_TYPES[cls] = released
+        return released
+
+
+class PooledEvent(Event):
+    """
+    Event class with an object pool per sub-class. Combine it with `BaseEvent` to emit in the class's event system.
+
+    The pool is configured with the class arguments `pool_size` (default = 1024) and `debug` (default = False).
+    """
+
+    __slots__ = ()
+
+    pool_size: ClassVar[int] = 1024
+    """The maximum number of released events that are kept for re-use."""
+    pool_debug: ClassVar[bool] = False
+    """If True, released events raise on use."""
+    _pool: ClassVar[list["PooledEvent"]]
+
+    @classmethod
+    def __init_subclass__(cls, /, pool_size: int | None = None, debug: bool | None = None, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if pool_size is not None:
+            cls.pool_size = pool_size
+        if debug is not None:
+            cls.pool_debug = debug
+        cls._pool = []  # Own pool per class, also for the re-created classes of slotted dataclasses
+
+    @classmethod
+    def acquire(cls, *args: Any, **fields: Any) -> Self:
+        """
+        Create an event, from a released event of the pool if available.
+
+        :param args: The arguments of the event class.
+        :param fields: The keyword arguments of the event class.
+        :return: The initialized event.
+        """
+        pool = cls._pool
+        if not pool:
+            return cls(*args, **fields)
+        event: Self = pool.pop()  # type: ignore[assignment]
+        if cls.pool_debug:
+            object.__setattr__(event, "__class__", cls)
+        event.__init__(*args, **fields)  # type: ignore[misc]  # pylint: disable=unnecessary-dunder-call
+        return event
+
+    def release(self):
+        """Return the event to the pool of its class, it must not be used afterwards."""
+        cls = type(self)
+        pool = self._pool
+        if cls.pool_debug:
+            object.__setattr__(self, "__class__", _released_type(cls))
+        if len(pool) < cls.pool_size:
+            pool.append(self)
+
+    def _get_system(self) -> EventSystem:
+        system: EventSystem | None = getattr(type(self), "event_system", None)
+        if system is None:
+            raise ValueError(f"{type(self).__name__} has no event system, use `emit_in()` instead")
+        return system
+
+    def emit_in(self, system: EventSystem) -> Self:
+        """
+        Emit this event and release it afterwards, if no handler retained it.
+
+        :param system: The event system to emit the event in.
+        :return: This event, it must not be used if it was released.
+        """
+        references = getrefcount(self)
+        system.emit(self)  # Not released on errors, the traceback references the event
+        if getrefcount(self) <= references:
+            self.release()
+        return self
+
+    async def emit_in_async(self, system: EventSystem, timeout: float | None = None) -> Self:
+        """
+        Emit this event asynchronously and release it afterwards, if no handler retained it.
+
+        :param system: The event system to emit the event in.
+        :param timeout: The total time budget of the emission in seconds (optional)
+        :return: This event, it must not be used if it was released.
+        """
+        references = getrefcount(self)
+        await system.emit_async(self, timeout)
+        if getrefcount(self) <= references:
+            self.release()
+        return self
+
+    def emit(self) -> Self:
+        """Emit this event in the event system of its `BaseEvent` class and release it, see `emit_in()`."""
+        return self.emit_in(self._get_system())
+
+    async def emit_async(self, timeout: float | None = None) -> Self:
+        """Emit this event asynchronously in the event system of its `BaseEvent` class, see `emit_in_async()`."""
+        return await self.emit_in_async(self._get_system(), timeout)
@@ -0,0 +1,261 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Background event loop that lets the synchronous `EventSystem.emit()` drive asynchronous handlers.
+
+Without a runner, synchronous emissions fail on asynchronous handlers, and calling ``asyncio.run()`` per emission
+creates and closes an event loop every time. The runner manages one event loop in a daemon thread instead::
+
+    runner = LoopRunner(system)
+    with runner:
+        system.emit(MyEvent())  # Sync handlers run inline, async handlers run in the background loop
+
+In blocking mode (default) the emission waits for the asynchronous handlers. Otherwise the emission returns a
+`concurrent.futures.Future` of the asynchronous handlers (fire-and-forget).
+
+Synchronous handlers always run in the emitting thread and asynchronous handlers in the background loop. A handler is
+asynchronous if it is a coroutine function or an asynchronous context manager function, e.g. decorated with
+`contextlib.asynccontextmanager`. In blocking mode all handlers are called one after the other in priority order.
+In fire-and-forget mode the synchronous handlers are called first, then the asynchronous handlers are scheduled.
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+from concurrent.futures import Future
+from contextlib import AsyncExitStack, ExitStack
+from typing import Callable, Self
+
+from eventlib.core import E, EventChain, EventSub, EventSystem, HandlerType
+
+logger = logging.getLogger(__name__)
+
+_SYNC_HANDLER_TYPES = (HandlerType.FUNCTION, HandlerType.CONTEXT)
+
+
+def _is_async(sub: EventSub) -> bool:
+    """Check if the handler is asynchronous, from its signature if it was not called yet."""
+    if sub.handler_type is not HandlerType.UNKNOWN:
+        return sub.handler_type not in _SYNC_HANDLER_TYPES
+    handler = inspect.unwrap(sub.handler)  # E.g. the async generator of an async context manager
+    return (
+        inspect.iscoroutinefunction(handler)
+        or inspect.isasyncgenfunction(handler)
+        or inspect.iscoroutinefunction(getattr(handler, "__call__", None))
+    )
+
+
+# pylint: disable=too-many-instance-attributes
+class LoopRunner:
+    """
+    Event loop in a daemon thread that runs the asynchronous handlers of synchronous emissions.
+
+    The runner is attached to the event system on creation and started on the first emission or with `start()`.
+    In fire-and-forget mode, errors of the asynchronous handlers are also passed to the error handler.
+    """
+
+    __slots__ = ("system", "wait", "error_handler", "cache_size", "_loop", "_thread", "_lock", "_plans")
+
+    def __init__(
+        self,
+        system: EventSystem,
+        wait: bool = True,
+        error_handler: Callable[[BaseException], None] | None = None,
+        cache_size: int = 1024,
+    ) -> None:
+        """
+        Create a new runner and attach it to the event system.
+
+        :param system: The event system whose synchronous emissions are driven.
+        :param wait: If True, wait for the asynchronous handlers, otherwise return a future (default = True)
+        :param error_handler: The handler of errors in fire-and-forget mode (default = log the errors)
+        :param cache_size: The maximum number of chains with cached groups of sync and async handlers (default = 1024)
+        """
+        self.system = system
+        self.wait = wait
+        self.error_handler = error_handler or self._log_error
+        self.cache_size = cache_size
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._plans: dict[EventChain, tuple[list, list]] = {}
+        system.runner = self
+
+    @staticmethod
+    def _log_error(exc: BaseException):
+        logger.error("Error in asynchronous event handlers", exc_info=exc)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The background event loop, started if necessary."""
+        if (loop := self._loop) is None:
+            loop = self.start()
+        return loop
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop in a daemon thread."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                thread = threading.Thread(
+                    target=self._run, args=(loop, ready), name="eventlib-loop-runner", daemon=True
+                )
+                thread.start()
+                ready.wait()
+                self._thread = thread
+                self._loop = loop
+            return self._loop
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop, ready: threading.Event):
+        """Run the event loop until it is stopped."""
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+    def stop(self):
+        """Stop the background event loop, pending asynchronous handlers are cancelled."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is not None and thread is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def _plan(self, chain: EventChain[E]) -> list[tuple[bool, list[EventSub[E]]]]:
+        """Group the chain into consecutive runs of sync and async handlers in priority order, cached per chain."""
+        if (cached := self._plans.get(chain)) is not None and cached[0] is chain.subs:
+            return cached[1]
+        plan: list[tuple[bool, list[EventSub[E]]]] = []
+        for sub in chain.subs:
+            is_async = _is_async(sub)
+            if plan and plan[-1][0] is is_async:
+                plan[-1][1].append(sub)
+            else:
+                plan.append((is_async, [sub]))
+        if len(self._plans) >= self.cache_size:
+            del self._plans[next(iter(self._plans))]  # Evict the oldest chain
+        self._plans[chain] = (chain.subs, plan)
+        return plan
+
+    @staticmethod
+    def _call_sync(chain: EventChain[E], subs: list[EventSub[E]], event: E, stack: ExitStack, exceptions: list) -> bool:
+        """Call synchronous handlers in the emitting thread, returns True to stop event processing."""
+        for sub in subs:
+            try:
+                sub.call(event, stack)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                if chain._handle_error(event, sub, exc, exceptions):  # pylint: disable=protected-access
+                    return True
+        return False
+
+    @staticmethod
+    async def _call_async(
+        chain: EventChain[E], subs: list[EventSub[E]], event: E, stack: AsyncExitStack, exceptions: list
+    ) -> bool:
+        """Call asynchronous handlers in the background loop, returns True to stop event processing."""
+        for sub in subs:
+            try:
+                if sub.timeout is None:
+                    await sub.call_async(event, stack)
+                else:
+                    async with asyncio.timeout(sub.timeout):
+                        await sub.call_async(event, stack)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                # A timeout always stops the event processing
+                if chain._handle_error(event, sub, exc, exceptions) or isinstance(  # pylint: disable=protected-access
+                    exc, asyncio.TimeoutError
+                ):
+                    return True
+        return False
+
+    async def _call_async_group(self, chain: EventChain[E], subs: list[EventSub[E]], event: E):
+        """Call the asynchronous handlers of a fire-and-forget emission in the background loop."""
+        exceptions: list[Exception] = []
+        async with AsyncExitStack() as stack:
+            await self._call_async(chain, subs, event, stack, exceptions)
+        if exceptions:
+            raise ExceptionGroup("Event error", exceptions)
+
+    def emit(self, chain: EventChain[E], event: E) -> "Future[None] | None":
+        """
+        Call the synchronous handlers of the chain inline and the asynchronous handlers in the background loop.
+
+        :param chain: The event chain.
+        :param event: The event.
+        :return: The future of the asynchronous handlers in fire-and-forget mode, otherwise None.
+        """
+        plan = self._plan(chain)
+        has_async = any(is_async for is_async, _ in plan)
+        if has_async and self.wait and threading.current_thread() is self._thread:
+            raise RuntimeError("Cannot wait for asynchronous handlers in the loop of the runner itself")
+        if not self.wait:
+            return self._emit_nowait(chain, plan, event)
+        exceptions: list[Exception] = []
+        with ExitStack() as stack:
+            try:
+                async_stack: AsyncExitStack | None = None
+                for is_async, subs in plan:
+                    if not is_async:
+                        stop = self._call_sync(chain, subs, event, stack, exceptions)
+                    else:
+                        loop = self.loop
+                        if async_stack is None:
+                            async_stack = AsyncExitStack()
+                            stack.callback(self._close_stack, async_stack, loop)
+                        call = self._call_async(chain, subs, event, async_stack, exceptions)
+                        stop = asyncio.run_coroutine_threadsafe(call, loop).result()
+                    if stop:
+                        break  # Stop event processing
+            finally:
+                if exceptions:
+                    raise ExceptionGroup("Event error", exceptions)
+        return None
+
+    @staticmethod
+    def _close_stack(stack: AsyncExitStack, loop: asyncio.AbstractEventLoop):
+        """Exit the asynchronous contexts of an emission in the background loop."""
+        asyncio.run_coroutine_threadsafe(stack.aclose(), loop).result()
+
+    def _emit_nowait(
+        self, chain: EventChain[E], plan: list[tuple[bool, list[EventSub[E]]]], event: E
+    ) -> "Future[None] | None":
+        """Call the synchronous handlers inline and schedule the asynchronous handlers afterwards."""
+        exceptions: list[Exception] = []
+        with ExitStack() as stack:
+            try:
+                stopped = self._call_sync(
+                    chain, [sub for is_async, subs in plan if not is_async for sub in subs], event, stack, exceptions
+                )
+            finally:
+                if exceptions:
+                    raise ExceptionGroup("Event error", exceptions)
+        async_subs = [sub for is_async, subs in plan if is_async for sub in subs]
+        if stopped or not async_subs:
+            return None
+        future = asyncio.run_coroutine_threadsafe(self._call_async_group(chain, async_subs, event), self.loop)
+        future.add_done_callback(self._report)
+        return future
+
+    def _report(self, future: "Future[None]"):
+        """Pass the error of a fire-and-forget emission to the error handler."""
+        if not future.cancelled() and (exc := future.exception()) is not None:
+            self.error_handler(exc)
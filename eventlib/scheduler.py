@@ -0,0 +1,356 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Delayed and scheduled emission of events with a hierarchical hashed timing wheel.
+
+The timing wheel has O(1) insert and cancel, independent of the number of scheduled events.
+Due events are delivered in batches through the event chains of the event system.
+
+The scheduler is driven either by an asyncio task (`async with scheduler`) or by a thread (`with scheduler`)::
+
+    scheduler = EventScheduler(system)
+    async with scheduler:
+        handle = system.emit_later(1.5, MyEvent())
+        handle.cancel()
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from typing import Callable, Self
+
+from eventlib.core import E, Event, EventSystem
+from eventlib.driver import AsyncDriver
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledEvent:
+    """Handle of a scheduled event that can be used to cancel it."""
+
+    __slots__ = ("expires", "interval", "event", "factory", "cancelled", "_wheel", "_bucket")
+
+    def __init__(
+        self,
+        wheel: "TimingWheel",
+        expires: int,
+        event: Event | None = None,
+        factory: Callable[[], Event] | None = None,
+        interval: int = 0,
+    ) -> None:
+        """
+        Create a new scheduled event.
+
+        :param wheel: The timing wheel of the event.
+        :param expires: The tick when the event is due.
+        :param event: The event to emit (optional).
+        :param factory: The factory that creates the event to emit (optional).
+        :param interval: The ticks between periodic emissions, or 0 if not periodic (default = 0).
+        """
+        self.expires = expires
+        self.interval = interval
+        self.event = event
+        self.factory = factory
+        self.cancelled = False
+        self._wheel = wheel
+        self._bucket: dict[ScheduledEvent, None] | None = None
+
+    def create_event(self) -> Event:
+        """Get or create the event that is emitted."""
+        if self.factory is not None:
+            return self.factory()
+        assert self.event is not None
+        return self.event
+
+    def cancel(self) -> bool:
+        """Cancel the scheduled event, returns False if already cancelled or emitted."""
+        with self._wheel.lock:
+            if self.cancelled or self._bucket is None:
+                return False
+            self.cancelled = True
+            self._bucket.pop(self)
+            self._bucket = None
+            self._wheel.count -= 1
+            return True
+
+
+# pylint: disable=too-many-instance-attributes
+class TimingWheel:
+    """
+    Hierarchical hashed timing wheel.
+
+    Each level has ``2**bits`` slots, the slots of level ``n`` span ``2**(bits*n)`` ticks.
+    Entries are cascaded down to the lower levels when the wheel of a lower level completes a turn.
+    Entries beyond the range of all levels are placed in the last slot and re-cascaded.
+    """
+
+    __slots__ = ("tick", "start", "count", "lock", "_bits", "_levels", "_mask", "_wheels", "_current")
+
+    def __init__(self, tick: float = 0.01, bits: int = 8, levels: int = 4, start: float = 0.0) -> None:
+        """
+        Create a new timing wheel.
+
+        :param tick: The duration of a tick in seconds (default = 0.01)
+        :param bits: The number of bits of the slots per level (default = 8, so 256 slots)
+        :param levels: The number of levels of the wheel (default = 4)
+        :param start: The time of the first tick (default = 0.0)
+        """
+        self.tick = tick
+        self.start = start
+        self.count = 0
+        """Number of scheduled entries."""
+        self.lock = threading.RLock()
+        self._bits = bits
+        self._levels = levels
+        self._mask = (1 << bits) - 1
+        self._wheels: list[list[dict[ScheduledEvent, None]]] = [[{} for _ in range(1 << bits)] for _ in range(levels)]
+        self._current = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def to_ticks(self, when: float) -> int:
+        """Convert a time to the tick when it is due, rounded up so that events are never emitted early."""
+        return math.ceil((when - self.start) / self.tick)
+
+    def insert(self, handle: ScheduledEvent) -> int:
+        """Insert a new entry into the wheel and return the new number of entries."""
+        with self.lock:
+            self._add(handle)
+            self.count += 1
+            return self.count
+
+    def _add(self, handle: ScheduledEvent):
+        """Add an entry to the slot of its expiry tick."""
+        bits = self._bits
+        expires = max(handle.expires, self._current)
+        delta = expires - self._current
+        level = 0
+        while delta >> (bits * (level + 1)) and level < self._levels - 1:
+            level += 1
+        if delta >> (bits * self._levels):
+            expires = self._current + (1 << (bits * self._levels)) - 1
+        bucket = self._wheels[level][(expires >> (bits * level)) & self._mask]
+        bucket[handle] = None
+        handle._bucket = bucket  # pylint: disable=protected-access
+
+    def _cascade(self, level: int):
+        """Move the entries of the current slot of a level down to the lower levels."""
+        index = (self._current >> (self._bits * level)) & self._mask
+        wheel = self._wheels[level]
+        bucket = wheel[index]
+        if bucket:
+            wheel[index] = {}
+            for handle in bucket:
+                self._add(handle)
+        if index == 0 and level + 1 < self._levels:
+            self._cascade(level + 1)
+
+    def advance(self, now: float) -> list[ScheduledEvent]:
+        """Advance the wheel to the given time and return all entries that are due."""
+        target = math.floor((now - self.start) / self.tick + 1e-9)  # Tolerate floating point errors
+        due: list[ScheduledEvent] = []
+        with self.lock:
+            wheel = self._wheels[0]
+            while self._current <= target:
+                if not self.count:
+                    self._current = target + 1
+                    break
+                index = self._current & self._mask
+                if index == 0:
+                    self._cascade(1)
+                if bucket := wheel[index]:
+                    wheel[index] = {}
+                    self._current += 1
+                    for handle in bucket:
+                        due.append(handle)
+                        if handle.interval:
+                            # Reschedule periodic entries, they may be due again in this advance
+                            handle.expires += handle.interval
+                            self._add(handle)
+                        else:
+                            handle._bucket = None  # pylint: disable=protected-access
+                            self.count -= 1
+                else:
+                    self._current += 1
+        return due
+
+
+# pylint: disable=too-many-instance-attributes
+class EventScheduler(AsyncDriver):
+    """
+    Scheduler for delayed, timed and periodic emission of events.
+
+    The scheduler is attached to the event system on creation, so that `EventSystem.emit_later()`,
+    `EventSystem.emit_at()` and `EventSystem.emit_every()` can be used.
+    Errors of handlers are passed to the error handler, by default they are logged.
+    """
+
+    __slots__ = ("system", "error_handler", "_wheel", "_clock", "_wakeup", "_thread", "_stopping")
+
+    _task_name = "eventlib-scheduler"
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        system: EventSystem,
+        tick: float = 0.01,
+        bits: int = 8,
+        levels: int = 4,
+        error_handler: Callable[[Exception], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Create a new scheduler and attach it to the event system.
+
+        :param system: The event system to emit the events in.
+        :param tick: The resolution of the scheduler in seconds (default = 0.01)
+        :param bits: The number of bits of the slots per level of the timing wheel (default = 8)
+        :param levels: The number of levels of the timing wheel (default = 4)
+        :param error_handler: The handler of errors that occurred while emitting (default = log the errors)
+        :param clock: The monotonic clock of the scheduler (default = time.monotonic)
+        """
+        self.system = system
+        self.error_handler = error_handler or self._log_error
+        self._clock = clock
+        self._wheel = TimingWheel(tick, bits, levels, start=clock())
+        self._wakeup: Callable[[], None] | None = None
+        self._thread: threading.Thread | None = None
+        self._task = None
+        self._stopping = threading.Event()
+        system.scheduler = self
+
+    def __len__(self) -> int:
+        return len(self._wheel)
+
+    @staticmethod
+    def _log_error(exc: Exception):
+        logger.error("Error while emitting scheduled event", exc_info=exc)
+
+    def _schedule(self, handle: ScheduledEvent) -> ScheduledEvent:
+        """Insert an entry and wake up the driver if it idles."""
+        if self._wheel.insert(handle) == 1 and self._wakeup is not None:
+            self._wakeup()
+        return handle
+
+    def emit_at(self, when: float, event: E) -> ScheduledEvent:
+        """
+        Emit an event at a time of the scheduler's clock.
+
+        :param when: The time of the scheduler's clock (default = time.monotonic).
+        :param event: The event to emit.
+        :return: The handle to cancel the emission.
+        """
+        return self._schedule(ScheduledEvent(self._wheel, self._wheel.to_ticks(when), event=event))
+
+    def emit_later(self, delay: float, event: E) -> ScheduledEvent:
+        """
+        Emit an event after a delay.
+
+        :param delay: The delay in seconds.
+        :param event: The event to emit.
+        :return: The handle to cancel the emission.
+        """
+        return self.emit_at(self._clock() + delay, event)
+
+    def emit_every(self, interval: float, factory: Callable[[], E], delay: float | None = None) -> ScheduledEvent:
+        """
+        Emit an event periodically.
+
+        :param interval: The interval in seconds, at least one tick.
+        :param factory: The factory that creates the event of each emission.
+        :param delay: The delay of the first emission (default = interval)
+        :return: The handle to cancel the periodic emission.
+        """
+        ticks = max(1, round(interval / self._wheel.tick))
+        expires = self._wheel.to_ticks(self._clock() + (interval if delay is None else delay))
+        return self._schedule(ScheduledEvent(self._wheel, expires, factory=factory, interval=ticks))
+
+    def _collect(self) -> list[Event]:
+        """Collect the events that are due, errors of event factories are passed to the error handler."""
+        events = []
+        for handle in self._wheel.advance(self._clock()):
+            try:
+                events.append(handle.create_event())
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self.error_handler(exc)
+        return events
+
+    def run_pending(self):
+        """Emit all events that are due synchronously."""
+        if events := self._collect():
+            try:
+                self.system.emit_many(events)
+            except ExceptionGroup as exc:
+                self.error_handler(exc)
+
+    async def run_pending_async(self):
+        """Emit all events that are due asynchronously."""
+        if events := self._collect():
+            try:
+                await self.system.emit_many_async(events)
+            except ExceptionGroup as exc:
+                self.error_handler(exc)
+
+    # ==============================================================================================
+    # Asyncio driver
+    async def _run_async(self):
+        """Drive the scheduler in an asyncio task."""
+        wakeup, self._wakeup = self._loop_wakeup()
+        try:
+            while True:
+                if len(self._wheel):
+                    await asyncio.sleep(self._wheel.tick)
+                else:
+                    await wakeup.wait()
+                    wakeup.clear()
+                await self.run_pending_async()
+        finally:
+            self._wakeup = None
+
+    def _running(self) -> bool:
+        return self._task is not None or self._thread is not None
+
+    # ==============================================================================================
+    # Thread driver
+    def _run_thread(self):
+        """Drive the scheduler in a thread."""
+        wakeup = threading.Event()
+        self._wakeup = wakeup.set
+        try:
+            while not self._stopping.is_set():
+                if len(self._wheel):
+                    self._stopping.wait(self._wheel.tick)
+                else:
+                    wakeup.wait()
+                    wakeup.clear()
+                self.run_pending()
+        finally:
+            self._wakeup = None
+
+    def start(self):
+        """Start the scheduler in a daemon thread."""
+        if self._running():
+            raise RuntimeError("EventScheduler is already running")
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run_thread, name="eventlib-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread."""
+        if self._thread is not None:
+            self._stopping.set()
+            if self._wakeup is not None:
+                self._wakeup()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
@@ -0,0 +1,273 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Sharded runtime that spreads the emission of events over multiple event loops to use multiple cores.
+
+Every shard runs its own event loop with an independent replica of a template event system, with own circuit breakers.
+Published events are routed to the shards by key, so that events with the same key are emitted in order by the same
+shard, or round-robin::
+
+    runtime = ShardedRuntime(system, shards=4, key=lambda e: e.user_id)
+    with runtime:
+        runtime.publish(UserEvent(user_id=42))
+        runtime.drain()  # Wait until all published events are emitted
+
+In thread mode (default) the shards are threads, which run in parallel on free-threaded CPython builds. With the GIL,
+the process mode runs the shards in separate processes. The events must be picklable and the template must be a
+picklable factory of the event system, e.g. a module-level function.
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+from typing import Any, Callable, Literal, Self
+
+from eventlib.core import Event, EventSub, EventSystem
+from eventlib.threadsafe import ThreadsafeEmitter
+
+logger = logging.getLogger(__name__)
+
+
+# pylint: disable=too-few-public-methods
+class _Drain:
+    """Marker of a drain request to a process shard."""
+
+    __slots__ = ()
+
+
+def _feed(emitter: ThreadsafeEmitter, events: Any):
+    """Forward the events of a process shard from its inter-process queue to its emitter until the stop marker."""
+    while (item := events.get()) is not None:
+        if isinstance(item, _Drain):
+            emitter.join()
+        else:
+            emitter.emit(item)
+        events.task_done()
+    events.task_done()
+
+
+async def _serve_process(emitter: ThreadsafeEmitter, events: Any):
+    """Run the emitter of a process shard until its queue is stopped."""
+    loop = asyncio.get_running_loop()
+    async with emitter:
+        await loop.run_in_executor(None, _feed, emitter, events)
+
+
+def _process_main(
+    factory: Callable[[], EventSystem],
+    events: Any,
+    batch_size: int,
+    error_handler: Callable[[Exception], None] | None,
+):
+    """Entry point of a process shard."""
+    emitter = ThreadsafeEmitter(factory(), batch_size=batch_size, error_handler=error_handler)
+    asyncio.run(_serve_process(emitter, events))
+
+
+# pylint: disable=too-many-instance-attributes
+class ShardedRuntime:
+    """
+    Runtime of multiple shards, each with its own event loop and replica of the template event system.
+
+    The replicas are created on start, later subscriptions to the template are not seen by the shards.
+    Errors of handlers are passed to the error handler of the shards, by default they are logged.
+    """
+
+    __slots__ = (
+        "template",
+        "shards",
+        "key",
+        "mode",
+        "maxsize",
+        "batch_size",
+        "error_handler",
+        "systems",
+        "_emitters",
+        "_stops",
+        "_threads",
+        "_queues",
+        "_processes",
+        "_counter",
+        "_lock",
+    )
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        template: EventSystem | Callable[[], EventSystem],
+        shards: int | None = None,
+        *,
+        key: Callable[[Any], Any] | None = None,
+        mode: Literal["thread", "process"] = "thread",
+        maxsize: int = 10000,
+        batch_size: int = 1000,
+        error_handler: Callable[[Exception], None] | None = None,
+    ) -> None:
+        """
+        Create a new sharded runtime.
+
+        :param template: The event system to replicate, or a factory of the event systems of the shards.
+        :param shards: The number of shards (default = number of CPUs)
+        :param key: The function that returns the routing key of an event (default = round-robin)
+        :param mode: Run the shards in threads or processes (default = "thread")
+        :param maxsize: The maximum number of buffered events per shard before publishers block (default = 10000)
+        :param batch_size: The maximum number of events that a shard emits in one batch (default = 1000)
+        :param error_handler: The handler of errors that occurred while emitting (default = log the errors)
+        """
+        if shards is None:
+            shards = os.cpu_count() or 1
+        if shards < 1:
+            raise ValueError("A runtime requires at least one shard")
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown mode: {mode}")
+        if mode == "process" and isinstance(template, EventSystem):
+            raise ValueError("The process mode requires a picklable factory of the event system")
+        self.template = template
+        self.shards = shards
+        self.key = key
+        self.mode = mode
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.error_handler = error_handler
+        self.systems: list[EventSystem] = []
+        """The replicas of the template in thread mode."""
+        self._emitters: list[ThreadsafeEmitter] = []
+        self._stops: list[Callable[[], Any]] = []
+        self._threads: list[threading.Thread] = []
+        self._queues: list[Any] = []
+        self._processes: list[multiprocessing.Process] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """True if the shards are started."""
+        return bool(self._threads or self._processes)
+
+    def _replicate(self) -> EventSystem:
+        """Create the event system of a shard."""
+        if not isinstance(self.template, EventSystem):
+            return self.template()
+        system = EventSystem(self.template)
+        # The copied chains share the subscriptions, but circuit breakers must not be shared between threads
+        replicas: dict[int, EventSub] = {}
+        for chain in system.chains.values():
+            subs = []
+            for sub in chain.subs:
+                if (replica := replicas.get(id(sub))) is None:
+                    replica = replicas[id(sub)] = sub.replicate()
+                subs.append(replica)
+            chain.subs = subs
+        return system
+
+    def start(self):
+        """Start the shards, if not running yet."""
+        with self._lock:
+            if self.running:
+                return
+            if self.mode == "thread":
+                self._start_threads()
+            else:
+                self._start_processes()
+
+    def _start_threads(self):
+        self.systems = [self._replicate() for _ in range(self.shards)]
+        self._emitters = [ThreadsafeEmitter(s, self.maxsize, self.batch_size, self.error_handler) for s in self.systems]
+        self._stops = [lambda: None] * self.shards
+        ready = [threading.Event() for _ in range(self.shards)]
+        self._threads = [
+            threading.Thread(
+                target=asyncio.run,
+                args=(self._serve_thread(index, ready[index]),),
+                name=f"eventlib-shard-{index}",
+                daemon=True,
+            )
+            for index in range(self.shards)
+        ]
+        for thread in self._threads:
+            thread.start()
+        for event in ready:
+            event.wait()
+
+    async def _serve_thread(self, index: int, ready: threading.Event):
+        """Run the emitter of a thread shard until it is stopped."""
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        self._stops[index] = lambda: loop.call_soon_threadsafe(stop.set)
+        async with self._emitters[index]:
+            ready.set()
+            await stop.wait()
+
+    def _start_processes(self):
+        assert not isinstance(self.template, EventSystem)
+        self._queues = [multiprocessing.JoinableQueue(self.maxsize) for _ in range(self.shards)]
+        self._processes = [
+            multiprocessing.Process(
+                target=_process_main,
+                args=(self.template, events, self.batch_size, self.error_handler),
+                name=f"eventlib-shard-{index}",
+                daemon=True,
+            )
+            for index, events in enumerate(self._queues)
+        ]
+        for process in self._processes:
+            process.start()
+
+    def shard(self, event: Event) -> int:
+        """Get the shard of an event, by its key or round-robin."""
+        if self.key is None:
+            return next(self._counter) % self.shards
+        return hash(self.key(event)) % self.shards
+
+    def publish(self, event: Event, block: bool = True, timeout: float | None = None):
+        """
+        Publish an event to its shard, from any thread. The runtime is started if necessary.
+
+        :param event: The event to emit.
+        :param block: If True, wait for free space in a full buffer, otherwise raise `queue.Full` (default = True)
+        :param timeout: The maximum seconds to wait for free space, then `queue.Full` is raised (optional)
+        """
+        if not self.running:
+            self.start()
+        index = self.shard(event)
+        if self.mode == "thread":
+            self._emitters[index].emit(event, block, timeout)
+        else:
+            self._queues[index].put(event, block, timeout)
+
+    def drain(self):
+        """Wait until all events that were published before are emitted by the shards."""
+        if self.mode == "thread":
+            for emitter in self._emitters:
+                emitter.join()
+        else:
+            for events in self._queues:
+                events.put(_Drain())
+            for events in self._queues:
+                events.join()
+
+    def close(self):
+        """Emit the remaining events and stop the shards."""
+        with self._lock:
+            for stop in self._stops:
+                stop()
+            for events in self._queues:
+                events.put(None)
+            for thread in self._threads:
+                thread.join()
+            for process in self._processes:
+                process.join()
+            for events in self._queues:
+                events.close()
+            self._stops, self._threads, self._queues, self._processes = [], [], [], []
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,473 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Cross-process transport of events over a shared-memory ring buffer.
+
+One producer process writes the events into a ring of fixed-size slots in `multiprocessing.shared_memory`, and every
+consumer process reads all events (fan-out) with its own read position. Event types with a fixed layout are packed
+with `struct` directly into the shared memory, all other events are pickled::
+
+    transport = ShmTransport(slots=4096, slot_size=256, consumers=2)
+    transport.register(Tick, "<qd", fields=("seq", "price"))
+    worker = multiprocessing.Process(target=consume, args=(transport, 0))
+    worker.start()
+    transport.watch(0, worker)  # Don't wait for the consumer once it died
+    ...
+    transport.subscribe(system, Tick)  # Forward the emitted ticks to the consumers
+    transport.close()  # Tell the consumers to stop
+
+    def consume(transport, index):
+        transport.consumer(index).serve(EventSystem())
+
+The consumers are woken up once per sent batch, and the producer waits for space if the slowest live consumer lags
+behind by the whole ring. The registrations must be made before the consumer processes are started. Events that do
+not fit into one slot are written into consecutive slots.
+
+The transport relies on the aligned 8 byte stores of the read and write positions being atomic and ordered after
+the slot contents, which holds on x86-64. The positions use native byte order, so all processes share one machine.
+Python has no memory fences, so the store of a sleeping flag may become visible after the load of the write position.
+Then a wakeup is missed, and the sleeping consumer notices the events by polling, at most 10 ms later.
+"""
+
+import asyncio
+import logging
+import math
+import pickle
+import struct
+import time
+from multiprocessing import get_context
+from multiprocessing.context import BaseContext
+from multiprocessing.process import BaseProcess
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Iterable, Self
+
+from eventlib.core import Event, EventSystem
+
+logger = logging.getLogger(__name__)
+
+_POSITION = struct.Struct("Q")  # Native, copied as a whole instead of byte by byte
+_SLOT_HEADER = struct.Struct("<IH2x")
+
+_KIND_PICKLE = 0
+_KIND_CLOSE = 1
+_KIND_PAD = 2
+_KIND_FIRST_LAYOUT = 3
+
+_MISSED_WAKEUP_POLL = 0.01
+"""Seconds between the checks of a sleeping consumer for events whose wakeup was missed."""
+
+
+# pylint: disable=too-many-instance-attributes
+class ShmTransport:
+    """
+    Single-producer, multi-consumer ring buffer of events in shared memory.
+
+    The process that creates the transport owns the shared memory and is the producer. The transport is passed to
+    the consumer processes as argument of `multiprocessing.Process`, where `consumer()` reads the events.
+    The producer stops waiting for the consumers whose watched process died, they are detached from the ring.
+    """
+
+    __slots__ = (
+        "slots",
+        "slot_size",
+        "consumers",
+        "timeout",
+        "_shm",
+        "_buf",
+        "_header_size",
+        "_sems",
+        "_layouts",
+        "_kinds",
+        "_write",
+        "_published",
+        "_min_read",
+        "_owner",
+        "_closed",
+        "_processes",
+        "_live",
+    )
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        slots: int = 4096,
+        slot_size: int = 256,
+        consumers: int = 1,
+        context: BaseContext | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Create a new transport with its shared memory.
+
+        :param slots: The number of slots of the ring, the maximum number of unread events (default = 4096)
+        :param slot_size: The size of a slot in bytes, larger events take multiple slots (default = 256)
+        :param consumers: The number of consumers that each read all events (default = 1)
+        :param context: The multiprocessing context of the consumer processes (default = the default context)
+        :param timeout: The maximum seconds to wait for space in a full ring, then `TimeoutError` is raised (optional)
+        """
+        if slots < 1 or consumers < 1:
+            raise ValueError("A transport requires at least one slot and one consumer")
+        if slot_size < _SLOT_HEADER.size + 8 or slot_size % 8:
+            raise ValueError("The slot size must be a multiple of 8 bytes and hold at least 8 bytes of payload")
+        self.slots = slots
+        self.slot_size = slot_size
+        self.consumers = consumers
+        self.timeout = timeout
+        # Write position, read positions of the consumers and their sleeping flags, padded to a cache line
+        self._header_size = -(-8 * (1 + 2 * consumers) // 64) * 64
+        self._shm = SharedMemory(create=True, size=self._header_size + slots * slot_size)
+        self._buf: memoryview = self._shm.buf  # type: ignore[assignment]
+        self._buf[: self._header_size] = bytes(self._header_size)
+        context = context or get_context()
+        self._sems = [context.Semaphore(0) for _ in range(consumers)]
+        self._layouts: dict[type, tuple[int, struct.Struct, tuple[str, ...]]] = {}
+        self._kinds: list[tuple[Callable[..., Any], struct.Struct]] = []
+        self._write = 0
+        self._published = 0
+        self._min_read = 0
+        self._owner = True
+        self._closed = False
+        self._processes: dict[int, BaseProcess] = {}
+        self._live = list(range(consumers))
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {
+            "slots": self.slots,
+            "slot_size": self.slot_size,
+            "consumers": self.consumers,
+            "name": self._shm.name,
+            "sems": self._sems,
+            "kinds": [(factory, layout.format, fields) for factory, layout, fields in self._iter_layouts()],
+        }
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.slots = state["slots"]
+        self.slot_size = state["slot_size"]
+        self.consumers = state["consumers"]
+        self.timeout = None
+        self._header_size = -(-8 * (1 + 2 * self.consumers) // 64) * 64
+        self._shm = SharedMemory(state["name"])
+        self._buf = self._shm.buf  # type: ignore[assignment]
+        self._sems = state["sems"]
+        self._layouts = {}
+        self._kinds = []
+        for event_type, fmt, fields in state["kinds"]:
+            self.register(event_type, fmt, fields)
+        self._write = self._published = self._min_read = 0
+        self._owner = False
+        self._closed = False
+        self._processes = {}
+        self._live = list(range(self.consumers))
+
+    def _iter_layouts(self) -> Iterable[tuple[type, struct.Struct, tuple[str, ...]]]:
+        for event_type, (_, layout, fields) in self._layouts.items():
+            yield event_type, layout, fields
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory."""
+        return self._shm.name
+
+    def register(self, event_type: type[Event], fmt: str, fields: Iterable[str] | None = None):
+        """
+        Register the fixed layout of an event type, which is packed with `struct` instead of pickled.
+
+        The event type is constructed with the unpacked values as positional arguments.
+
+        :param event_type: The event type, sub-types are not included.
+        :param fmt: The `struct` format of the fields, e.g. "<qd".
+        :param fields: The names of the fields in order (default = the `__slots__` of the event type)
+        """
+        fields = tuple(fields if fields is not None else getattr(event_type, "__slots__", ()))
+        layout = struct.Struct(fmt)
+        if layout.size > self.slot_size - _SLOT_HEADER.size:
+            raise ValueError(f"Layout of {event_type.__name__} does not fit into a slot")
+        kind = _KIND_FIRST_LAYOUT + len(self._kinds)
+        self._layouts[event_type] = (kind, layout, fields)
+        self._kinds.append((event_type, layout))
+
+    # ==============================================================================================
+    # Producer
+    def watch(self, index: int, process: BaseProcess):
+        """
+        Watch the process of a consumer, the producer stops waiting for the consumer once the process died.
+
+        :param index: The index of the consumer.
+        :param process: The started process that reads the events of the consumer.
+        """
+        if not 0 <= index < self.consumers:
+            raise IndexError(f"Consumer index {index} out of range")
+        self._processes[index] = process
+
+    def _offset(self, seq: int) -> int:
+        return self._header_size + (seq % self.slots) * self.slot_size
+
+    def _check_consumers(self):
+        """Detach the consumers whose watched process died."""
+        for index, process in list(self._processes.items()):
+            if process.exitcode is not None:
+                logger.warning("Detached consumer %d, its process exited with %s", index, process.exitcode)
+                del self._processes[index]
+                self._live.remove(index)
+
+    def _slowest_read(self) -> int:
+        """Get the read position of the slowest live consumer."""
+        reads = struct.unpack_from(f"{self.consumers}Q", self._buf, 8)
+        return min((reads[index] for index in self._live), default=self._write)
+
+    def _wait_space(self, count: int):
+        """Wait until the slowest live consumer has read the slots of the next write positions."""
+        pause = 0.0
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while self._write + count - self._min_read > self.slots:
+            self._min_read = self._slowest_read()
+            if self._write + count - self._min_read <= self.slots:
+                return
+            self._publish()
+            self._check_consumers()
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("The consumers did not read the ring in time")
+            time.sleep(pause)
+            pause = min(pause * 2 or 1e-6, 1e-3)
+
+    def _reserve(self, size: int) -> int:
+        """Reserve the consecutive slots of a record of the given size, returns the number of slots."""
+        count = math.ceil((_SLOT_HEADER.size + size) / self.slot_size)
+        if count > self.slots:
+            raise ValueError(f"Event of {size} bytes does not fit into the ring")
+        if (index := self._write % self.slots) + count > self.slots:
+            # The slots of a record are contiguous, so skip the slots until the end of the ring
+            self._wait_space(self.slots - index)
+            _SLOT_HEADER.pack_into(self._buf, self._offset(self._write), 0, _KIND_PAD)
+            self._write += self.slots - index
+        if self._write + count - self._min_read > self.slots:
+            self._wait_space(count)
+        return count
+
+    def _put(self, kind: int, event: Any):
+        """Write an event into the slots of the write position, without publishing it yet."""
+        if kind == _KIND_PICKLE:
+            data = pickle.dumps(event, pickle.HIGHEST_PROTOCOL)
+            size = len(data)
+            count = self._reserve(size)
+            start = self._offset(self._write) + _SLOT_HEADER.size
+            self._buf[start : start + size] = data
+        elif kind == _KIND_CLOSE:
+            size = 0
+            count = self._reserve(size)
+        else:
+            _, layout, fields = self._layouts[type(event)]
+            size = layout.size
+            count = self._reserve(size)
+            layout.pack_into(
+                self._buf, self._offset(self._write) + _SLOT_HEADER.size, *[getattr(event, field) for field in fields]
+            )
+        _SLOT_HEADER.pack_into(self._buf, self._offset(self._write), size, kind)
+        self._write += count
+
+    def _publish(self):
+        """Publish the written events and wake up the sleeping consumers."""
+        if self._published == self._write:
+            return
+        _POSITION.pack_into(self._buf, 0, self._write)
+        self._published = self._write
+        flags = 8 * (1 + self.consumers)
+        for index, sleeping in enumerate(struct.unpack_from(f"{self.consumers}Q", self._buf, flags)):
+            if sleeping:
+                _POSITION.pack_into(self._buf, flags + 8 * index, 0)
+                self._sems[index].release()
+
+    def send(self, event: Event):
+        """Send an event to all consumers, waits if the ring is full."""
+        layout = self._layouts.get(type(event))
+        self._put(_KIND_PICKLE if layout is None else layout[0], event)
+        self._publish()
+
+    def send_many(self, events: Iterable[Event]):
+        """Send a batch of events to all consumers with a single wakeup, waits if the ring is full."""
+        layouts = self._layouts
+        for event in events:
+            layout = layouts.get(type(event))
+            self._put(_KIND_PICKLE if layout is None else layout[0], event)
+        self._publish()
+
+    def subscribe(self, system: EventSystem, *event_types: type[Event], priority: int = 0):
+        """
+        Forward the emitted events of the given types in the event system to the consumers.
+
+        :param system: The event system of the producer.
+        :param event_types: The event types to forward, including their sub-types (default = all events)
+        :param priority: The priority of the forwarding handler (default = 0)
+        """
+        for event_type in event_types or (Event,):
+            system.add_subscriber(self.send, event_type, priority=priority)
+
+    def close(self):
+        """
+        Tell the consumers to stop after reading the remaining events, and release the shared memory.
+
+        The shared memory is also released if the close marker could not be written within the timeout.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._owner:
+                self._put(_KIND_CLOSE, None)
+                self._publish()
+        finally:
+            self._buf.release()
+            self._shm.close()
+
+    def unlink(self):
+        """Remove the shared memory, once all processes closed it."""
+        self._shm.unlink()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    # ==============================================================================================
+    # Consumer
+    def consumer(self, index: int) -> "ShmConsumer":
+        """Get the consumer with the given index in a consumer process."""
+        if not 0 <= index < self.consumers:
+            raise IndexError(f"Consumer index {index} out of range")
+        return ShmConsumer(self, index)
+
+
+class ShmConsumer:
+    """
+    Reader of the events of a shared-memory transport, with its own read position.
+
+    Fixed layouts are unpacked and pickles are loaded directly from the shared memory, without copying the slots.
+    """
+
+    __slots__ = ("transport", "index", "closed", "_read", "_position", "_flag")
+
+    def __init__(self, transport: ShmTransport, index: int) -> None:
+        self.transport = transport
+        self.index = index
+        self.closed = False
+        """True once the producer closed the transport and all events were read."""
+        self._read: int = _POSITION.unpack_from(transport._buf, 8 + 8 * index)[0]  # pylint: disable=protected-access
+        self._position = 8 + 8 * index
+        self._flag = 8 * (1 + transport.consumers + index)
+
+    def __len__(self) -> int:
+        """The number of unread slots, events may take multiple slots."""
+        write: int = _POSITION.unpack_from(self.transport._buf, 0)[0]  # pylint: disable=protected-access
+        return write - self._read
+
+    def poll(self, max_events: int | None = None) -> list[Event]:
+        """
+        Read the available events without waiting.
+
+        :param max_events: The maximum number of events to read (optional)
+        :return: The events in the order they were sent.
+        """
+        transport = self.transport
+        buf = transport._buf  # pylint: disable=protected-access
+        kinds = transport._kinds  # pylint: disable=protected-access
+        write = _POSITION.unpack_from(buf, 0)[0]
+        events: list[Event] = []
+        read = self._read
+        while read < write and (max_events is None or len(events) < max_events):
+            offset = transport._offset(read)  # pylint: disable=protected-access
+            size, kind = _SLOT_HEADER.unpack_from(buf, offset)
+            start = offset + _SLOT_HEADER.size
+            if kind == _KIND_PAD:
+                read += transport.slots - read % transport.slots
+                continue
+            read += -(-(_SLOT_HEADER.size + size) // transport.slot_size)
+            if kind == _KIND_PICKLE:
+                events.append(pickle.loads(buf[start : start + size]))
+            elif kind == _KIND_CLOSE:
+                self.closed = True
+                break
+            else:
+                factory, layout = kinds[kind - _KIND_FIRST_LAYOUT]
+                events.append(factory(*layout.unpack_from(buf, start)))
+        self._read = read
+        _POSITION.pack_into(buf, self._position, read)
+        return events
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Wait until events are available.
+
+        :param timeout: The maximum seconds to wait (optional)
+        :return: True if events are available.
+        """
+        if len(self):
+            return True
+        buf = self.transport._buf  # pylint: disable=protected-access
+        sem = self.transport._sems[self.index]  # pylint: disable=protected-access
+        deadline = None if timeout is None else time.monotonic() + timeout
+        _POSITION.pack_into(buf, self._flag, 1)
+        try:
+            # Poll in between, in case the producer did not see the flag yet when it published the events
+            while len(self) == 0:
+                remaining = _MISSED_WAKEUP_POLL if deadline is None else deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                sem.acquire(timeout=min(remaining, _MISSED_WAKEUP_POLL))
+        finally:
+            _POSITION.pack_into(buf, self._flag, 0)
+        return bool(len(self))
+
+    @staticmethod
+    def _log_error(exc: Exception):
+        logger.error("Error while emitting transported events", exc_info=exc)
+
+    def serve(
+        self,
+        system: EventSystem,
+        batch_size: int = 1000,
+        error_handler: Callable[[Exception], None] | None = None,
+    ):
+        """
+        Emit the received events in the event system until the producer closed the transport.
+
+        :param system: The event system of the consumer.
+        :param batch_size: The maximum number of events that are emitted in one batch (default = 1000)
+        :param error_handler: The handler of errors that occurred while emitting (default = log the errors)
+        """
+        error_handler = error_handler or self._log_error
+        while not self.closed:
+            if events := self.poll(batch_size):
+                try:
+                    system.emit_many(events)
+                except ExceptionGroup as exc:
+                    error_handler(exc)
+            elif not self.closed:
+                self.wait(0.1)
+
+    async def serve_async(
+        self,
+        system: EventSystem,
+        batch_size: int = 1000,
+        error_handler: Callable[[Exception], None] | None = None,
+    ):
+        """
+        Emit the received events asynchronously in the event system until the producer closed the transport.
+
+        :param system: The event system of the consumer.
+        :param batch_size: The maximum number of events that are emitted in one batch (default = 1000)
+        :param error_handler: The handler of errors that occurred while emitting (default = log the errors)
+        """
+        error_handler = error_handler or self._log_error
+        loop = asyncio.get_running_loop()
+        while not self.closed:
+            if events := self.poll(batch_size):
+                try:
+                    await system.emit_many_async(events)
+                except ExceptionGroup as exc:
+                    error_handler(exc)
+            elif not self.closed:
+                await loop.run_in_executor(None, self.wait, 0.1)
@@ -0,0 +1,122 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Fire-and-forget emission of events with task tracking and bounded concurrency.
+
+The tracker keeps strong references to the tasks of the emissions, limits the number of emissions in flight and passes
+their errors to an error handler::
+
+    TaskTracker(system, max_in_flight=1000)
+    system.emit_nowait(MyEvent())  # Returns immediately
+    ...
+    await system.drain()  # Wait for all emissions at shutdown
+
+If the limit is reached, `emit_nowait()` raises `asyncio.QueueFull`, while `await tracker.submit()` waits for a free
+slot. This keeps the memory bounded under overload.
+"""
+
+import asyncio
+import logging
+from typing import Callable
+
+from eventlib.core import Event, EventSystem
+
+logger = logging.getLogger(__name__)
+
+
+class TaskTracker:
+    """
+    Tracker of the fire-and-forget emissions of an event system.
+
+    The tracker is attached to the event system on creation, so that `EventSystem.emit_nowait()` and
+    `EventSystem.drain()` can be used. Errors of handlers are passed to the error handler, by default they are logged.
+    """
+
+    __slots__ = ("system", "max_in_flight", "error_handler", "rejected", "_tasks")
+
+    def __init__(
+        self,
+        system: EventSystem,
+        max_in_flight: int = 1000,
+        error_handler: Callable[[Exception], None] | None = None,
+    ) -> None:
+        """
+        Create a new task tracker and attach it to the event system.
+
+        :param system: The event system to emit the events in.
+        :param max_in_flight: The maximum number of emissions that run concurrently (default = 1000)
+        :param error_handler: The handler of errors that occurred while emitting (default = log the errors)
+        """
+        self.system = system
+        self.max_in_flight = max_in_flight
+        self.error_handler = error_handler or self._log_error
+        self.rejected = 0
+        """Number of emissions that were rejected because the limit was reached."""
+        self._tasks: set[asyncio.Task] = set()
+        system.tasks = self
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    @staticmethod
+    def _log_error(exc: Exception):
+        logger.error("Error in fire-and-forget emission", exc_info=exc)
+
+    def emit_nowait(self, event: Event, timeout: float | None = None) -> asyncio.Task:
+        """
+        Start the asynchronous emission of an event in the running event loop without waiting for it.
+
+        :param event: The event.
+        :param timeout: The total time budget of the emission in seconds (optional)
+        :return: The task of the emission.
+        :raises asyncio.QueueFull: If the maximum number of emissions in flight is reached.
+        """
+        if len(self._tasks) >= self.max_in_flight:
+            self.rejected += 1
+            raise asyncio.QueueFull(f"Maximum of {self.max_in_flight} emissions in flight reached")
+        loop = asyncio.get_running_loop()  # Fails before the coroutine is created
+        task = loop.create_task(self.system.emit_async(event, timeout))
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+        return task
+
+    async def submit(self, event: Event, timeout: float | None = None) -> asyncio.Task:
+        """
+        Start the asynchronous emission of an event, after waiting for a free slot if the limit is reached.
+
+        :param event: The event.
+        :param timeout: The total time budget of the emission in seconds (optional)
+        :return: The task of the emission.
+        """
+        while len(self._tasks) >= self.max_in_flight:
+            await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+        return self.emit_nowait(event, timeout)
+
+    def _done(self, task: asyncio.Task):
+        """Release the task and pass its error to the error handler."""
+        self._tasks.discard(task)
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            if isinstance(exc, Exception):
+                self.error_handler(exc)
+
+    async def drain(self, timeout: float | None = None) -> bool:
+        """
+        Wait until all emissions completed, including emissions that were started meanwhile.
+
+        :param timeout: The maximum seconds to wait (optional)
+        :return: True if all emissions completed, False if the timeout expired.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while self._tasks:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return False
+            await asyncio.wait(set(self._tasks), timeout=remaining)
+        return True
+
+    def cancel(self):
+        """Cancel all emissions in flight."""
+        for task in list(self._tasks):
+            task.cancel()
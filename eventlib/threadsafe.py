@@ -0,0 +1,181 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Thread-safe emission of events from foreign threads into a running asyncio event loop.
+
+The emitter buffers the events of the producer threads and wakes up the event loop once per burst of events,
+instead of once per event. The event loop drains the buffer in batches with `EventSystem.emit_many_async()`::
+
+    emitter = ThreadsafeEmitter(system)
+    async with emitter:
+        ...
+        # In a worker thread
+        system.emit_threadsafe(MyEvent())
+
+If the buffer is full, the producers block until the event loop caught up (backpressure).
+"""
+
+import asyncio
+import collections
+import logging
+import queue
+import threading
+from typing import Callable
+
+from eventlib.core import Event, EventSystem
+from eventlib.driver import AsyncDriver
+
+logger = logging.getLogger(__name__)
+
+
+# pylint: disable=too-many-instance-attributes
+class ThreadsafeEmitter(AsyncDriver):
+    """
+    Emitter of events from foreign threads into the event loop that runs the emitter.
+
+    The emitter is attached to the event system on creation, so that `EventSystem.emit_threadsafe()` can be used.
+    Errors of handlers are passed to the error handler, by default they are logged.
+    """
+
+    __slots__ = (
+        "system",
+        "maxsize",
+        "batch_size",
+        "error_handler",
+        "_buffer",
+        "_cond",
+        "_scheduled",
+        "_wakeup",
+        "_loop_thread",
+        "_stopping",
+        "_pending",
+    )
+
+    _task_name = "eventlib-threadsafe-emitter"
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        system: EventSystem,
+        maxsize: int = 10000,
+        batch_size: int = 1000,
+        error_handler: Callable[[Exception], None] | None = None,
+    ) -> None:
+        """
+        Create a new emitter and attach it to the event system.
+
+        :param system: The event system to emit the events in.
+        :param maxsize: The maximum number of buffered events before the producers block (default = 10000)
+        :param batch_size: The maximum number of events that are emitted in one batch (default = 1000)
+        :param error_handler: The handler of errors that occurred while emitting (default = log the errors)
+        """
+        self.system = system
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.error_handler = error_handler or self._log_error
+        self._buffer: collections.deque[Event] = collections.deque()
+        self._cond = threading.Condition()
+        self._scheduled = False
+        self._wakeup: Callable[[], None] | None = None
+        self._loop_thread: int | None = None
+        self._task = None
+        self._stopping = False
+        self._pending = 0
+        system.threadsafe_emitter = self
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @staticmethod
+    def _log_error(exc: Exception):
+        logger.error("Error while emitting thread-safe events", exc_info=exc)
+
+    def emit(self, event: Event, block: bool = True, timeout: float | None = None):
+        """
+        Buffer an event for the emission in the event loop, from any thread.
+
+        :param event: The event to emit.
+        :param block: If True, wait for free space in a full buffer, otherwise raise `queue.Full` (default = True)
+        :param timeout: The maximum seconds to wait for free space, then `queue.Full` is raised (optional)
+        """
+        with self._cond:
+            if len(self._buffer) >= self.maxsize:
+                # Never block the event loop, it is the only consumer
+                if not block or threading.get_ident() == self._loop_thread:
+                    raise queue.Full
+                if not self._cond.wait_for(lambda: len(self._buffer) < self.maxsize, timeout):
+                    raise queue.Full
+            self._buffer.append(event)
+            self._pending += 1
+            if self._scheduled:
+                return
+            self._scheduled = True
+            wakeup = self._wakeup
+        if wakeup is not None:
+            wakeup()  # Once per burst
+
+    def _take(self) -> list[Event]:
+        """Take the next batch of events from the buffer."""
+        buffer = self._buffer
+        with self._cond:
+            batch = [buffer.popleft() for _ in range(min(self.batch_size, len(buffer)))]
+            if not buffer:
+                self._scheduled = False
+            self._cond.notify_all()
+        return batch
+
+    async def drain(self):
+        """Emit all buffered events in batches in the current event loop."""
+        while batch := self._take():
+            try:
+                await self.system.emit_many_async(batch)
+            except ExceptionGroup as exc:
+                self.error_handler(exc)
+            finally:
+                with self._cond:
+                    self._pending -= len(batch)
+                    self._cond.notify_all()
+
+    def join(self, timeout: float | None = None) -> bool:
+        """
+        Wait in a foreign thread until all buffered events are emitted by the event loop.
+
+        :param timeout: The maximum seconds to wait (optional)
+        :return: True if all events were emitted, False if the timeout expired.
+        """
+        with self._cond:
+            if threading.get_ident() == self._loop_thread:
+                raise RuntimeError("Cannot join the emitter in its own event loop, use `await drain()` instead")
+            return self._cond.wait_for(lambda: not self._pending, timeout)
+
+    # ==============================================================================================
+    # Asyncio driver
+    async def _run_async(self):
+        """Drain the buffer in an asyncio task whenever a burst of events arrives."""
+        wakeup, set_wakeup = self._loop_wakeup()
+        with self._cond:
+            self._loop_thread = threading.get_ident()
+            self._wakeup = set_wakeup
+        try:
+            while not self._stopping:
+                await self.drain()
+                await wakeup.wait()
+                wakeup.clear()
+            await self.drain()
+        finally:
+            with self._cond:
+                self._wakeup = None
+                self._loop_thread = None
+
+    async def _stop_async(self, task: asyncio.Task):
+        """Stop the task after it emitted the remaining events."""
+        self._stopping = True
+        with self._cond:
+            wakeup = self._wakeup
+        if wakeup is not None:
+            wakeup()
+        try:
+            await task  # Emits the remaining events
+        finally:
+            self._stopping = False
@@ -0,0 +1,243 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Topic based events that are routed by string topics instead of the class hierarchy.
+
+Topics are strings of words separated by dots, e.g. ``orders.eu.42.created``.
+Subscriptions use patterns with the wildcards:
+
+- ``*`` matches exactly one word, e.g. ``orders.eu.*.created``
+- ``#`` matches zero or more words and must be the last word of a pattern, e.g. ``orders.#``
+
+The patterns are stored in a trie, so the cost to match a topic grows with the number of words of the topic and not
+with the number of subscriptions. The resolved chains are cached per topic and invalidated on subscription changes.
+"""
+
+import dataclasses
+from typing import TYPE_CHECKING, Iterator
+
+from eventlib.breaker import CircuitBreaker
+from eventlib.core import Event, EventChain, EventHandler, EventHandlerDecorator, EventSubMetadata, _create_sub
+from eventlib.errors import DEFAULT_ERROR_POLICY, ErrorPolicy
+
+if TYPE_CHECKING:
+    from eventlib.watchdog import BlockingWatchdog
+    from eventlib.yielding import YieldPolicy
+
+WILDCARD_ONE = "*"
+"""Wildcard that matches exactly one word."""
+
+WILDCARD_MANY = "#"
+"""Wildcard that matches zero or more words."""
+
+
+@dataclasses.dataclass
+class TopicEvent(Event):
+    """Event that is routed by its topic. Extend it to add a payload."""
+
+    topic: str
+
+
+# pylint: disable=too-few-public-methods
+class _TopicNode:
+    """Node of the topic trie."""
+
+    __slots__ = ("children", "chain", "many")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TopicNode] = {}
+        self.chain: EventChain[TopicEvent] = EventChain(TopicEvent)
+        """Subscriptions of patterns that end at this node."""
+        self.many: EventChain[TopicEvent] = EventChain(TopicEvent)
+        """Subscriptions of patterns that end with the multi-word wildcard at this node."""
+
+    def walk(self) -> Iterator["_TopicNode"]:
+        """Iterate over this node and all descendants."""
+        yield self
+        for child in self.children.values():
+            yield from child.walk()
+
+
+class TopicRouter:
+    """Routes topic events to the subscriptions of matching topic patterns."""
+
+    __slots__ = ("_root", "_cache", "_sep", "_error_policy", "cache_size", "watchdog", "yield_policy")
+
+    def __init__(
+        self, sep: str = ".", cache_size: int = 4096, error_policy: ErrorPolicy = DEFAULT_ERROR_POLICY
+    ) -> None:
+        """
+        Create a new topic router.
+
+        :param sep: The separator of the words in a topic (default = ".")
+        :param cache_size: The maximum number of topics with cached chains, 0 disables the cache (default = 4096)
+        :param error_policy: The policy how errors of the handlers are handled (default = collect)
+        """
+        self._root = _TopicNode()
+        self._cache: dict[str, EventChain[TopicEvent]] = {}
+        self._sep = sep
+        self._error_policy = error_policy
+        self.cache_size = cache_size
+        self.watchdog: "BlockingWatchdog | None" = None
+        self.yield_policy: "YieldPolicy | None" = None
+
+    @property
+    def error_policy(self) -> ErrorPolicy:
+        """The policy how errors of the handlers are handled."""
+        return self._error_policy
+
+    @error_policy.setter
+    def error_policy(self, policy: ErrorPolicy):
+        self._error_policy = policy
+        self._cache.clear()
+
+    def _split(self, pattern: str) -> list[str]:
+        """Split and validate a subscription pattern."""
+        words = pattern.split(self._sep)
+        if WILDCARD_MANY in words[:-1]:
+            raise ValueError(f"Wildcard '{WILDCARD_MANY}' must be the last word of the pattern {pattern!r}")
+        return words
+
+    # pylint: disable=too-many-arguments
+    def add_subscriber(
+        self,
+        func: EventHandler[TopicEvent],
+        pattern: str,
+        *,
+        priority: int = 0,
+        critical: bool = False,
+        caching: bool = True,
+        timeout: float | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
+        """
+        Add a new subscriber of a topic pattern.
+
+        :param func: The handler function.
+        :param pattern: The topic pattern.
+        :param priority: The priority of the handler (default = 0)
+        :param critical: If True, stop event processing if an error occurs (default = False)
+        :param caching: If True, cache the handler's call method for performance (default = True)
+        :param timeout: The time budget of the handler in asynchronous emissions in seconds (optional)
+        :param breaker: The circuit breaker that guards the handler (optional)
+        """
+        meta = EventSubMetadata(priority=priority, critical=critical, caching=caching, timeout=timeout, breaker=breaker)
+        self._add_sub(func, pattern, meta)
+
+    def _add_sub(self, func: EventHandler[TopicEvent], pattern: str, meta: EventSubMetadata):
+        """Add a subscription of a function to the node of a topic pattern."""
+        words = self._split(pattern)
+        node = self._root
+        for word in words[:-1]:
+            node = node.children.setdefault(word, _TopicNode())
+        sub = _create_sub(TopicEvent, func, meta)
+        if words[-1] == WILDCARD_MANY:
+            node.many.add(sub)
+        else:
+            node.children.setdefault(words[-1], _TopicNode()).chain.add(sub)
+        self._cache.clear()
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def subscribe(
+        self,
+        pattern: str,
+        /,
+        priority: int = 0,
+        critical: bool = False,
+        caching: bool = True,
+        timeout: float | None = None,
+        breaker: CircuitBreaker | None = None,
+    ) -> EventHandlerDecorator[TopicEvent]:
+        """
+        Subscribe to a topic pattern with a decorator.
+
+        :param pattern: The topic pattern
+        :param priority: The priority of the handler (default = 0)
+        :param critical: If True, stop event processing if an error occurs (default = False)
+        :param caching: If True, cache the handler's call method for performance (default = True)
+        :param timeout: The time budget of the handler in asynchronous emissions in seconds (optional)
+        :param breaker: The circuit breaker that guards the handler (optional)
+        :return: The decorator
+        """
+
+        meta = EventSubMetadata(priority=priority, critical=critical, caching=caching, timeout=timeout, breaker=breaker)
+
+        def decorator(func):
+            self._add_sub(func, pattern, meta)
+            return func
+
+        return decorator
+
+    def unsubscribe(self, func: EventHandler[TopicEvent]):
+        """Unsubscribe a function from all topic patterns."""
+        for node in self._root.walk():
+            node.chain.remove(func)
+            node.many.remove(func)
+        self._cache.clear()
+
+    def unsubscribe_all(self, pattern: str):
+        """Unsubscribe all functions from a topic pattern."""
+        words = self._split(pattern)
+        node: _TopicNode | None = self._root
+        for word in words[:-1]:
+            if node is None:
+                return
+            node = node.children.get(word)
+        if node is None:
+            return
+        if words[-1] == WILDCARD_MANY:
+            node.many = EventChain(TopicEvent)
+        elif (child := node.children.get(words[-1])) is not None:
+            child.chain = EventChain(TopicEvent)
+        self._cache.clear()
+
+    def clear_all_subscriptions(self):
+        """Clear all topic subscriptions."""
+        self._root = _TopicNode()
+        self._cache.clear()
+
+    def _match(self, topic: str) -> list[EventChain[TopicEvent]]:
+        """Find the chains of all patterns matching the topic."""
+        found = []
+        nodes = [self._root]
+        for word in topic.split(self._sep):
+            matched = []
+            for node in nodes:
+                if node.many:
+                    found.append(node.many)
+                if (child := node.children.get(word)) is not None:
+                    matched.append(child)
+                if word != WILDCARD_ONE and (child := node.children.get(WILDCARD_ONE)) is not None:
+                    matched.append(child)
+            if not matched:
+                return found
+            nodes = matched
+        for node in nodes:
+            if node.chain:
+                found.append(node.chain)
+            if node.many:
+                found.append(node.many)  # The multi-word wildcard also matches zero words
+        return found
+
+    def get_chain(self, topic: str) -> EventChain[TopicEvent]:
+        """Get the (cached) event chain of all subscriptions matching the topic."""
+        if (chain := self._cache.get(topic)) is not None:
+            return chain
+        chain = EventChain.merged(TopicEvent, self._match(topic))
+        chain.error_policy = self._error_policy
+        if self.cache_size > 0:
+            while len(self._cache) >= self.cache_size:
+                del self._cache[next(iter(self._cache))]  # Evict the oldest topic
+            self._cache[topic] = chain
+        return chain
+
+    def emit(self, event: TopicEvent) -> None:
+        """Call all subscribers of the event topic synchronously."""
+        if chain := self.get_chain(event.topic):
+            chain.call(event)
+
+    async def emit_async(self, event: TopicEvent, timeout: float | None = None) -> None:
+        """Call all subscribers of the event topic asynchronously, optionally within a total time budget."""
+        if chain := self.get_chain(event.topic):
+            await chain.call_async(event, timeout, self.watchdog, self.yield_policy)
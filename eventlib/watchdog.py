@@ -0,0 +1,217 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Watchdog that detects synchronous event handlers that block the event loop in asynchronous emissions.
+
+Synchronous handlers run inline in `EventSystem.emit_async()`, so a slow handler stalls every other coroutine.
+The watchdog is attached to an event system and measures the duration of each synchronous handler::
+
+    system.watchdog = BlockingWatchdog(threshold=0.01, offload_after=3)
+
+Handlers above the threshold are reported with the event type, the handler and a stack sample of the blocked thread.
+Plain functions that are reported repeatedly can be offloaded to a thread pool automatically.
+Without a watchdog, asynchronous emissions have no additional overhead.
+"""
+
+import asyncio
+import collections
+import logging
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import Executor
+from contextlib import AsyncExitStack
+from typing import Callable
+
+from eventlib.core import Event, EventSub, HandlerType
+
+logger = logging.getLogger("eventlib")
+
+_ASYNC_HANDLER_TYPES = (HandlerType.ASYNC_FUNCTION, HandlerType.ASYNC_CONTEXT)
+
+
+# pylint: disable=too-few-public-methods
+class BlockingReport:
+    """Report of a synchronous handler that blocked the event loop."""
+
+    __slots__ = ("event_type", "handler", "qualname", "duration", "stack", "offloaded")
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        event_type: type[Event],
+        handler: Callable,
+        duration: float,
+        stack: str | None = None,
+        offloaded: bool = False,
+    ) -> None:
+        """
+        Create a new report.
+
+        :param event_type: The type of the emitted event.
+        :param handler: The blocking handler.
+        :param duration: The duration of the handler in seconds.
+        :param stack: The stack sample of the blocked thread while the handler was running (optional)
+        :param offloaded: True if the handler is offloaded to the thread pool from now on (default = False)
+        """
+        self.event_type = event_type
+        self.handler = handler
+        self.qualname: str = getattr(handler, "__qualname__", repr(handler))
+        self.duration = duration
+        self.stack = stack
+        self.offloaded = offloaded
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}({self.event_type.__qualname__}, {self.qualname}, "
+            f"{self.duration * 1000:.1f}ms, offloaded={self.offloaded})"
+        )
+
+
+def log_report(report: BlockingReport):
+    """Default reporter that logs the report with the `eventlib` logger."""
+    logger.warning(
+        "Event handler %s blocked the event loop for %.1fms while handling %s%s%s",
+        report.qualname,
+        report.duration * 1000,
+        report.event_type.__qualname__,
+        " (offloaded to the thread pool from now on)" if report.offloaded else "",
+        f"\n{report.stack}" if report.stack else "",
+    )
+
+
+# pylint: disable=too-many-instance-attributes
+class BlockingWatchdog:
+    """
+    Detects synchronous handlers that block the event loop in asynchronous emissions.
+
+    The overhead per handler are two `time.perf_counter()` calls, plus a dictionary update if stacks are sampled.
+    Stacks are sampled by a daemon thread that is started on the first measurement and stopped with `close()`.
+    """
+
+    __slots__ = (
+        "threshold",
+        "offload_after",
+        "executor",
+        "reporter",
+        "reports",
+        "sample_stacks",
+        "_strikes",
+        "_offloaded",
+        "_running",
+        "_samples",
+        "_sampler",
+        "_stopping",
+    )
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        threshold: float = 0.01,
+        *,
+        offload_after: int | None = None,
+        executor: Executor | None = None,
+        reporter: Callable[[BlockingReport], None] | None = log_report,
+        sample_stacks: bool = True,
+        max_reports: int = 100,
+    ) -> None:
+        """
+        Create a new watchdog.
+
+        :param threshold: The duration in seconds above which a synchronous handler is reported (default = 0.01)
+        :param offload_after: The number of reports after which a handler is offloaded to a thread (default = never)
+        :param executor: The executor of offloaded handlers (default = the default executor of the event loop)
+        :param reporter: The callback of the reports (default = log a warning)
+        :param sample_stacks: If True, sample the stack of the blocked thread (default = True)
+        :param max_reports: The number of the most recent reports that are kept in `reports` (default = 100)
+        """
+        self.threshold = threshold
+        self.offload_after = offload_after
+        self.executor = executor
+        self.reporter = reporter
+        self.reports: collections.deque[BlockingReport] = collections.deque(maxlen=max_reports)
+        self.sample_stacks = sample_stacks
+        self._strikes: dict[EventSub, int] = {}
+        self._offloaded: set[EventSub] = set()
+        self._running: dict[int, float] = {}
+        self._samples: dict[tuple[int, float], str] = {}
+        self._sampler: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    def is_offloaded(self, sub: EventSub) -> bool:
+        """Check if the handler of a subscription is offloaded to the thread pool."""
+        return sub in self._offloaded
+
+    async def call(self, sub: EventSub, event: Event, stack: AsyncExitStack):
+        """Call the subscription asynchronously and measure it if the handler is synchronous."""
+        if sub.handler_type in _ASYNC_HANDLER_TYPES:
+            return await sub.call_async(event, stack)
+        if sub in self._offloaded:
+            # Only plain functions are offloaded, they don't use the exit stack
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, sub.call, event, stack)  # type: ignore[arg-type]
+        if not self.sample_stacks:
+            start = time.perf_counter()
+            await sub.call_async(event, stack)
+            duration = time.perf_counter() - start
+            if duration >= self.threshold and sub.handler_type not in _ASYNC_HANDLER_TYPES:
+                self._report(sub, event, duration, None)
+            return None
+        if self._sampler is None:
+            self._start_sampler()
+        ident = threading.get_ident()
+        self._running[ident] = start = time.perf_counter()
+        try:
+            await sub.call_async(event, stack)
+        finally:
+            duration = time.perf_counter() - start
+            self._running.pop(ident, None)
+        sample = self._samples.pop((ident, start), None)
+        if duration >= self.threshold and sub.handler_type not in _ASYNC_HANDLER_TYPES:
+            self._report(sub, event, duration, sample)
+        return None
+
+    def _report(self, sub: EventSub, event: Event, duration: float, stack: str | None):
+        """Report a blocking handler and offload it if it blocked repeatedly."""
+        strikes = self._strikes[sub] = self._strikes.get(sub, 0) + 1
+        offloaded = (
+            self.offload_after is not None
+            and strikes >= self.offload_after
+            and sub.handler_type is HandlerType.FUNCTION
+        )
+        if offloaded:
+            self._offloaded.add(sub)
+        report = BlockingReport(type(event), sub.handler, duration, stack, offloaded)
+        self.reports.append(report)
+        if self.reporter is not None:
+            self.reporter(report)
+
+    def _start_sampler(self):
+        """Start the thread that samples the stacks of blocked threads."""
+        self._stopping.clear()
+        self._sampler = threading.Thread(target=self._run_sampler, name="eventlib-watchdog", daemon=True)
+        self._sampler.start()
+
+    def _run_sampler(self):
+        """Sample the stack of every thread that runs a handler for longer than the threshold."""
+        interval = self.threshold / 2
+        while not self._stopping.wait(interval):
+            now = time.perf_counter()
+            for ident, start in list(self._running.items()):
+                key = (ident, start)
+                if now - start < self.threshold or key in self._samples:
+                    continue
+                frame = sys._current_frames().get(ident)  # pylint: disable=protected-access
+                if frame is not None:
+                    self._samples[key] = "".join(traceback.format_stack(frame))
+                if self._running.get(ident) != start:
+                    self._samples.pop(key, None)  # The handler completed meanwhile
+
+    def close(self):
+        """Stop the stack sampler thread."""
+        if self._sampler is not None:
+            self._stopping.set()
+            self._sampler.join()
+            self._sampler = None
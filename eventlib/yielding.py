@@ -0,0 +1,50 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Cooperative yielding to the event loop in asynchronous emissions with long synchronous chains.
+
+Synchronous handlers run inline in `EventSystem.emit_async()`, so a long chain holds the event loop until it completes.
+With a yield policy the emission yields to the event loop after a number of handlers or an amount of time::
+
+    system.yield_policy = YieldPolicy(max_handlers=50, max_time=0.001)
+
+The order of the handlers and the nesting of context manager handlers are preserved.
+Yielding bounds the stall time of the event loop at the cost of throughput.
+"""
+
+import time
+
+
+class YieldPolicy:
+    """Policy when an asynchronous emission yields to the event loop between two handlers."""
+
+    __slots__ = ("max_handlers", "max_time")
+
+    def __init__(self, max_handlers: int | None = None, max_time: float | None = None) -> None:
+        """
+        Create a new yield policy, at least one limit is required.
+
+        :param max_handlers: Yield after this number of handlers (optional)
+        :param max_time: Yield after this time in seconds since the last yield (optional)
+        """
+        if max_handlers is None and max_time is None:
+            raise ValueError("A yield policy requires `max_handlers` or `max_time`")
+        if max_handlers is not None and max_handlers < 1:
+            raise ValueError("`max_handlers` must be positive")
+        self.max_handlers = max_handlers
+        self.max_time = max_time
+
+    def due(self, handled: int, since: float) -> bool:
+        """
+        Check if the emission should yield to the event loop.
+
+        :param handled: The number of handlers that were called since the last yield.
+        :param since: The `time.perf_counter()` of the last yield or the start of the emission.
+        """
+        if self.max_handlers is not None and handled >= self.max_handlers:
+            return True
+        return self.max_time is not None and handled > 0 and time.perf_counter() - since >= self.max_time
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(max_handlers={self.max_handlers}, max_time={self.max_time})"
@@ -71,7 +71,7 @@ def inheritance_example():
     An event handler is only called once per event, even if it is inherited multiple times.
     """
     print("Merged event:")
-    Merged().emit()  # prints: on_base(...), on_right(...), on_left(...), on_merged(...)
+    Merged().emit()  # prints: on_base(...), on_left(...), on_right(...), on_merged(...)
 
     print("\nLeft event:")
     Left().emit()  # prints: on_base(...), on_left(...)
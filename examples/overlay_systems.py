@@ -0,0 +1,59 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Example of layering event systems, e.g. to add scoped handlers per request or tenant.
+
+In contrast to copying (see `copied_systems.py`), creating an overlay doesn't copy any subscriptions
+and later subscriptions to the parent are visible in the overlay too.
+"""
+
+import dataclasses
+
+from eventlib import Event, EventSystem, OverlayEventSystem
+
+
+@dataclasses.dataclass
+class Request(Event):
+    """Simple event with a value."""
+
+    value: str
+
+
+app = EventSystem()
+
+
+@app.subscribe()
+def on_request(event: Request):
+    """Event handler for requests - in all event systems."""
+    print(f"on_request({event})")
+
+
+# ==================================================================================================
+# Example
+def overlay_example():
+    """
+    Example of overlay event systems per tenant.
+
+    Output::
+
+        on_request(Request(value='Foo'))
+        audit(Request(value='Foo'))
+        ---
+        on_request(Request(value='Bar'))
+
+    """
+    tenant = OverlayEventSystem(app)
+
+    @tenant.subscribe(priority=1)
+    def audit(event: Request):
+        """Event handler for requests - only in the tenant's event system."""
+        print(f"audit({event})")
+
+    tenant.emit(Request(value="Foo"))
+    print("---")
+    app.emit(Request(value="Bar"))
+
+
+if __name__ == "__main__":
+    overlay_example()
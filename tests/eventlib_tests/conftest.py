@@ -7,10 +7,33 @@ Pytest configuration for the eventlib_tests tests.
 
 import pytest
 
-from eventlib import EventSystem
+from eventlib import EventSystem, TopicRouter
+
+
+# pylint: disable=too-few-public-methods
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    """Manually advanced clock for testing, starting at 0."""
+    return FakeClock()
 
 
 @pytest.fixture()
 def system() -> EventSystem:
     """Event system for testing."""
     return EventSystem()
+
+
+@pytest.fixture()
+def router() -> TopicRouter:
+    """Topic router for testing."""
+    return TopicRouter()
@@ -5,10 +5,12 @@
 Test for the base events and global event system.
 """
 
+import dataclasses
 from typing import Callable
 from unittest import mock
 
 import pytest
+from attrs import define
 
 from eventlib import (
     BaseEvent,
@@ -47,6 +49,20 @@ class BaseC(BaseB):
     """BaseC event class."""
 
 
+@dataclasses.dataclass(slots=True, frozen=True)
+class SlottedBase(BaseEvent, event_system=test_system):
+    """Slotted and frozen dataclass event class."""
+
+    value: int
+
+
+@define(frozen=True)
+class SlottedAttrs(BaseEvent, event_system=test_system):
+    """Slotted and frozen attrs event class."""
+
+    value: int
+
+
 def test_base_events():
     """Test the events are correctly set."""
     # Assert
@@ -130,3 +146,19 @@ async def test_emit_async():
     await emit_async(event)
     # Assert
     _call.assert_awaited_once_with(event)
+
+
+def test_slotted_events():
+    """Test that slotted events have no instance dictionary and keep the event system of the class."""
+    test_system.clear_all_subscriptions()
+    # Arrange
+    _call = mock.Mock(Callable)
+    SlottedBase.subscribe()(_call)
+    # Act
+    events = [SlottedBase(1).emit(), SlottedAttrs(2).emit()]
+    # Assert
+    for event in events:
+        assert not hasattr(event, "__dict__")
+        assert type(event).event_system is test_system
+    assert hasattr(BaseC(), "__dict__")  # Sub-classes without slots are unchanged
+    _call.assert_called_once_with(events[0])
@@ -0,0 +1,151 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the circuit breaker of event subscriptions.
+"""
+
+import asyncio
+
+import pytest
+
+from eventlib import CircuitBreaker, CircuitState, Event
+
+
+# pylint: disable=too-few-public-methods
+class A(Event):
+    """Test event class"""
+
+
+def test_breaker_opens_on_errors(system, clock):
+    """Test that the circuit opens on failures, skips the handler and closes again after trial calls"""
+    # Arrange
+    changes = []
+    breaker = CircuitBreaker(
+        failure_rate=0.5,
+        window=4,
+        min_calls=2,
+        reset_timeout=10.0,
+        clock=clock,
+        on_state_change=lambda _, old, new: changes.append((old, new)),
+    )
+    calls = []
+    failing = True
+
+    @system.subscribe(breaker=breaker)
+    def handler(_: A):
+        calls.append(1)
+        if failing:
+            raise ValueError("test")
+
+    # Act & Assert
+    for _ in range(2):
+        with pytest.raises(ExceptionGroup):
+            system.emit(A())
+    assert breaker.state is CircuitState.OPEN
+    system.emit(A())  # Skipped
+    assert len(calls) == 2
+    clock.now = 10.0
+    failing = False
+    system.emit(A())  # Trial call
+    assert len(calls) == 3
+    assert breaker.state is CircuitState.CLOSED
+    assert changes == [
+        (CircuitState.CLOSED, CircuitState.OPEN),
+        (CircuitState.OPEN, CircuitState.HALF_OPEN),
+        (CircuitState.HALF_OPEN, CircuitState.CLOSED),
+    ]
+
+
+def test_breaker_half_open_failure(clock):
+    """Test that a failed trial call opens the circuit again"""
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=1.0, clock=clock)
+    breaker.record(0.0, True)
+    assert not breaker.allow()
+    clock.now = 1.0
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one trial call
+    breaker.record(0.0, True)
+    assert breaker.state is CircuitState.OPEN
+
+
+@pytest.mark.asyncio
+async def test_breaker_slow_calls(system):
+    """Test that slow calls open the circuit"""
+    # Arrange
+    breaker = CircuitBreaker(slow_call_duration=0.001, min_calls=2, window=2)
+    calls = []
+
+    @system.subscribe(breaker=breaker)
+    async def slow(_: A):
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    # Act
+    for _ in range(5):
+        await system.emit_async(A())
+    # Assert
+    assert breaker.state is CircuitState.OPEN
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_breaker_timeout(system, clock):
+    """Test that calls exceeding their time budget count as failures, also for trial calls"""
+    # Arrange
+    breaker = CircuitBreaker(min_calls=1, window=1, reset_timeout=1.0, clock=clock)
+    calls = []
+
+    @system.subscribe(breaker=breaker, timeout=0.001)
+    async def slow(_: A):
+        calls.append(1)
+        await asyncio.sleep(1)
+
+    # Act & Assert
+    with pytest.raises(ExceptionGroup):
+        await system.emit_async(A())
+    assert breaker.state is CircuitState.OPEN
+    clock.now = 1.0
+    with pytest.raises(ExceptionGroup):
+        await system.emit_async(A())  # Trial call
+    assert breaker.state is CircuitState.OPEN
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_breaker_gather(system, clock):
+    """Test that gathered handlers are skipped by an open circuit and their outcomes are recorded"""
+    # Arrange
+    breaker = CircuitBreaker(min_calls=1, window=1, reset_timeout=1.0, clock=clock)
+    calls = []
+
+    @system.subscribe(breaker=breaker)
+    async def failing(_: A):
+        calls.append(1)
+        raise ValueError("test")
+
+    # Act & Assert
+    with pytest.raises(ExceptionGroup):
+        await system.gather(A())
+    assert breaker.state is CircuitState.OPEN
+    assert await system.gather(A()) == []  # Skipped
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_breaker_gather_cancelled(system, clock):
+    """Test that a trial call cancelled by the gathering releases its permit"""
+    # Arrange
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=1.0, clock=clock)
+    breaker.record(0.0, True)
+    clock.now = 1.0
+
+    @system.subscribe(breaker=breaker)
+    async def _slow(_: A):
+        await asyncio.sleep(10)
+
+    system.subscribe(A)(lambda _: "fast")
+    # Act & Assert
+    assert await system.gather(A(), "first") == ["fast"]
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert breaker.allow()
@@ -0,0 +1,166 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the socket bridge between event systems.
+"""
+
+import asyncio
+import dataclasses
+import pickle
+
+import pytest
+
+from eventlib import Event, EventSystem
+from eventlib.bridge import BridgeClient, BridgeServer
+from eventlib.codec import EventCodec
+
+
+@dataclasses.dataclass
+class A(Event):
+    """Test event class"""
+
+    value: int
+
+
+@dataclasses.dataclass
+class B(Event):
+    """Test event class that is not forwarded"""
+
+    value: int
+
+
+@pytest.mark.asyncio
+async def test_forward_tcp(system):
+    """Test that subscribed events are forwarded in order over TCP and emitted in the remote system"""
+    remote = EventSystem()
+    received = []
+    remote.subscribe(Event)(received.append)
+    async with BridgeServer(remote, loads=pickle.loads) as server:
+        _, port = server.address
+        async with BridgeClient(port=port, batch_size=7) as client:
+            client.subscribe(system, A)
+            for value in range(50):
+                await system.emit_async(A(value))
+                await system.emit_async(B(value))
+            await client.flush()
+            assert client.sent == 50
+            for _ in range(100):
+                if len(received) == 50:
+                    break
+                await asyncio.sleep(0.01)
+    assert received == [A(value) for value in range(50)]
+
+
+@pytest.mark.asyncio
+async def test_forward_unix_pool(tmp_path):
+    """Test that a pool of connections forwards all events over a Unix domain socket"""
+    remote = EventSystem()
+    received = []
+    remote.subscribe(A)(received.append)
+    async with BridgeServer(remote, path=str(tmp_path / "bridge.sock"), loads=pickle.loads):
+        async with BridgeClient(path=str(tmp_path / "bridge.sock"), connections=3, batch_size=10) as client:
+            for value in range(100):
+                await client.publish(A(value))
+        for _ in range(100):
+            if len(received) == 100:
+                break
+            await asyncio.sleep(0.01)
+    assert sorted(event.value for event in received) == list(range(100))
+
+
+@pytest.mark.asyncio
+async def test_reconnect_and_bounded_buffer(tmp_path):
+    """Test that the client buffers while the server is down, up to the maximum, and reconnects"""
+    path = str(tmp_path / "bridge.sock")
+    errors = []
+    client = BridgeClient(path=path, maxsize=5, base_delay=0.01, error_handler=errors.append)
+    for value in range(5):
+        client.send(A(value))
+    with pytest.raises(asyncio.QueueFull):
+        client.send(A(5))
+    remote = EventSystem()
+    received = []
+    remote.subscribe(A)(received.append)
+    async with client:
+        await asyncio.sleep(0.05)
+        assert errors
+        assert client.reconnects == len(errors)
+        async with BridgeServer(remote, path=path, loads=pickle.loads):
+            await client.publish(A(5))
+            await client.flush()
+            for _ in range(100):
+                if len(received) == 6:
+                    break
+                await asyncio.sleep(0.01)
+    assert received == [A(value) for value in range(6)]
+
+
+@pytest.mark.asyncio
+async def test_close_without_server(tmp_path):
+    """Test that closing a client with an unreachable server drops the unsent events after the timeout"""
+    client = BridgeClient(path=str(tmp_path / "missing.sock"), base_delay=0.01, error_handler=lambda _: None)
+    await client.start()
+    for value in range(5):
+        client.send(A(value))
+    assert not await client.flush(timeout=0.05)
+    async with asyncio.timeout(1.0):
+        await client.close(timeout=0.05)
+    assert client.sent == 0
+    assert client.dropped == 5
+    assert len(client) == 0
+    assert await client.flush()
+
+
+@pytest.mark.asyncio
+async def test_server_errors():
+    """Test that the errors of remote handlers are passed to the error handler of the server"""
+    remote = EventSystem()
+    remote.subscribe(A)(lambda _: 1 / 0)
+    errors = []
+    async with BridgeServer(remote, loads=pickle.loads, error_handler=errors.append) as server:
+        async with BridgeClient(port=server.address[1]) as client:
+            client.send(A(1))
+        for _ in range(100):
+            if errors:
+                break
+            await asyncio.sleep(0.01)
+    assert len(errors) == 1
+    assert isinstance(errors[0], ExceptionGroup)
+
+
+@pytest.mark.asyncio
+async def test_codec_and_max_frame_size():
+    """Test that the server decodes with the codec and closes connections that send too large frames"""
+    codec = EventCodec(allow_pickle=False)
+    codec.register(A, 1)
+    remote = EventSystem()
+    received = []
+    remote.subscribe(Event)(received.append)
+    errors = []
+    async with BridgeServer(remote, loads=codec.loads, max_frame_size=64, error_handler=errors.append) as server:
+        async with BridgeClient(port=server.address[1], dumps=codec.dumps, batch_size=1) as client:
+            client.send(A(1))
+            client.send(B(2))  # Not registered, dropped by the client
+            await client.flush()
+            assert client.dropped == 1
+            client.send(A(3))
+        for _ in range(100):
+            if len(received) == 2:
+                break
+            await asyncio.sleep(0.01)
+        async with BridgeClient(port=server.address[1], dumps=codec.dumps) as client:
+            for value in range(10):
+                client.send(A(value))
+        for _ in range(100):
+            if errors:
+                break
+            await asyncio.sleep(0.01)
+    assert received == [A(1), A(3)]
+    assert [type(e) for e in errors] == [ValueError]
+
+
+def test_client_requires_address():
+    """Test that a client requires a port or a path"""
+    with pytest.raises(ValueError):
+        BridgeClient()
@@ -0,0 +1,124 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the binary codec of events.
+"""
+
+import dataclasses
+from datetime import datetime
+
+import pytest
+from attrs import define
+from pydantic import BaseModel
+
+from eventlib import BaseEvent, Event
+from eventlib.codec import EventCodec
+
+
+@dataclasses.dataclass
+class Order(Event):
+    """Test event class with primitive, sized and other fields"""
+
+    order_id: int
+    price: float
+    paid: bool
+    name: str
+    raw: bytes
+    created: datetime
+
+
+@define
+class AttrsEvent(BaseEvent):
+    """Test event class with attrs"""
+
+    value: int
+    name: str
+
+
+class PydanticEvent(BaseEvent, BaseModel):
+    """Test event class with pydantic"""
+
+    value: float
+    tags: list[str]
+
+
+@dataclasses.dataclass
+class Unregistered(Event):
+    """Test event class that is pickled as a whole"""
+
+    value: int
+
+
+@pytest.fixture(name="codec")
+def fixture_codec() -> EventCodec:
+    """Codec for testing."""
+    codec = EventCodec()
+    codec.register(Order, 1)
+    codec.register(AttrsEvent, 2)
+    codec.register(PydanticEvent, 3)
+    return codec
+
+
+EVENTS = [
+    Order(42, 9.99, True, "Grüße", b"\x00\x01", datetime(2024, 8, 16, 20)),
+    AttrsEvent(7, "attrs"),
+    PydanticEvent(value=1.5, tags=["a", "b"]),
+    Unregistered(3),
+]
+
+
+def test_roundtrip(codec):
+    """Test that all kinds of events are decoded equal to the encoded events"""
+    for event in EVENTS:
+        assert codec.decode(codec.encode(event)) == event
+    assert codec.loads(codec.dumps(EVENTS)) == EVENTS
+    assert not codec.loads(codec.dumps([]))
+
+
+def test_compact(codec):
+    """Test that registered events are smaller than their pickles"""
+    assert len(codec.encode(AttrsEvent(7, "attrs"))) == 2 + 8 + 4 + 5
+    assert len(codec.encode(AttrsEvent(7, "attrs"))) < len(codec.encode(Unregistered(7)))
+
+
+def test_encode_into_buffers(codec):
+    """Test that events are encoded one after the other into caller-provided buffers"""
+    buffer = bytearray(8)
+    end = codec.encode_into(EVENTS[0], buffer)
+    end = codec.encode_into(EVENTS[1], buffer, end)
+    assert len(buffer) >= end
+    event, offset = codec.decode_from(buffer)
+    assert event == EVENTS[0]
+    assert codec.decode_from(buffer, offset) == (EVENTS[1], end)
+
+    view = memoryview(bytearray(32))
+    assert codec.encode_into(EVENTS[1], view, 4) == 4 + 19
+    assert codec.decode_from(view, 4) == (EVENTS[1], 23)
+    with pytest.raises(ValueError):
+        codec.encode_into(EVENTS[0], view, 23)
+
+
+def test_register_validation(codec):
+    """Test that type ids and classes are unique and only supported classes are registered"""
+    with pytest.raises(ValueError):
+        codec.register(Unregistered, 1)
+    with pytest.raises(ValueError):
+        codec.register(Order, 4)
+    with pytest.raises(ValueError):
+        codec.register(Unregistered, 0)
+    with pytest.raises(TypeError):
+        codec.register(Event, 5)
+
+
+def test_without_pickle(codec):
+    """Test that a codec without pickle rejects pickled events and fields"""
+    strict = EventCodec(allow_pickle=False)
+    strict.register(AttrsEvent, 2)
+    with pytest.raises(TypeError):
+        strict.register(Order, 1)
+    assert strict.loads(codec.dumps([AttrsEvent(7, "attrs")])) == [AttrsEvent(7, "attrs")]
+    with pytest.raises(TypeError):
+        strict.encode(Unregistered(1))
+    with pytest.raises(ValueError):
+        strict.loads(codec.dumps([Unregistered(1)]))
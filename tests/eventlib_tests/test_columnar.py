@@ -0,0 +1,101 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the columnar batches of events.
+"""
+
+import dataclasses
+import os
+import subprocess
+import sys
+
+import pytest
+
+from eventlib import Event, EventSystem
+from eventlib.columnar import ColumnarBatch, filtered, per_row
+
+numpy = pytest.importorskip("numpy")
+
+
+@dataclasses.dataclass
+class Tick(Event):
+    """Test event class of a single record"""
+
+    price: float
+    volume: int
+
+
+class TickBatch(ColumnarBatch, row_type=Tick):
+    """Test batch class of ticks"""
+
+
+def test_lazy_numpy():
+    """Test that numpy is not imported before the first batch is created"""
+    code = "import sys, eventlib, eventlib.columnar; assert 'numpy' not in sys.modules"
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=root)
+
+
+def test_columns():
+    """Test that the columns are arrays of the same length and selections keep the batch type"""
+    batch = TickBatch(price=[1.0, 2.0, 3.0], volume=numpy.array([10, 20, 30]))
+    assert len(batch) == 3
+    assert batch.fields == ("price", "volume")
+    assert batch["price"].dtype == numpy.float64
+
+    view = batch.select(slice(1, None))
+    assert isinstance(view, TickBatch)
+    assert numpy.shares_memory(view["volume"], batch["volume"])
+
+    expensive = batch.filter(lambda b: b["price"] >= 2.0)
+    assert expensive["volume"].tolist() == [20, 30]
+
+    with pytest.raises(ValueError):
+        TickBatch(price=[1.0], volume=[1, 2])
+
+
+def test_rows():
+    """Test that batches are converted to single events and back"""
+    ticks = [Tick(1.5, 10), Tick(2.5, 20)]
+    batch = TickBatch.from_rows(ticks)
+    assert list(batch.rows()) == ticks
+    assert {type(row.price) for row in batch.rows()} == {float}  # type: ignore[attr-defined]
+
+    with pytest.raises(TypeError):
+        list(ColumnarBatch(price=[1.0]).rows())
+    with pytest.raises(TypeError):
+        ColumnarBatch.from_rows(ticks)
+    assert len(ColumnarBatch.from_rows(ticks, ["price"])) == 2
+
+
+def test_handlers(system: EventSystem):
+    """Test that vectorized and per-row handlers are called in the order of their priorities"""
+    calls: list = []
+    system.subscribe(TickBatch, priority=1)(lambda b: calls.append(("sum", int(b["volume"].sum()))))
+    system.subscribe(TickBatch, priority=2)(per_row(lambda t: calls.append(("row", t)), lambda b: b["price"] > 2))
+    system.subscribe(TickBatch, priority=3)(
+        filtered(lambda b: calls.append(("filtered", len(b))), lambda b: b["volume"] > 99)
+    )
+
+    system.emit(TickBatch(price=[1.0, 3.0], volume=[10, 20]))
+    assert calls == [("sum", 30), ("row", Tick(3.0, 20))]
+
+
+@pytest.mark.asyncio
+async def test_async_handlers(system: EventSystem):
+    """Test that asynchronous handlers are adapted"""
+    rows: list = []
+    batches: list = []
+
+    async def on_tick(tick: Tick):
+        rows.append(tick)
+
+    async def on_batch(batch: TickBatch):
+        batches.append(batch)
+
+    system.subscribe(TickBatch)(per_row(on_tick))
+    system.subscribe(TickBatch)(filtered(on_batch, lambda b: b["volume"] > 15))
+    await system.emit_async(TickBatch(price=[1.0, 3.0], volume=[10, 20]))
+    assert rows == [Tick(1.0, 10), Tick(3.0, 20)]
+    assert [len(batch) for batch in batches] == [1]
@@ -7,12 +7,14 @@ Test the core of the event system.
 
 import asyncio
 import contextlib
+import time
 from typing import Awaitable, Callable
 from unittest import mock
 
 import pytest
 
 from eventlib import Event, EventSystem
+from eventlib.core import _get_event_mro
 
 
 # pylint: disable=too-few-public-methods
@@ -404,3 +406,274 @@ async def test_handler_no_context_async(system):
     with pytest.raises(ExceptionGroup) as exc:
         await system.emit_async(event)
     exc.group_contains(TypeError, match="Cannot handle async generator.")
+
+
+# pylint: disable=too-few-public-methods
+class Left(A):
+    """Test event class"""
+
+
+# pylint: disable=too-few-public-methods
+class Right(A):
+    """Test event class"""
+
+
+# pylint: disable=too-few-public-methods
+class Merged(Left, Right):
+    """Test event class"""
+
+
+def test_diamond_inheritance(system):
+    """Test that a handler of a shared parent is called exactly once and in subscription order"""
+    # Arrange
+    results = []
+    system.subscribe(A)(lambda _: results.append("a"))
+    system.subscribe(Right)(lambda _: results.append("right"))
+    system.subscribe(Left)(lambda _: results.append("left"))
+    system.subscribe(Merged)(lambda _: results.append("merged"))
+    system.subscribe(A, priority=-1)(lambda _: results.append("first"))
+    # Act
+    system.emit(Merged())
+    # Assert
+    assert results == ["first", "a", "right", "left", "merged"]
+
+
+def test_chain_built_from_parents(system):
+    """Test that chains built later from the parent chains keep the same order as subscribed"""
+    # Arrange
+    results = []
+    system.subscribe(Right)(lambda _: results.append("right"))
+    system.subscribe(Left)(lambda _: results.append("left"))
+    system.subscribe(A)(lambda _: results.append("a"))
+    system.emit(Left())
+    system.emit(Right())
+    results.clear()
+    # Act
+    system.emit(Merged())
+    # Assert
+    assert results == ["right", "left", "a"]
+    assert [c.__name__ for c in _get_event_mro(Merged)] == ["Merged", "Left", "Right", "A", "Event"]
+
+
+def test_scoped_subscribe(system):
+    """Test that scoped handlers are only called while the scope is entered"""
+    # Arrange
+    results = []
+    system.subscribe(A)(lambda _: results.append("global"))
+
+    def scoped(_: B):
+        results.append("scoped")
+
+    # Act
+    with system.scoped_subscribe(scoped, priority=-1):
+        system.emit(C())
+        system.emit(A())
+    system.emit(C())
+    # Assert
+    assert results == ["scoped", "global", "global", "global"]
+
+
+@pytest.mark.asyncio
+async def test_scoped_subscribe_async_tasks(system):
+    """Test that scoped handlers are isolated between concurrent asyncio tasks"""
+    # Arrange
+    results = []
+
+    async def request(name: str):
+        async def audit(_: A):
+            results.append(name)
+
+        async with system.scoped_subscribe(audit):
+            await asyncio.sleep(0)
+            await system.emit_async(A())
+
+    # Act
+    await asyncio.gather(request("first"), request("second"))
+    await system.emit_async(A())
+    # Assert
+    assert sorted(results) == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_scoped_subscribe_shared_scope(system):
+    """Test that one scope can be entered and exited in any order by concurrent tasks"""
+    # Arrange
+    results = []
+    scope = system.scoped_subscribe(lambda _: results.append("scoped"), A)
+    first_entered = asyncio.Event()
+    second_entered = asyncio.Event()
+    first_exited = asyncio.Event()
+
+    async def first():
+        async with scope:
+            first_entered.set()
+            await second_entered.wait()
+        first_exited.set()
+        await system.emit_async(A())
+
+    async def second():
+        await first_entered.wait()
+        async with scope:
+            second_entered.set()
+            await first_exited.wait()
+            await system.emit_async(A())
+
+    # Act
+    await asyncio.gather(first(), second())
+    await system.emit_async(A())
+    # Assert
+    assert results == ["scoped"]
+
+
+@pytest.mark.asyncio
+async def test_gather(system):
+    """Test scatter-gather emission of all handlers"""
+    # Arrange
+    system.subscribe(A)(lambda _: 0)
+
+    @system.subscribe()
+    async def _slow(_: A):
+        await asyncio.sleep(0.02)
+        return 2
+
+    @system.subscribe()
+    async def _fast(_: A):
+        await asyncio.sleep(0.01)
+        return 1
+
+    # Act & Assert
+    assert await system.gather(A()) == [0, 1, 2]
+    assert await system.gather(A(), "first") == [0]
+    assert sorted(await system.gather(A(), "quorum", n=2)) == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_gather_first_cancels_remaining(system):
+    """Test that the remaining handlers are cancelled as soon as the first result is available"""
+    # Arrange
+    cancelled = asyncio.Event()
+
+    @system.subscribe()
+    async def _slow(_: A):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    @system.subscribe()
+    async def _fast(_: A):
+        return "fast"
+
+    # Act
+    result = await system.gather(A(), "first")
+    # Assert
+    assert result == ["fast"]
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_gather_timeout(system):
+    """Test that a deadline returns the partial results"""
+
+    @system.subscribe()
+    async def _slow(_: A):
+        await asyncio.sleep(10)
+
+    @system.subscribe()
+    async def _fast(_: A):
+        return "fast"
+
+    assert await system.gather(A(), "quorum", n=2, timeout=0.01) == ["fast"]
+
+
+@pytest.mark.asyncio
+async def test_gather_handler_timeout(system):
+    """Test that the time budget of a subscription applies to its gathered handler"""
+
+    @system.subscribe(timeout=0.01)
+    async def _slow(_: A):
+        await asyncio.sleep(0.5)
+
+    @system.subscribe()
+    async def _fast(_: A):
+        return "fast"
+
+    start = time.perf_counter()
+    with pytest.raises(ExceptionGroup) as exc:
+        await system.gather(A())
+    assert time.perf_counter() - start < 0.4
+    assert [type(e) for e in exc.value.exceptions] == [TimeoutError]
+    assert await system.gather(A(), "first") == ["fast"]
+
+
+@pytest.mark.asyncio
+async def test_gather_errors(system):
+    """Test that failing handlers don't count to the completion condition"""
+
+    @system.subscribe()
+    async def _failing(_: A):
+        raise ValueError("test")
+
+    @system.subscribe()
+    async def _ok(_: A):
+        await asyncio.sleep(0)
+        return "ok"
+
+    assert await system.gather(A(), "first") == ["ok"]
+    with pytest.raises(ExceptionGroup) as exc:
+        await system.gather(A(), "quorum", n=2)
+    assert exc.group_contains(ValueError, match="test")
+    with pytest.raises(ValueError):
+        await system.gather(A(), "quorum")
+
+
+@pytest.mark.asyncio
+async def test_emit_async_deadline(system):
+    """Test that the total deadline of an emission is shared by the handlers and contexts are exited"""
+    # Arrange
+    results = []
+
+    @system.subscribe(A, priority=-1)
+    @contextlib.asynccontextmanager
+    async def monitor(_):
+        results.append("enter")
+        try:
+            yield
+        finally:
+            results.append("exit")
+
+    @system.subscribe(priority=0)
+    async def slow(_: A):
+        await asyncio.sleep(10)
+
+    system.subscribe(A, priority=1)(lambda _: results.append("never"))
+    # Act
+    with pytest.raises(ExceptionGroup) as exc:
+        await system.emit_async(A(), timeout=0.01)
+    # Assert
+    assert results == ["enter", "exit"]
+    assert exc.group_contains(TimeoutError, match="slow")
+
+
+@pytest.mark.asyncio
+async def test_handler_timeout_budget(system):
+    """Test the per-handler time budget"""
+    # Arrange
+    results = []
+
+    @system.subscribe(timeout=0.01)
+    async def slow(_: A):
+        await asyncio.sleep(10)
+
+    @system.subscribe(timeout=1.0)
+    async def fast(_: A):
+        results.append("fast")
+
+    # Act & Assert
+    with pytest.raises(ExceptionGroup) as exc:
+        await system.emit_async(A())
+    assert exc.group_contains(TimeoutError, match="slow")
+    system.unsubscribe(slow)
+    await system.emit_async(A(), timeout=1.0)
+    assert results == ["fast"]
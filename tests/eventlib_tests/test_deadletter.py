@@ -0,0 +1,117 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the dead-letter queue and the retries of failed handler invocations.
+"""
+
+import asyncio
+
+import pytest
+
+from eventlib import DeadLetterQueue, ErrorPolicy, Event, FileDeadLetterStore, RetryScheduler
+
+
+# pylint: disable=too-few-public-methods
+class A(Event):
+    """Test event class"""
+
+
+class Flaky:
+    """Handler that fails a number of times before it succeeds"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, event: A):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ValueError(f"failure {self.calls}")
+
+
+def test_dead_letter_queue(system, tmp_path):
+    """Test that the queue records failed invocations, is bounded and persists them"""
+    store = FileDeadLetterStore(tmp_path / "dead_letters.jsonl")
+    queue = DeadLetterQueue(maxlen=2, store=store)
+    system.set_error_policy(ErrorPolicy.collect(queue))
+    system.subscribe(A)(lambda _: 1 / 0)
+    events = [A(), A(), A()]
+    for event in events:
+        with pytest.raises(ExceptionGroup):
+            system.emit(event)
+    assert len(queue) == 2
+    assert queue.dropped == 1
+    assert [letter.event for letter in queue] == events[1:]
+    assert isinstance(queue.pop().exception, ZeroDivisionError)
+    assert len(queue.drain()) == 1
+    assert not queue
+    stored = store.read()
+    assert len(stored) == 3
+    assert stored[0]["event_type"].endswith(".A")
+    assert "ZeroDivisionError" in stored[0]["error"]
+
+
+def test_retry_only_failed_subscription(system, clock):
+    """Test that retries only invoke the failed subscription with exponential backoff"""
+    retries = RetryScheduler(max_retries=3, base_delay=1.0, jitter=0.0, clock=clock)
+    system.set_error_policy(ErrorPolicy.callback(retries))
+    calls = []
+    flaky = Flaky(failures=2)
+    system.subscribe(A)(calls.append)
+    system.subscribe(A)(flaky)
+    system.emit(A())
+    assert len(calls) == 1
+    assert len(retries) == 1
+    retries.run_pending()
+    assert flaky.calls == 1  # Not due yet
+    clock.now = 1.0
+    retries.run_pending()
+    assert flaky.calls == 2
+    assert retries.next_delay() == 2.0
+    clock.now = 3.0
+    retries.run_pending()
+    assert flaky.calls == 3
+    assert not retries
+    assert len(calls) == 1
+
+
+def test_retry_exhausted(system, clock):
+    """Test that invocations that fail all retries are moved to the dead letters"""
+    queue = DeadLetterQueue()
+    retries = RetryScheduler(queue, max_retries=2, base_delay=1.0, max_delay=1.5, jitter=0.0, clock=clock)
+    system.set_error_policy(ErrorPolicy.callback(retries))
+    flaky = Flaky(failures=10)
+    system.subscribe(A)(flaky)
+    system.emit(A())
+    for _ in range(2):
+        clock.now += 1.5
+        retries.run_pending()
+    assert flaky.calls == 3
+    assert not retries
+    letter = queue.pop()
+    assert letter.attempts == 3
+    assert str(letter.exception) == "failure 3"
+
+
+def test_retry_jitter():
+    """Test the randomized backoff"""
+    retries = RetryScheduler(base_delay=1.0, max_delay=4.0, jitter=0.5, rand=lambda: 0.5)
+    assert [retries.delay(n) for n in range(1, 5)] == [0.75, 1.5, 3.0, 3.0]
+
+
+@pytest.mark.asyncio
+async def test_retry_async(system):
+    """Async test that the driver retries failed invocations"""
+    retries = RetryScheduler(base_delay=0.01, jitter=0.0)
+    system.set_error_policy(ErrorPolicy.callback(retries))
+    flaky = Flaky(failures=1)
+    system.subscribe(A)(flaky)
+    async with retries:
+        await system.emit_async(A())
+        for _ in range(100):
+            if flaky.calls == 2:
+                break
+            await asyncio.sleep(0.01)
+    assert flaky.calls == 2
+    assert not retries
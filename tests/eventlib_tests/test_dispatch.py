@@ -0,0 +1,179 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the queued dispatch of events.
+"""
+
+import asyncio
+import dataclasses
+import random
+
+import pytest
+
+from eventlib import ErrorPolicy, Event, PartitionedDispatcher, PriorityDispatcher
+
+
+@dataclasses.dataclass
+class OrderEvent(Event):
+    """Test event class"""
+
+    order_id: int
+    seq: int
+
+
+@pytest.mark.asyncio
+async def test_partitioned_order(system):
+    """Test that events with the same key are handled in order and different keys concurrently"""
+    handled: dict[int, list[int]] = {}
+    running = 0
+    max_running = 0
+
+    @system.subscribe(OrderEvent)
+    async def handler(event: OrderEvent):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(random.random() * 0.002)
+        handled.setdefault(event.order_id, []).append(event.seq)
+        running -= 1
+
+    async with system.partitioned(key=lambda e: e.order_id, partitions=8) as dispatcher:
+        for seq in range(20):
+            for order_id in range(8):
+                await dispatcher.dispatch(OrderEvent(order_id, seq))
+    assert handled == {order_id: list(range(20)) for order_id in range(8)}
+    assert max_running > 1
+    stats = dispatcher.stats()
+    assert sum(stats.dispatched) == 160
+    assert stats.max_depth == 0
+    assert stats.skew == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_partitioned_bounded(system):
+    """Test that the buffers of the partitions are bounded and errors are passed to the error handler"""
+    system.subscribe(OrderEvent)(lambda _: 1 / 0)
+    dispatcher = system.partitioned(key=lambda e: e.order_id, partitions=2, maxsize=2)
+    errors = []
+    dispatcher.error_handler = errors.append
+    dispatcher.dispatch_nowait(OrderEvent(0, 0))
+    dispatcher.dispatch_nowait(OrderEvent(0, 1))
+    with pytest.raises(asyncio.QueueFull):
+        dispatcher.dispatch_nowait(OrderEvent(0, 2))
+    stats = dispatcher.stats()
+    assert stats.dispatched == (2, 0)
+    assert stats.max_depth == 2
+    assert stats.skew == 2.0
+    await dispatcher.close()
+    assert len(errors) == 2
+
+
+@pytest.mark.asyncio
+async def test_partitioned_policy_errors(system):
+    """Test that errors raised outside of the handlers are passed to the error handler and keep the worker alive"""
+
+    def fail(exc: Exception, *_):
+        raise RuntimeError("policy") from exc
+
+    system.set_error_policy(ErrorPolicy.callback(fail))
+    system.subscribe(OrderEvent)(lambda _: 1 / 0)
+    errors = []
+    async with PartitionedDispatcher(system, key=lambda e: e.order_id, error_handler=errors.append) as dispatcher:
+        await dispatcher.dispatch(OrderEvent(0, 0))
+        await dispatcher.dispatch(OrderEvent(0, 1))
+    assert [type(e) for e in errors] == [RuntimeError, RuntimeError]
+
+
+def test_partitions_validation(system):
+    """Test that a dispatcher requires partitions"""
+    with pytest.raises(ValueError):
+        system.partitioned(key=lambda e: e, partitions=0)
+
+
+# pylint: disable=too-few-public-methods
+class Control(Event):
+    """Test event class"""
+
+
+# pylint: disable=too-few-public-methods
+class Bulk(Event):
+    """Test event class"""
+
+
+@pytest.mark.asyncio
+async def test_prioritized_order(system):
+    """Test that urgent events are emitted first and equal priorities in dispatch order"""
+    handled = []
+    system.subscribe(Event)(handled.append)
+    async with system.prioritized(priorities={Control: -1, Bulk: 1}, aging=10.0) as dispatcher:
+        events = [Bulk(), Event(), Bulk(), Control(), Event(), Control()]
+        for event in events:
+            assert dispatcher.dispatch(event)
+        assert len(dispatcher) == 6
+    assert handled == [events[3], events[5], events[1], events[4], events[0], events[2]]
+    assert not dispatcher
+
+
+@pytest.mark.asyncio
+async def test_prioritized_aging(system):
+    """Test that waiting events age, so that less urgent events are not starved"""
+    now = 0.0
+    handled = []
+    system.subscribe(Event)(handled.append)
+    async with system.prioritized(aging=1.0) as dispatcher:
+        dispatcher._clock = lambda: now  # pylint: disable=protected-access
+        old = Bulk()
+        dispatcher.dispatch(old, priority=3)
+        now = 2.0
+        dispatcher.dispatch(Control(), priority=0)
+        now = 4.0
+        dispatcher.dispatch(Control(), priority=0)
+    assert [type(e) for e in handled] == [Control, Bulk, Control]
+
+
+@pytest.mark.asyncio
+async def test_prioritized_shedding(system):
+    """Test that the least urgent events are shed when the buffer is full"""
+    handled = []
+    shed = []
+    system.subscribe(Event)(handled.append)
+    dispatcher = system.prioritized(priority=lambda e: e.order_id, maxsize=2, aging=10.0)
+    dispatcher.shed_handler = shed.append
+    events = [OrderEvent(order_id=priority, seq=0) for priority in (1, 2, 0, 3)]
+    assert dispatcher.dispatch(events[0])
+    assert dispatcher.dispatch(events[1])
+    assert dispatcher.dispatch(events[2])
+    assert not dispatcher.dispatch(events[3])
+    assert shed == [events[1], events[3]]
+    assert dispatcher.shed == 2
+    await dispatcher.close()
+    assert handled == [events[2], events[0]]
+
+
+@pytest.mark.asyncio
+async def test_prioritized_errors(system):
+    """Test that errors are passed to the error handler of the priority dispatcher"""
+    errors = []
+    system.subscribe(Event)(lambda _: 1 / 0)
+    dispatcher = PriorityDispatcher(system, concurrency=2, error_handler=errors.append)
+    for _ in range(3):
+        dispatcher.dispatch(Event())
+    await dispatcher.close()
+    assert len(errors) == 3
+
+
+@pytest.mark.asyncio
+async def test_prioritized_policy_errors(system):
+    """Test that errors raised outside of the handlers are passed to the error handler and keep the workers alive"""
+
+    def fail(exc: Exception, *_):
+        raise RuntimeError("policy") from exc
+
+    system.set_error_policy(ErrorPolicy.callback(fail))
+    system.subscribe(Event)(lambda _: 1 / 0)
+    errors = []
+    async with PriorityDispatcher(system, error_handler=errors.append) as dispatcher:
+        dispatcher.dispatch(Event())
+        dispatcher.dispatch(Event())
+    assert [type(e) for e in errors] == [RuntimeError, RuntimeError]
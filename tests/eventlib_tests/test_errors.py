@@ -0,0 +1,145 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the error policies of event handlers.
+"""
+
+import logging
+
+import pytest
+
+from eventlib import ErrorMode, ErrorPolicy, Event, EventSystem, OverlayEventSystem
+
+
+# pylint: disable=too-few-public-methods
+class A(Event):
+    """Test event class"""
+
+
+# pylint: disable=too-few-public-methods
+class B(A):
+    """Test event class"""
+
+
+def _subscribe_failing(system: EventSystem, calls: list):
+    """Subscribe two failing handlers around a succeeding handler"""
+    system.subscribe(A, priority=0)(lambda _: 1 / 0)
+    system.subscribe(A, priority=1)(calls.append)
+    missing: dict[str, int] = {}
+    system.subscribe(A, priority=2)(lambda _: missing["missing"])
+
+
+def test_collect(system):
+    """Test that the default policy calls all handlers and raises all errors"""
+    calls: list = []
+    _subscribe_failing(system, calls)
+    with pytest.raises(ExceptionGroup) as exc:
+        system.emit(A())
+    assert len(calls) == 1
+    assert [type(e) for e in exc.value.exceptions] == [ZeroDivisionError, KeyError]
+
+
+def test_fail_fast(system):
+    """Test that the fail-fast policy stops at the first error"""
+    calls: list = []
+    _subscribe_failing(system, calls)
+    system.set_error_policy(ErrorPolicy.fail_fast())
+    with pytest.raises(ExceptionGroup) as exc:
+        system.emit(A())
+    assert not calls
+    assert [type(e) for e in exc.value.exceptions] == [ZeroDivisionError]
+
+
+def test_log(system, caplog):
+    """Test that the log policy logs the errors and continues"""
+    calls: list = []
+    _subscribe_failing(system, calls)
+    system.set_error_policy(ErrorPolicy.log())
+    with caplog.at_level(logging.ERROR, logger="eventlib"):
+        system.emit(A())
+    assert len(calls) == 1
+    assert len(caplog.records) == 2
+
+
+def test_callback():
+    """Test that the callback policy passes the errors with the subscription and the event"""
+    errors: list = []
+    system = EventSystem(error_policy=ErrorPolicy.callback(lambda exc, sub, event: errors.append((exc, event))))
+    calls: list = []
+    _subscribe_failing(system, calls)
+    event = A()
+    system.emit(event)
+    assert len(calls) == 1
+    assert [(type(e), ev) for e, ev in errors] == [(ZeroDivisionError, event), (KeyError, event)]
+
+
+def test_callback_requires_handler():
+    """Test that the callback mode requires a handler"""
+    with pytest.raises(ValueError):
+        ErrorPolicy(ErrorMode.CALLBACK)
+
+
+def test_critical_stops_with_log(system):
+    """Test that critical handlers still stop the processing if errors are not raised"""
+    errors: list = []
+    calls: list = []
+    system.set_error_policy(ErrorPolicy.log(lambda exc, sub, event: errors.append(exc)))
+    system.subscribe(A, critical=True)(lambda _: 1 / 0)
+    system.subscribe(A, priority=1)(calls.append)
+    system.emit(A())
+    assert len(errors) == 1
+    assert not calls
+
+
+def test_policy_per_event_type(system):
+    """Test that the policy of the most specific event type applies, also to chains that already exist"""
+    errors: list = []
+    system.subscribe(A)(lambda _: 1 / 0)
+    with pytest.raises(ExceptionGroup):
+        system.emit(B())
+    system.set_error_policy(ErrorPolicy.callback(lambda exc, sub, event: errors.append(exc)), B)
+    system.emit(B())
+    assert len(errors) == 1
+    with pytest.raises(ExceptionGroup):
+        system.emit(A())
+
+
+def test_overlay_policy(system):
+    """Test that the overlay falls back to the policy of the parent and can override it"""
+    errors: list = []
+    system.subscribe(A)(lambda _: 1 / 0)
+    system.set_error_policy(ErrorPolicy.callback(lambda exc, sub, event: errors.append(exc)))
+    overlay = OverlayEventSystem(system)
+    overlay.emit(A())
+    assert len(errors) == 1
+    overlay.set_error_policy(ErrorPolicy.collect())
+    with pytest.raises(ExceptionGroup):
+        overlay.emit(A())
+    system.emit(A())
+    assert len(errors) == 2
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_async(system):
+    """Async test that the fail-fast policy stops at the first error"""
+    calls: list = []
+    _subscribe_failing(system, calls)
+    system.set_error_policy(ErrorPolicy.fail_fast())
+    with pytest.raises(ExceptionGroup) as exc:
+        await system.emit_async(A())
+    assert not calls
+    assert [type(e) for e in exc.value.exceptions] == [ZeroDivisionError]
+
+
+@pytest.mark.asyncio
+async def test_callback_async(system):
+    """Async test that the callback policy continues and raises nothing, also with time budgets"""
+    errors: list = []
+    calls: list = []
+    _subscribe_failing(system, calls)
+    system.set_error_policy(ErrorPolicy.callback(lambda exc, sub, event: errors.append(exc)))
+    await system.emit_async(A())
+    await system.emit_async(A(), timeout=1.0)
+    assert len(calls) == 2
+    assert len(errors) == 4
@@ -0,0 +1,117 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the append-only event journal.
+"""
+
+import dataclasses
+import itertools
+from typing import cast
+
+import pytest
+
+from eventlib import Event, EventSystem
+from eventlib.codec import EventCodec
+from eventlib.journal import EventJournal
+
+
+@dataclasses.dataclass
+class Tick(Event):
+    """Test event class"""
+
+    value: int
+    name: str
+
+
+@pytest.fixture(name="codec")
+def fixture_codec() -> EventCodec:
+    """Codec for testing."""
+    codec = EventCodec()
+    codec.register(Tick, 1)
+    return codec
+
+
+def collect(system: EventSystem) -> list[Event]:
+    """Collect the events emitted in the event system."""
+    received: list[Event] = []
+    system.add_subscriber(received.append, Event)
+    return received
+
+
+def test_journal_replay(tmp_path, system: EventSystem, codec: EventCodec):
+    """Test that the journaled events of an event system are replayed in order"""
+    with EventJournal(tmp_path, codec) as journal:
+        journal.subscribe(system)
+        for i in range(100):
+            system.emit(Tick(i, f"tick-{i}"))
+        assert journal.next_seq == 100
+
+    replayed = EventSystem()
+    received = collect(replayed)
+    with EventJournal(tmp_path, codec) as journal:
+        assert journal.replay(replayed, batch_size=7) == 100
+    assert received == [Tick(i, f"tick-{i}") for i in range(100)]
+
+
+def test_journal_ranges(tmp_path, codec: EventCodec):
+    """Test that time and sequence ranges are read across segments"""
+    clock = itertools.count(1000.0, 0.5)
+    with EventJournal(tmp_path, codec, segment_size=512, index_interval=3, clock=lambda: next(clock)) as journal:
+        for i in range(50):
+            assert journal.append(Tick(i, "x" * (i % 5))) == i
+        assert len(list(tmp_path.glob("*.log"))) > 1
+
+        records = list(journal.read(start=1010.0, end=1012.0))
+        assert [r.seq for r in records] == [20, 21, 22, 23]
+        assert [r.timestamp for r in records] == [1010.0, 1010.5, 1011.0, 1011.5]
+        assert [cast(Tick, r.event).value for r in journal.read(start_seq=17, end_seq=33)] == list(range(17, 33))
+
+        replayed = EventSystem()
+        received = collect(replayed)
+        assert journal.replay(replayed, start_seq=45) == 5
+        assert received == [Tick(i, "x" * (i % 5)) for i in range(45, 50)]
+
+
+def test_journal_reopen(tmp_path):
+    """Test that a reopened journal continues after the last record"""
+    with EventJournal(tmp_path, segment_size=1024, index_interval=4) as journal:
+        for i in range(30):
+            journal.append(Tick(i, "pickled"))
+
+    # Continues after the last record, the events of an unregistered class are pickled
+    with EventJournal(tmp_path, segment_size=1024, index_interval=4) as journal:
+        assert journal.next_seq == 30
+        assert journal.append(Tick(30, "pickled")) == 30
+        assert [r.seq for r in journal.read()] == list(range(31))
+        assert [r.event for r in journal.read(start_seq=29)] == [Tick(29, "pickled"), Tick(30, "pickled")]
+
+
+def test_journal_too_large(tmp_path, codec: EventCodec):
+    """Test that an event larger than a segment is rejected"""
+    with EventJournal(tmp_path, codec, segment_size=64) as journal:
+        with pytest.raises(ValueError):
+            journal.append(Tick(0, "x" * 100))
+        assert journal.append(Tick(1, "")) == 0
+
+
+def test_journal_encode_error(tmp_path, codec: EventCodec):
+    """Test that an unencodable event is rejected without rolling the segment"""
+    with EventJournal(tmp_path, codec, segment_size=1024) as journal:
+        assert journal.append(Tick(0, "")) == 0
+        with pytest.raises(UnicodeEncodeError):
+            journal.append(Tick(1, "\ud800"))
+        assert journal.append(Tick(2, "")) == 1
+        assert len(list(tmp_path.glob("*.log"))) == 1
+
+
+@pytest.mark.asyncio
+async def test_journal_replay_async(tmp_path, codec: EventCodec):
+    """Test that a sequence range is replayed asynchronously with fsync enabled"""
+    with EventJournal(tmp_path, codec, fsync=True, commit_size=10) as journal:
+        for i in range(25):
+            journal.append(Tick(i, ""))
+        replayed = EventSystem()
+        received = collect(replayed)
+        assert await journal.replay_async(replayed, start_seq=5, end_seq=15, batch_size=4) == 10
+        assert [e.value for e in received] == list(range(5, 15))  # type: ignore[attr-defined]
@@ -0,0 +1,133 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the layered overlay event systems.
+"""
+
+import pytest
+
+from eventlib import Event, EventSystem, OverlayEventSystem
+
+
+# pylint: disable=too-few-public-methods
+class A(Event):
+    """Test event class"""
+
+
+# pylint: disable=too-few-public-methods
+class B(A):
+    """Test event class"""
+
+
+def test_overlay(system):
+    """Test that an overlay calls the parent's and its own handlers in priority order"""
+    # Arrange
+    results = []
+    system.subscribe(A)(lambda _: results.append("parent"))
+    overlay = OverlayEventSystem(system)
+    overlay.subscribe(B, priority=-1)(lambda _: results.append("overlay"))
+    # Act
+    overlay.emit(B())
+    system.emit(B())
+    overlay.emit(A())
+    # Assert
+    assert results == ["overlay", "parent", "parent", "parent"]
+
+
+def test_overlay_no_local_subscriptions(system):
+    """Test that an overlay without own handlers uses the chain of the parent"""
+    system.subscribe(A)(lambda _: None)
+    overlay = OverlayEventSystem(system)
+    # pylint: disable=protected-access
+    assert overlay._get_chain(B) is system._get_chain(B)
+
+
+def test_overlay_parent_changes(system):
+    """Test that changes of the parent are visible in the overlay"""
+    # Arrange
+    results = []
+    overlay = OverlayEventSystem(system)
+    overlay.subscribe(A)(lambda _: results.append("overlay"))
+    overlay.emit(B())
+
+    def on_parent(_: A):
+        results.append("parent")
+
+    # Act & Assert
+    system.subscribe(B, priority=1)(on_parent)
+    overlay.emit(B())
+    assert results == ["overlay", "overlay", "parent"]
+    system.unsubscribe(on_parent)
+    overlay.emit(B())
+    assert results == ["overlay", "overlay", "parent", "overlay"]
+
+
+def test_overlay_unsubscribe(system):
+    """Test that unsubscribing from an overlay does not modify the parent"""
+    # Arrange
+    results = []
+
+    def handler(_: A):
+        results.append(1)
+
+    system.subscribe(A)(handler)
+    overlay = OverlayEventSystem(system)
+    overlay.subscribe(A)(handler)
+    overlay.emit(A())
+    # Act
+    overlay.unsubscribe(handler)
+    overlay.emit(A())
+    # Assert
+    assert results == [1, 1, 1]
+
+
+def test_nested_overlay(system):
+    """Test overlays of overlays"""
+    # Arrange
+    results = []
+    system.subscribe(A)(lambda _: results.append(0))
+    first = OverlayEventSystem(system)
+    first.subscribe(A)(lambda _: results.append(1))
+    second = OverlayEventSystem(first)
+    second.subscribe(A)(lambda _: results.append(2))
+    second.emit(A())
+    # Act
+    system.subscribe(A)(lambda _: results.append(3))
+    second.emit(A())
+    # Assert
+    assert results == [0, 1, 2, 0, 1, 2, 3]
+
+
+def test_copy_overlay(system):
+    """Test copying an overlay into an independent event system"""
+    # Arrange
+    results = []
+    system.subscribe(B)(lambda _: results.append("parent"))
+    overlay = OverlayEventSystem(system)
+    overlay.subscribe(A)(lambda _: results.append("overlay"))
+    # Act
+    copy = EventSystem(overlay)
+    system.clear_all_subscriptions()
+    copy.emit(B())
+    # Assert
+    assert results == ["parent", "overlay"]
+
+
+@pytest.mark.asyncio
+async def test_overlay_async(system):
+    """Async test of an overlay"""
+    results = []
+
+    @system.subscribe()
+    async def _parent(_: A):
+        results.append("parent")
+
+    overlay = OverlayEventSystem(system)
+
+    @overlay.subscribe()
+    async def _overlay(_: A):
+        results.append("overlay")
+
+    await overlay.emit_async(A())
+    assert results == ["parent", "overlay"]
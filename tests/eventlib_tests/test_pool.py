@@ -0,0 +1,75 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the object pools of events.
+"""
+
+import dataclasses
+
+import pytest
+
+from eventlib import BaseEvent, EventSystem, PooledEvent
+
+pool_system = EventSystem()
+
+
+@dataclasses.dataclass(slots=True)
+class Tick(PooledEvent, pool_size=2):
+    """Test event class with a pool"""
+
+    price: float
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class DebugTick(PooledEvent, BaseEvent, debug=True, event_system=pool_system):
+    """Test event class of the global event system with a pool in debug mode"""
+
+    price: float
+
+
+def test_reuse(system: EventSystem):
+    """Test that emitted events are re-used, unless a handler retained them"""
+    prices = []
+    system.subscribe(Tick)(lambda e: prices.append(e.price))
+    first = Tick.acquire(1.0)
+    assert first.emit_in(system) is first
+    second = Tick.acquire(price=2.0)
+    assert second is first
+    assert second.price == 2.0
+
+    retained: list[Tick] = []
+    system.subscribe(Tick)(retained.append)
+    second.emit_in(system)
+    assert Tick.acquire(3.0) is not second
+    assert retained == [Tick(2.0)]
+    assert prices == [1.0, 2.0]
+
+
+def test_pool_size():
+    """Test that the pool keeps at most the configured number of events"""
+    Tick._pool.clear()  # pylint: disable=protected-access
+    events = [Tick.acquire(float(i)) for i in range(3)]
+    for event in events:
+        event.release()
+    assert Tick._pool == events[:2]  # pylint: disable=protected-access
+    with pytest.raises(ValueError):
+        Tick.acquire(1.0).emit()
+
+
+@pytest.mark.asyncio
+async def test_debug():
+    """Test that the debug mode detects use after release"""
+    pool_system.clear_all_subscriptions()
+    pool_system.subscribe(DebugTick)(lambda e: e.price)
+    event = DebugTick.acquire(1.0)
+    assert await event.emit_async() is event
+    with pytest.raises(RuntimeError):
+        _ = event.price
+    with pytest.raises(RuntimeError):
+        event.release()
+
+    again = DebugTick.acquire(2.0)
+    assert again is event
+    assert type(again) is DebugTick  # pylint: disable=unidiomatic-typecheck
+    assert again.price == 2.0
@@ -0,0 +1,163 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the background event loop runner of synchronous emissions.
+"""
+
+import asyncio
+import contextlib
+import threading
+
+import pytest
+
+from eventlib import Event, LoopRunner
+
+
+# pylint: disable=too-few-public-methods
+class A(Event):
+    """Test event class"""
+
+
+def test_emit_async_handlers_blocking(system):
+    """Test that sync handlers always run in the emitting thread and all handlers run in priority order"""
+    calls = []
+
+    @system.subscribe(A, priority=0)
+    def first(_: A):
+        calls.append(("first", threading.current_thread().name))
+
+    @system.subscribe(A, priority=1)
+    async def second(_: A):
+        await asyncio.sleep(0.01)
+        calls.append(("second", threading.current_thread().name))
+
+    @system.subscribe(A, priority=2)
+    def third(_: A):
+        calls.append(("third", threading.current_thread().name))
+
+    emitter = threading.current_thread().name
+    expected = [("first", emitter), ("second", "eventlib-loop-runner"), ("third", emitter)]
+    with LoopRunner(system):
+        for _ in range(3):
+            assert system.emit(A()) is None
+            assert calls == expected
+            calls.clear()
+        # Also in a foreign thread
+        thread = threading.Thread(target=system.emit, args=(A(),), name="emitter")
+        thread.start()
+        thread.join()
+        assert calls == [("first", "emitter"), ("second", "eventlib-loop-runner"), ("third", "emitter")]
+
+
+def test_emit_async_context_handlers(system):
+    """Test that handlers returning an async context manager run in the background loop"""
+    calls = []
+
+    @system.subscribe(A)
+    @contextlib.asynccontextmanager
+    async def context_handler(_: A):
+        calls.append("enter")
+        yield
+        calls.append("exit")
+
+    with LoopRunner(system):
+        system.emit(A())
+        system.emit(A())
+    assert calls == ["enter", "exit"] * 2
+
+
+def test_emit_in_runner_loop(system):
+    """Test that blocking emissions in the loop of the runner fail before any handler is called"""
+    calls = []
+
+    @system.subscribe(A, priority=0)
+    async def async_handler(_: A):
+        calls.append("async")
+
+    system.subscribe(A, priority=1)(lambda _: calls.append("sync"))
+    with LoopRunner(system) as runner:
+        system.emit(A())
+        calls.clear()
+
+        async def emit():
+            system.emit(A())
+
+        with pytest.raises(RuntimeError):
+            asyncio.run_coroutine_threadsafe(emit(), runner.loop).result(timeout=1)
+    assert not calls
+
+
+def test_emit_fire_and_forget(system):
+    """Test that sync emissions return a future of the async handlers in fire-and-forget mode"""
+    done = threading.Event()
+
+    @system.subscribe(A)
+    async def async_handler(_: A):
+        await asyncio.sleep(0.01)
+        done.set()
+
+    with LoopRunner(system, wait=False):
+        future = system.emit(A())
+        assert future is not None
+        future.result(timeout=1)
+    assert done.is_set()
+
+
+def test_emit_errors(system):
+    """Test that the errors of sync and async handlers are combined in blocking mode"""
+
+    @system.subscribe(A)
+    async def async_handler(_: A):
+        raise KeyError("async")
+
+    system.subscribe(A)(lambda _: 1 / 0)
+    with LoopRunner(system):
+        with pytest.raises(ExceptionGroup) as exc:
+            system.emit(A())
+    assert sorted(type(e).__name__ for e in exc.value.exceptions) == ["KeyError", "ZeroDivisionError"]
+
+
+def test_emit_critical_error(system):
+    """Test that a failing critical async handler stops the following sync handlers"""
+    calls = []
+
+    @system.subscribe(A, priority=0, critical=True)
+    async def async_handler(_: A):
+        raise KeyError("async")
+
+    system.subscribe(A, priority=1)(calls.append)
+    with LoopRunner(system):
+        with pytest.raises(ExceptionGroup):
+            system.emit(A())
+    assert not calls
+
+
+def test_fire_and_forget_errors(system):
+    """Test that errors of async handlers in fire-and-forget mode are passed to the error handler"""
+    errors = []
+
+    @system.subscribe(A)
+    async def async_handler(_: A):
+        raise KeyError("async")
+
+    with LoopRunner(system, wait=False, error_handler=errors.append):
+        future = system.emit(A())
+        assert future is not None
+        with pytest.raises(ExceptionGroup):
+            future.result(timeout=1)
+    assert len(errors) == 1
+
+
+def test_start_on_first_emission(system):
+    """Test that the runner starts on the first emission and restarts after stopping"""
+
+    @system.subscribe(A)
+    async def async_handler(_: A):
+        pass
+
+    runner = LoopRunner(system)
+    system.emit(A())
+    runner.stop()
+    system.emit(A())
+    runner.stop()
@@ -0,0 +1,153 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the delayed and scheduled emission of events.
+"""
+
+import asyncio
+import dataclasses
+import random
+import threading
+
+import pytest
+
+from eventlib import Event, EventScheduler
+from eventlib.scheduler import ScheduledEvent, TimingWheel
+
+
+@dataclasses.dataclass
+class Tick(Event):
+    """Test event class"""
+
+    value: int = 0
+
+
+def test_timing_wheel():
+    """Test that the entries of all levels are due exactly at their tick"""
+    # Arrange
+    rnd = random.Random(42)
+    wheel = TimingWheel(tick=1.0, bits=3, levels=3)
+    expiries = [rnd.randrange(0, 2000) for _ in range(500)]
+    handles = [wheel.insert(ScheduledEvent(wheel, expires, event=Tick(expires))) for expires in expiries]
+    assert handles[-1] == 500
+    # Act
+    due_at: dict[int, list[int]] = {}
+    for now in range(2001):
+        due_at[now] = sorted(h.expires for h in wheel.advance(now))
+    # Assert
+    for now, due in due_at.items():
+        assert due == sorted(e for e in expiries if e == now)
+    assert len(wheel) == 0
+
+
+def test_timing_wheel_cancel():
+    """Test cancellation of entries"""
+    wheel = TimingWheel(tick=1.0, bits=2, levels=2)
+    first = ScheduledEvent(wheel, 5, event=Tick())
+    second = ScheduledEvent(wheel, 100, event=Tick())  # beyond the range of all levels
+    wheel.insert(first)
+    wheel.insert(second)
+    assert first.cancel()
+    assert not first.cancel()
+    assert len(wheel) == 1
+    assert not wheel.advance(99)
+    assert wheel.advance(100) == [second]
+    assert not second.cancel()
+
+
+def test_scheduler(system, clock):
+    """Test delayed, timed and periodic emission"""
+    # Arrange
+    EventScheduler(system, tick=0.1, clock=clock)
+    results = []
+    system.subscribe(Tick)(lambda e: results.append(e.value))
+    counter = iter(range(100, 200))
+    system.emit_later(0.5, Tick(1))
+    system.emit_at(0.25, Tick(2))
+    system.emit_later(0.3, Tick(3)).cancel()
+    periodic = system.emit_every(1.0, lambda: Tick(next(counter)))
+    # Act & Assert
+    assert system.scheduler is not None
+    clock.now = 0.2
+    system.scheduler.run_pending()
+    assert not results
+    clock.now = 0.5
+    system.scheduler.run_pending()
+    assert results == [2, 1]
+    clock.now = 2.0
+    system.scheduler.run_pending()
+    assert results == [2, 1, 100, 101]
+    periodic.cancel()
+    clock.now = 5.0
+    system.scheduler.run_pending()
+    assert results == [2, 1, 100, 101]
+
+
+def test_scheduler_errors(system, clock):
+    """Test that handler errors are passed to the error handler"""
+    errors = []
+    scheduler = EventScheduler(system, tick=0.1, clock=clock, error_handler=errors.append)
+    system.subscribe(Tick)(lambda _: 1 / 0)
+    system.emit_later(0.1, Tick())
+    system.emit_later(0.1, Tick())
+    clock.now = 1.0
+    scheduler.run_pending()
+    assert len(errors) == 1
+    assert isinstance(errors[0], ExceptionGroup)
+    assert len(errors[0].exceptions) == 2
+
+
+def test_scheduler_factory_errors(system, clock):
+    """Test that errors of periodic factories are passed to the error handler without losing other events"""
+    errors = []
+    results = []
+    scheduler = EventScheduler(system, tick=0.1, clock=clock, error_handler=errors.append)
+    system.subscribe(Tick)(lambda e: results.append(e.value))
+    system.emit_every(1.0, lambda: Tick(1 // 0))
+    system.emit_later(1.0, Tick(1))
+    clock.now = 2.0
+    scheduler.run_pending()
+    assert results == [1]
+    assert [type(e) for e in errors] == [ZeroDivisionError, ZeroDivisionError]
+
+
+def test_scheduler_thread_factory_errors(system):
+    """Test that the driver thread survives errors of periodic factories"""
+    done = threading.Event()
+    errors: list[Exception] = []
+    system.subscribe(Tick)(lambda _: done.set())
+    with EventScheduler(system, tick=0.001, error_handler=errors.append):
+        system.emit_every(0.001, lambda: Tick(1 // 0))
+        system.emit_later(0.01, Tick())
+        assert done.wait(5.0)
+    assert errors
+
+
+def test_no_scheduler(system):
+    """Test error if no scheduler is attached"""
+    with pytest.raises(RuntimeError):
+        system.emit_later(1.0, Tick())
+
+
+def test_scheduler_thread(system):
+    """Test the thread driven scheduler"""
+    done = threading.Event()
+    system.subscribe(Tick)(lambda _: done.set())
+    with EventScheduler(system, tick=0.001):
+        system.emit_later(0.01, Tick())
+        assert done.wait(5.0)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_async(system):
+    """Test the asyncio driven scheduler"""
+    done = asyncio.Event()
+
+    @system.subscribe()
+    async def _handle(_: Tick):
+        done.set()
+
+    async with EventScheduler(system, tick=0.001):
+        system.emit_later(0.01, Tick())
+        await asyncio.wait_for(done.wait(), timeout=5.0)
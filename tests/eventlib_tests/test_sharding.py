@@ -0,0 +1,118 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the sharded runtime of multiple event loops.
+"""
+
+import functools
+import multiprocessing
+import threading
+
+import pytest
+
+from eventlib import CircuitBreaker, CircuitState, Event, EventSystem
+from eventlib.sharding import ShardedRuntime
+
+
+# pylint: disable=too-few-public-methods
+class A(Event):
+    """Test event class"""
+
+    def __init__(self, key: int = 0, seq: int = 0):
+        self.key = key
+        self.seq = seq
+
+
+def test_routing_by_key(system):
+    """Test that events with the same key are emitted in order by the same shard"""
+    handled: dict[int, list[tuple[str, int]]] = {}
+    lock = threading.Lock()
+
+    @system.subscribe(A)
+    def handler(event: A):
+        with lock:
+            handled.setdefault(event.key, []).append((threading.current_thread().name, event.seq))
+
+    with ShardedRuntime(system, shards=4, key=lambda e: e.key) as runtime:
+        for seq in range(50):
+            for key in range(8):
+                runtime.publish(A(key, seq))
+        runtime.drain()
+        assert sum(map(len, handled.values())) == 400
+    for key, calls in handled.items():
+        assert [seq for _, seq in calls] == list(range(50))
+        assert {name for name, _ in calls} == {f"eventlib-shard-{key % 4}"}
+
+
+def test_round_robin_and_close(system):
+    """Test that events are spread round-robin and remaining events are emitted on close"""
+    names: list[str] = []
+
+    @system.subscribe(A)
+    async def handler(_: A):
+        names.append(threading.current_thread().name)
+
+    runtime = ShardedRuntime(system, shards=3)
+    for _ in range(9):
+        runtime.publish(A())
+    assert runtime.running
+    runtime.close()
+    assert not runtime.running
+    assert sorted(names) == sorted(f"eventlib-shard-{i}" for i in range(3) for _ in range(3))
+
+
+def test_replicas_are_independent(system):
+    """Test that the shards use replicas of the template and errors are passed to the error handler"""
+    errors = []
+    system.subscribe(A)(lambda _: 1 / 0)
+    with ShardedRuntime(system, shards=2, error_handler=errors.append) as runtime:
+        replica_calls = []
+        runtime.systems[0].subscribe(A, priority=-1)(replica_calls.append)
+        with pytest.raises(ExceptionGroup):
+            system.emit(A())
+        assert not replica_calls
+        runtime.publish(A())
+        runtime.publish(A())
+        runtime.drain()
+    assert len(errors) == 2
+    assert len(replica_calls) == 1
+
+
+def test_validation(system):
+    """Test the validation of the runtime arguments"""
+    with pytest.raises(ValueError):
+        ShardedRuntime(system, shards=0)
+    with pytest.raises(ValueError):
+        ShardedRuntime(system, mode="process")
+
+
+def _process_system(results) -> EventSystem:
+    system = EventSystem()
+    system.subscribe(A)(lambda event: results.put((multiprocessing.current_process().name, event.key)))
+    return system
+
+
+def test_process_mode():
+    """Test that the process mode emits the events in the shard processes"""
+    results = multiprocessing.Queue()
+    with ShardedRuntime(
+        functools.partial(_process_system, results), shards=2, key=lambda e: e.key, mode="process"
+    ) as runtime:
+        for key in range(6):
+            runtime.publish(A(key))
+        runtime.drain()
+        handled = sorted(results.get(timeout=5) for _ in range(6))
+    assert handled == sorted((f"eventlib-shard-{key % 2}", key) for key in range(6))
+
+
+def test_replicas_have_own_breakers(system):
+    """Test that the circuit breakers of the template are replicated per shard"""
+    breaker = CircuitBreaker(min_calls=1, window=1)
+    system.subscribe(A, breaker=breaker)(lambda _: 1 / 0)
+    with ShardedRuntime(system, shards=2, key=lambda e: e.key, error_handler=lambda _: None) as runtime:
+        runtime.publish(A(key=0))
+        runtime.drain()
+        breakers = [sub.meta.breaker for replica in runtime.systems for sub in replica.chains[A].subs]
+    assert [b.state for b in breakers if b is not None and b is not breaker] == [CircuitState.OPEN, CircuitState.CLOSED]
+    assert breaker.state is CircuitState.CLOSED
@@ -0,0 +1,149 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the cross-process transport of events over shared memory.
+"""
+
+import dataclasses
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from eventlib import Event, EventSystem
+from eventlib.shm import _KIND_PICKLE, _POSITION, ShmTransport
+
+
+@dataclasses.dataclass
+class Tick(Event):
+    """Test event class with a fixed layout"""
+
+    seq: int
+    price: float
+
+
+@dataclasses.dataclass
+class Message(Event):
+    """Test event class that is pickled"""
+
+    text: str
+
+
+@pytest.fixture(name="transport")
+def fixture_transport():
+    """Shared-memory transport for testing."""
+    with ShmTransport(slots=8, slot_size=128, consumers=2) as transport:
+        transport.register(Tick, "<qd", fields=("seq", "price"))
+        yield transport
+
+
+def test_send_and_poll(transport):
+    """Test that every consumer reads all events in order, with fixed layouts and pickles"""
+    first, second = transport.consumer(0), transport.consumer(1)
+    events = [Tick(1, 1.5), Message("hello"), Tick(2, 2.5)]
+    transport.send_many(events)
+    assert len(first) == 3
+    assert first.poll(max_events=2) == events[:2]
+    assert first.poll() == events[2:]
+    assert second.poll() == events
+    assert not first.poll()
+    assert first.wait(timeout=0.01) is False
+
+
+def test_wraparound(transport):
+    """Test that the ring wraps around when the consumers keep up"""
+    consumer = transport.consumer(0)
+    other = transport.consumer(1)
+    received = []
+    for seq in range(20):
+        transport.send(Tick(seq, 0.0))
+        received += consumer.poll()
+        other.poll()
+    assert [event.seq for event in received] == list(range(20))
+
+
+def test_validation(transport):
+    """Test the validation of the slots and events"""
+    with pytest.raises(ValueError):
+        ShmTransport(slot_size=12)
+    with pytest.raises(ValueError):
+        transport.send(Message("x" * 1024))
+    with pytest.raises(IndexError):
+        transport.consumer(2)
+
+
+def test_large_events(transport):
+    """Test that events larger than a slot take consecutive slots and wrap around to the start of the ring"""
+    first, second = transport.consumer(0), transport.consumer(1)
+    events = [Tick(1, 1.5), Message("x" * 300), Tick(2, 2.5), Message("y" * 300), Message("z" * 200)]
+    for event in events:
+        transport.send(event)
+        assert first.poll() == [event]
+        assert second.poll() == [event]
+
+
+def test_timeout():
+    """Test that the producer waits at most the timeout for space in a full ring"""
+    with ShmTransport(slots=2, slot_size=128, timeout=0.01) as transport:
+        transport.send(Message("a"))
+        transport.send(Message("b"))
+        with pytest.raises(TimeoutError):
+            transport.send(Message("c"))
+        assert transport.consumer(0).poll() == [Message("a"), Message("b")]
+        transport.send(Message("c"))
+
+
+def test_dead_consumer(transport):
+    """Test that the producer stops waiting for a consumer whose process died"""
+    process = multiprocessing.Process(target=int)
+    process.start()
+    process.join()
+    transport.watch(1, process)
+    consumer = transport.consumer(0)
+    received = []
+    for seq in range(20):
+        transport.send(Tick(seq, 0.0))
+        received += consumer.poll()
+    assert [event.seq for event in received] == list(range(20))
+
+
+def test_missed_wakeup(transport):
+    """Test that a sleeping consumer notices events by polling, if the producer did not see its sleeping flag"""
+    consumer = transport.consumer(0)
+    # Publish without a wakeup, as if the flag was not visible to the producer yet
+    transport._put(_KIND_PICKLE, Message("late"))  # pylint: disable=protected-access
+    threading.Timer(0.05, lambda: _POSITION.pack_into(transport._buf, 0, 1)).start()  # pylint: disable=protected-access
+    start = time.monotonic()
+    assert consumer.wait(timeout=2.0)
+    assert time.monotonic() - start < 1.0
+    assert consumer.poll() == [Message("late")]
+
+
+def _consume(transport: ShmTransport, index: int, results):
+    system = EventSystem()
+    system.subscribe(Event)(results.put)
+    transport.consumer(index).serve(system)
+
+
+def test_processes(system):
+    """Test that events emitted in the producer are forwarded to the consumer processes until closed"""
+    results = multiprocessing.Queue()
+    with ShmTransport(slots=4, slot_size=128, consumers=2) as transport:
+        transport.register(Tick, "<qd", fields=("seq", "price"))
+        workers = [multiprocessing.Process(target=_consume, args=(transport, i, results)) for i in range(2)]
+        for index, worker in enumerate(workers):
+            worker.start()
+            transport.watch(index, worker)
+        transport.subscribe(system, Tick, Message)
+        for seq in range(10):
+            system.emit(Tick(seq, seq / 2))
+        system.emit(Message("done"))
+        transport.close()
+        for worker in workers:
+            worker.join(timeout=5)
+            assert worker.exitcode == 0
+    received = [results.get(timeout=5) for _ in range(22)]
+    assert sorted(e.seq for e in received if isinstance(e, Tick)) == sorted(list(range(10)) * 2)
+    assert received.count(Message("done")) == 2
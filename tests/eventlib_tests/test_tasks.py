@@ -0,0 +1,95 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the fire-and-forget emission with task tracking.
+"""
+
+import asyncio
+
+import pytest
+
+from eventlib import Event, TaskTracker
+
+
+# pylint: disable=too-few-public-methods
+class A(Event):
+    """Test event class"""
+
+
+@pytest.mark.asyncio
+async def test_emit_nowait_requires_tracker(system):
+    """Test that a fire-and-forget emission requires a task tracker"""
+    with pytest.raises(RuntimeError):
+        system.emit_nowait(A())
+    assert await system.drain()
+
+
+@pytest.mark.filterwarnings("error")
+def test_emit_nowait_without_loop(system):
+    """Test that a fire-and-forget emission without a running event loop fails without creating the coroutine"""
+    TaskTracker(system)
+    with pytest.raises(RuntimeError):
+        system.emit_nowait(A())
+
+
+@pytest.mark.asyncio
+async def test_emit_nowait_and_drain(system):
+    """Test that emissions run in the background and are awaited by drain"""
+    calls = []
+
+    @system.subscribe(A)
+    async def handler(event: A):
+        await asyncio.sleep(0.01)
+        calls.append(event)
+
+    tracker = TaskTracker(system)
+    events = [A() for _ in range(5)]
+    for event in events:
+        system.emit_nowait(event)
+    assert len(tracker) == 5
+    assert not calls
+    assert await system.drain()
+    assert calls == events
+    assert not tracker
+
+
+@pytest.mark.asyncio
+async def test_bounded_in_flight(system):
+    """Test that the number of emissions in flight is limited"""
+    release = asyncio.Event()
+
+    @system.subscribe(A)
+    async def handler(_: A):
+        await release.wait()
+
+    tracker = TaskTracker(system, max_in_flight=2)
+    system.emit_nowait(A())
+    system.emit_nowait(A())
+    with pytest.raises(asyncio.QueueFull):
+        system.emit_nowait(A())
+    assert tracker.rejected == 1
+    submitted = asyncio.create_task(tracker.submit(A()))
+    await asyncio.sleep(0.01)
+    assert not submitted.done()
+    release.set()
+    await submitted
+    assert await system.drain(timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_errors_and_drain_timeout(system):
+    """Test that errors are passed to the error handler and that drain stops at the timeout"""
+    errors = []
+    system.subscribe(A)(lambda _: 1 / 0)
+    tracker = TaskTracker(system, error_handler=errors.append)
+    system.emit_nowait(A())
+    assert await system.drain()
+    assert len(errors) == 1
+    assert isinstance(errors[0], ExceptionGroup)
+
+    system.subscribe(A)(lambda _: asyncio.sleep(1))
+    system.emit_nowait(A())
+    assert not await system.drain(timeout=0.01)
+    tracker.cancel()
+    assert await system.drain()
@@ -0,0 +1,79 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the thread-safe emission of events into an event loop.
+"""
+
+import asyncio
+import queue
+import threading
+
+import pytest
+
+from eventlib import Event, ThreadsafeEmitter
+
+
+# pylint: disable=too-few-public-methods
+class A(Event):
+    """Test event class"""
+
+    def __init__(self, value: int = 0):
+        self.value = value
+
+
+def test_emit_threadsafe_requires_emitter(system):
+    """Test that a thread-safe emission requires an emitter"""
+    with pytest.raises(RuntimeError):
+        system.emit_threadsafe(A())
+
+
+@pytest.mark.asyncio
+async def test_emit_from_threads(system):
+    """Test that events of many producer threads are emitted in the event loop in order per producer"""
+    received: dict[int, list[int]] = {}
+    loop_thread = threading.get_ident()
+    threads_seen = set()
+
+    @system.subscribe(A)
+    def handler(event: A):
+        threads_seen.add(threading.get_ident())
+        received.setdefault(event.value // 1000, []).append(event.value)
+
+    def produce(producer: int):
+        for i in range(500):
+            system.emit_threadsafe(A(producer * 1000 + i))
+
+    async with ThreadsafeEmitter(system, maxsize=100, batch_size=32):
+        threads = [threading.Thread(target=produce, args=(p,)) for p in range(4)]
+        for thread in threads:
+            thread.start()
+        await asyncio.to_thread(lambda: [thread.join() for thread in threads])
+    assert threads_seen == {loop_thread}
+    assert sorted(received) == [0, 1, 2, 3]
+    for producer, values in received.items():
+        assert values == [producer * 1000 + i for i in range(500)]
+
+
+@pytest.mark.asyncio
+async def test_backpressure(system):
+    """Test that a full buffer raises if the producer does not block"""
+    emitter = ThreadsafeEmitter(system, maxsize=2)
+    system.emit_threadsafe(A())
+    system.emit_threadsafe(A())
+    with pytest.raises(queue.Full):
+        system.emit_threadsafe(A(), block=False)
+    with pytest.raises(queue.Full):
+        await asyncio.to_thread(system.emit_threadsafe, A(), True, 0.01)
+    assert len(emitter) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_reported(system):
+    """Test that errors of handlers are passed to the error handler"""
+    errors = []
+    system.subscribe(A)(lambda _: 1 / 0)
+    async with ThreadsafeEmitter(system, error_handler=errors.append):
+        await asyncio.to_thread(system.emit_threadsafe, A())
+    assert len(errors) == 1
+    assert isinstance(errors[0], ExceptionGroup)
@@ -0,0 +1,140 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the topic based event routing.
+"""
+
+import contextlib
+import dataclasses
+
+import pytest
+
+from eventlib import TopicEvent, TopicRouter
+
+
+@dataclasses.dataclass
+class OrderEvent(TopicEvent):
+    """Test topic event with a payload"""
+
+    order_id: int = 0
+
+
+@pytest.mark.parametrize(
+    "pattern, topic, expected",
+    [
+        ("orders.eu.created", "orders.eu.created", True),
+        ("orders.eu.created", "orders.us.created", False),
+        ("orders.*.created", "orders.eu.created", True),
+        ("orders.*.created", "orders.eu.42.created", False),
+        ("orders.eu.*.created", "orders.eu.42.created", True),
+        ("orders.#", "orders", True),
+        ("orders.#", "orders.eu.42.created", True),
+        ("orders.#", "users.eu", False),
+        ("#", "anything.at.all", True),
+        ("*.*", "orders", False),
+        ("orders.*", "orders.eu.created", False),
+    ],
+)
+def test_match(router, pattern, topic, expected):
+    """Test the topic pattern matching"""
+    # Arrange
+    results = []
+    router.subscribe(pattern)(results.append)
+    # Act
+    event = TopicEvent(topic)
+    router.emit(event)
+    # Assert
+    assert results == ([event] if expected else [])
+
+
+def test_invalid_pattern(router):
+    """Test that the multi-word wildcard is only allowed at the end"""
+    with pytest.raises(ValueError):
+        router.subscribe("orders.#.created")(lambda _: None)
+
+
+def test_priority(router):
+    """Test that the priorities are respected across matching patterns"""
+    # Arrange
+    results = []
+    router.subscribe("orders.#", priority=1)(lambda _: results.append("many"))
+    router.subscribe("orders.*.created")(lambda _: results.append("one"))
+    router.subscribe("orders.eu.created", priority=-1)(lambda _: results.append("exact"))
+    # Act
+    router.emit(OrderEvent(topic="orders.eu.created", order_id=42))
+    # Assert
+    assert results == ["exact", "one", "many"]
+
+
+def test_cache_invalidation(router):
+    """Test that the cached chains are invalidated on subscription changes"""
+    # Arrange
+    results = []
+
+    def handler(event: TopicEvent):
+        results.append(event.topic)
+
+    router.subscribe("orders.*")(handler)
+    router.emit(TopicEvent("orders.eu"))
+    # Act & Assert
+    router.subscribe("orders.#")(handler)
+    router.emit(TopicEvent("orders.eu"))
+    assert results == ["orders.eu"] * 3
+    router.unsubscribe(handler)
+    router.emit(TopicEvent("orders.eu"))
+    assert len(results) == 3
+    router.subscribe("orders.#")(handler)
+    router.unsubscribe_all("orders.#")
+    router.emit(TopicEvent("orders.eu"))
+    assert len(results) == 3
+
+
+def test_cache_size():
+    """Test that the cache is bounded"""
+    router = TopicRouter(cache_size=2)
+    router.subscribe("#")(lambda _: None)
+    for i in range(10):
+        router.emit(TopicEvent(f"topic.{i}"))
+    assert len(router.get_chain("topic.0")) == 1
+
+
+def test_cache_disabled():
+    """Test that a cache size of 0 disables the cache"""
+    router = TopicRouter(cache_size=0)
+    results = []
+    router.subscribe("#")(results.append)
+    router.emit(TopicEvent("topic.a"))
+    router.emit(TopicEvent("topic.a"))
+    assert len(results) == 2
+
+
+@pytest.mark.asyncio
+async def test_emit_async(router):
+    """Test async handlers and context managers on topics"""
+    # Arrange
+    results = []
+
+    @router.subscribe("orders.#", priority=-1)
+    @contextlib.asynccontextmanager
+    async def monitor(_):
+        results.append("enter")
+        yield
+        results.append("exit")
+
+    @router.subscribe("orders.*")
+    async def handler(event: OrderEvent):
+        results.append(event.order_id)
+
+    # Act
+    await router.emit_async(OrderEvent(topic="orders.eu", order_id=1))
+    # Assert
+    assert results == ["enter", 1, "exit"]
+
+
+def test_handler_error(router):
+    """Test handler errors on topics"""
+    router.subscribe("orders.*")(lambda _: 1 / 0)
+    with pytest.raises(ExceptionGroup) as exc:
+        router.emit(TopicEvent("orders.eu"))
+    assert exc.group_contains(ZeroDivisionError)
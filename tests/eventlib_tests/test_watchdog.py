@@ -0,0 +1,87 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the watchdog of synchronous handlers that block the event loop.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from eventlib import BlockingWatchdog, Event
+
+
+# pylint: disable=too-few-public-methods
+class A(Event):
+    """Test event class"""
+
+
+def blocking_handler(_: A):
+    """Synchronous handler that blocks the event loop"""
+    time.sleep(0.05)
+
+
+@pytest.mark.asyncio
+async def test_report_blocking_handler(system):
+    """Test that blocking synchronous handlers are reported with a stack sample"""
+    reports = []
+    watchdog = BlockingWatchdog(threshold=0.02, reporter=reports.append)
+    system.watchdog = watchdog
+    system.subscribe(A)(blocking_handler)
+    system.subscribe(A)(lambda _: None)
+    try:
+        await system.emit_async(A())
+    finally:
+        watchdog.close()
+    assert len(reports) == 1
+    report = reports[0]
+    assert report.event_type is A
+    assert report.qualname == "blocking_handler"
+    assert report.duration >= 0.05
+    assert report.stack is not None and "blocking_handler" in report.stack
+    assert not report.offloaded
+    assert list(watchdog.reports) == reports
+
+
+@pytest.mark.asyncio
+async def test_ignore_async_handler(system):
+    """Test that the time of asynchronous handlers is not reported"""
+    reports = []
+    system.watchdog = BlockingWatchdog(threshold=0.01, reporter=reports.append, sample_stacks=False)
+    system.subscribe(A)(lambda _: asyncio.sleep(0.03))
+    await system.emit_async(A())
+    await system.emit_async(A())
+    assert not reports
+
+
+@pytest.mark.asyncio
+async def test_offload_repeatedly_blocking_handler(system):
+    """Test that handlers that block repeatedly are offloaded to a thread"""
+    threads = []
+
+    def handler(_: A):
+        threads.append(threading.get_ident())
+        time.sleep(0.02)
+
+    watchdog = BlockingWatchdog(threshold=0.01, offload_after=2, reporter=None, sample_stacks=False)
+    system.watchdog = watchdog
+    system.subscribe(A)(handler)
+    for _ in range(3):
+        await system.emit_async(A())
+    assert len(watchdog.reports) == 2
+    assert watchdog.reports[-1].offloaded
+    assert threads[:2] == [threading.get_ident()] * 2
+    assert threads[2] != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_watchdog_errors(system):
+    """Test that errors of watched handlers are raised as usual"""
+    system.watchdog = BlockingWatchdog(threshold=0.01, sample_stacks=False)
+    system.subscribe(A)(lambda _: 1 / 0)
+    with pytest.raises(ExceptionGroup) as exc:
+        await system.emit_async(A())
+    assert isinstance(exc.value.exceptions[0], ZeroDivisionError)
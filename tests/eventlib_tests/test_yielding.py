@@ -0,0 +1,89 @@
+# Copyright 2024 Michael Käser
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""
+Test the cooperative yielding of asynchronous emissions.
+"""
+
+import asyncio
+import contextlib
+import time
+
+import pytest
+
+from eventlib import Event, YieldPolicy
+
+
+# pylint: disable=too-few-public-methods
+class A(Event):
+    """Test event class"""
+
+
+async def _count_ticks(ticks: list[int]):
+    """Task that counts how often it was scheduled"""
+    while True:
+        ticks[0] += 1
+        await asyncio.sleep(0)
+
+
+def test_yield_policy_validation():
+    """Test that a yield policy requires a limit"""
+    with pytest.raises(ValueError):
+        YieldPolicy()
+    with pytest.raises(ValueError):
+        YieldPolicy(max_handlers=0)
+
+
+@pytest.mark.asyncio
+async def test_yield_after_handlers(system):
+    """Test that the emission yields after a number of handlers and keeps the order and the contexts"""
+    ticks = [0]
+    calls = []
+    seen = []
+
+    @contextlib.contextmanager
+    def context(_: A):
+        calls.append("enter")
+        yield
+        calls.append("exit")
+
+    system.subscribe(A, priority=-1)(context)
+    for i in range(10):
+        system.subscribe(A, priority=i)(lambda _, i=i: (calls.append(i), seen.append(ticks[0])))
+    system.yield_policy = YieldPolicy(max_handlers=4)
+    task = asyncio.create_task(_count_ticks(ticks))
+    await asyncio.sleep(0)
+    await system.emit_async(A())
+    task.cancel()
+    assert calls == ["enter", *range(10), "exit"]
+    assert seen[0] < seen[3] < seen[7]
+    assert len(set(seen)) == 3
+
+
+@pytest.mark.asyncio
+async def test_yield_after_time(system):
+    """Test that the emission yields after an amount of time"""
+    ticks = [0]
+    system.subscribe(A)(lambda _: time.sleep(0.002))
+    system.subscribe(A)(lambda _: time.sleep(0.002))
+    system.yield_policy = YieldPolicy(max_time=0.001)
+    task = asyncio.create_task(_count_ticks(ticks))
+    await asyncio.sleep(0)
+    start = ticks[0]
+    await system.emit_async(A())
+    task.cancel()
+    assert ticks[0] - start >= 1
+
+
+@pytest.mark.asyncio
+async def test_yield_in_batch(system):
+    """Test that batches of short chains yield between the events"""
+    ticks = [0]
+    seen = []
+    system.subscribe(A)(lambda _: seen.append(ticks[0]))
+    system.yield_policy = YieldPolicy(max_handlers=2)
+    task = asyncio.create_task(_count_ticks(ticks))
+    await asyncio.sleep(0)
+    await system.emit_many_async([A() for _ in range(6)])
+    task.cancel()
+    assert len(set(seen)) == 3